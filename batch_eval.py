@@ -0,0 +1,299 @@
+"""
+Avaliação em lote: muitas posições de uma vez (tuning, rotulagem de partidas, análise).
+
+Com NumPy as quatro bitboards viram vetores uint64 e material, PSQT, mobilidade e o
+multiplicador de final são calculados com operações de bits e gathers sobre o lote
+inteiro, na mesma ordem de somas de Engine.evaluate — o resultado é idêntico ao escalar
+(mesmos floats, não só próximos). A mobilidade de lados com captura obrigatória
+(sequências máximas) sai de uma expansão em largura de todas as sequências do lote.
+Sem NumPy, evaluate_batch cai no laço escalar com o mesmo resultado.
+
+Uso:
+    python batch_eval.py --positions 100000
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele só o caminho escalar
+    np = None
+
+from board import Board
+from engine import (Color, Engine, default_engine, _CAPTURE_SHIFTS, _FORWARD_DIRS, _FULL_MASK,
+                    _JUMP_BACK, _PROMOTION_MASK, _RAYS, _STEP_BACK)
+
+HAVE_NUMPY = np is not None
+
+# (brancas, pretas, damas brancas, damas pretas), um valor por posição
+Bitboards = Tuple[Sequence[int], Sequence[int], Sequence[int], Sequence[int]]
+
+
+def bitboards(boards: Sequence[Board]) -> Bitboards:
+    """Separa uma lista de Board nas quatro listas de bitboards aceitas por evaluate_batch."""
+    return ([b.bitboard_white for b in boards], [b.bitboard_black for b in boards],
+            [b.kings_white for b in boards], [b.kings_black for b in boards])
+
+
+def _evaluate_scalar(white, black, kings_white, kings_black, eng: Engine, mobility: bool) -> List[float]:
+    if not mobility:
+        # mesma avaliação com o termo de mobilidade zerado
+        eng = Engine(tt_mb=0, params=dict(eng.params, mobility_weight=0.0))
+    return [eng.evaluate(Board(w, b, kw, kb, zobrist=0))
+            for w, b, kw, kb in zip(white, black, kings_white, kings_black)]
+
+
+# --- caminho vetorizado ---
+if HAVE_NUMPY:
+    _POPCOUNT16 = np.array([bin(i).count('1') for i in range(1 << 16)], dtype=np.int64)
+
+    def _popcount(bb):
+        return _POPCOUNT16[bb & 0xFFFF] + _POPCOUNT16[bb >> 16]
+
+    def _bit(bb, idx: int):
+        """Vetor bool: casa `idx` presente em cada bitboard."""
+        return (bb >> np.uint64(idx)) & np.uint64(1) != 0
+
+    def _shift(bb, groups):
+        """engine._shift sobre um vetor de bitboards."""
+        out = np.zeros_like(bb)
+        for mask, delta in groups:
+            part = bb & np.uint64(mask)
+            out |= (part << np.uint64(delta)) if delta > 0 else (part >> np.uint64(-delta))
+        return out
+
+    def _padded(rows, width: int):
+        return np.array([list(r) + [-1] * (width - len(r)) for r in rows], dtype=np.int64)
+
+    # tabelas do gerador em forma de array (-1 = fora do tabuleiro)
+    # _MAN_JUMPS[player]: (32, 4, 2) com (pouso, capturada) de cada salto de homem
+    _MAN_JUMPS = {player: np.array([[list(j) for j in _CAPTURE_SHIFTS[player][False][idx]]
+                                    + [[-1, -1]] * (4 - len(_CAPTURE_SHIFTS[player][False][idx]))
+                                    for idx in range(32)], dtype=np.int64)
+                  for player in (Color.WHITE, Color.BLACK)}
+    # _RAY_SQUARES[idx, d, k]: k-ésima casa do raio d a partir de idx
+    _RAY_SQUARES = np.stack([_padded(_RAYS[idx], 7) for idx in range(32)])
+
+    def _test(bb, squares):
+        """Vetor bool: casa squares[i] presente em bb[i] (squares < 0 dá False)."""
+        valid = squares >= 0
+        return valid & ((bb >> np.where(valid, squares, 0).astype(np.uint64)) & np.uint64(1) != 0)
+
+    def _square_bit(squares):
+        return np.uint64(1) << squares.astype(np.uint64)
+
+    def _pieces(bb, rows=None):
+        """(posição no lote, casa) de cada peça em `bb` (só nas posições `rows`, se dadas)."""
+        rows = np.flatnonzero(bb) if rows is None else rows
+        found_rows, found_squares = [], []
+        for idx in range(32):
+            at = rows[_bit(bb[rows], idx)]
+            found_rows.append(at)
+            found_squares.append(np.full(at.size, idx, dtype=np.int64))
+        return np.concatenate(found_rows), np.concatenate(found_squares)
+
+    def _king_rays(kings, occupied, opp_bb):
+        """
+        Para cada dama, percorre os quatro raios: casas livres antes do primeiro bloqueio
+        (soma de lances) e captura disponível (bloqueio adversário seguido de casa livre).
+        """
+        moves = np.zeros(kings.shape, dtype=np.int64)
+        captures = np.zeros(kings.shape, dtype=bool)
+        row, pos = _pieces(kings)
+        if not row.size:
+            return moves, captures
+        occ, opp = occupied[row], opp_bb[row]
+        free = np.zeros(row.size, dtype=np.int64)
+        capture = np.zeros(row.size, dtype=bool)
+        for d in range(4):
+            open_ = np.ones(row.size, dtype=bool)
+            for k in range(7):
+                sq = _RAY_SQUARES[pos, d, k]
+                blocked = _test(occ, sq)
+                if k < 6:
+                    capture |= open_ & blocked & _test(opp, sq) & (_RAY_SQUARES[pos, d, k + 1] >= 0) \
+                        & ~_test(occ, _RAY_SQUARES[pos, d, k + 1])
+                open_ &= (sq >= 0) & ~blocked
+                free += open_
+        np.add.at(moves, row, free)
+        captures[row[capture]] = True
+        return moves, captures
+
+    def _capture_counts(player: Color, rows, men, kings, opp_bb, occupied, size: int):
+        """
+        count_moves com captura obrigatória: número de sequências de captura de tamanho
+        máximo nas posições `rows`. Expande em largura, todas as sequências do lote de uma
+        vez, as mesmas regras de _count_man_captures/_count_king_captures.
+        """
+        # fronteira: posição no lote, casa atual, capturadas, pousos, nº de capturas, é dama
+        frontier = []
+        for pieces, is_king in ((men, False), (kings, True)):
+            at, squares = _pieces(pieces, rows)
+            frontier.append((at, squares, np.zeros(at.size, dtype=np.uint64), _square_bit(squares),
+                             np.zeros(at.size, dtype=np.int64), np.full(at.size, is_king)))
+        ends_row, ends_len = [], []
+        promotion = np.uint64(_PROMOTION_MASK[player])
+        jumps = _MAN_JUMPS[player]
+        while frontier:
+            row, pos, used_mid, used_pos, ncap, is_king = (np.concatenate(f) for f in zip(*frontier))
+            frontier = []
+            opp, occ = opp_bb[row], occupied[row]
+            found = np.zeros(row.size, dtype=bool)
+
+            def grow(mask, dest, mid):
+                frontier.append((row[mask], dest[mask], used_mid[mask] | _square_bit(mid[mask]),
+                                 used_pos[mask] | _square_bit(dest[mask]), ncap[mask] + 1, is_king[mask]))
+
+            # homens: saltos simples; promoção encerra a sequência
+            occupancy = occ & ~used_mid
+            for j in range(4):
+                dest, mid = jumps[pos, j, 0], jumps[pos, j, 1]
+                ok = ~is_king & _test(opp, mid) & ~_test(occupancy, dest) & ~_test(used_pos, dest)
+                promoted = ok & _test(promotion, dest)
+                ends_row.append(row[promoted])
+                ends_len.append(ncap[promoted] + 1)
+                ok &= ~promoted
+                found |= ok
+                grow(ok, dest, mid)
+            # damas: primeira peça do raio adversária e não capturada, pousos livres além dela
+            for d in range(4):
+                mid = np.full(row.size, -1, dtype=np.int64)
+                for k in range(7):
+                    sq = _RAY_SQUARES[pos, d, k]
+                    mid = np.where((mid < 0) & _test(occ, sq), sq, mid)
+                alive = is_king & _test(opp, mid) & ~_test(used_mid, mid)
+                beyond = np.where(mid >= 0, mid, 0)
+                for k in range(7):
+                    dest = _RAY_SQUARES[beyond, d, k]
+                    alive &= (dest >= 0) & ~_test(occ, dest) & ~_test(used_pos, dest)
+                    if not alive.any():
+                        break
+                    found |= alive
+                    grow(alive, dest, mid)
+            done = ~found & (ncap > 0)
+            ends_row.append(row[done])
+            ends_len.append(ncap[done])
+            frontier = [f for f in frontier if f[0].size]
+
+        ends_row, ends_len = np.concatenate(ends_row), np.concatenate(ends_len)
+        best = np.zeros(size, dtype=np.int64)
+        np.maximum.at(best, ends_row, ends_len)
+        counts = np.zeros(size, dtype=np.int64)
+        np.add.at(counts, ends_row, ends_len == best[ends_row])
+        return counts
+
+    def _count_moves(player: Color, our_bb, opp_bb, our_kings):
+        """count_moves de `player` em cada posição do lote."""
+        occupied = our_bb | opp_bb
+        empty = ~occupied & np.uint64(_FULL_MASK)
+        men = our_bb & ~our_kings
+        jumpers = np.zeros_like(men)
+        for d in range(4):
+            jumpers |= _shift(empty, _JUMP_BACK[d]) & _shift(opp_bb, _STEP_BACK[d])
+        jumpers &= men
+        total = np.zeros(men.shape, dtype=np.int64)
+        for d in _FORWARD_DIRS[player]:
+            total += _popcount(men & _shift(empty, _STEP_BACK[d]))
+        king_moves, king_captures = _king_rays(our_kings, occupied, opp_bb)
+        total += king_moves
+        # com captura obrigatória a contagem é de sequências máximas
+        rows = np.flatnonzero((jumpers != 0) | king_captures)
+        if rows.size:
+            captures = _capture_counts(player, rows, jumpers, our_kings, opp_bb, occupied, men.size)
+            total[rows] = captures[rows]
+        return total
+
+    def _evaluate_vectorized(white, black, kings_white, kings_black, eng: Engine, mobility: bool):
+        white, black, kings_white, kings_black = (np.asarray(a, dtype=np.uint64)
+                                                  for a in (white, black, kings_white, kings_black))
+        white_men   = _popcount(white & ~kings_white)
+        white_kings = _popcount(kings_white)
+        black_men   = _popcount(black & ~kings_black)
+        black_kings = _popcount(kings_black)
+
+        # mesma ordem de operações de Engine.evaluate (casas em ordem crescente)
+        score = (white_men + 1.5 * white_kings) - (black_men + 1.5 * black_kings)
+        # por casa, valor com sinal de cada conteúdo (vazia, homem/dama branca, homem/dama preta);
+        # somar 0.0 nas vazias não muda o valor (score nunca é -0.0) e x - v == x + (-v)
+        pst = np.array([[0.0, m, k, -m, -k] for m, k in zip(eng._pst_man, eng._pst_king)])
+        one = np.uint64(1)
+        for idx in range(32):
+            shift = np.uint64(idx)
+            content = (((white >> shift) & one) + ((kings_white >> shift) & one)
+                       + np.uint64(3) * ((black >> shift) & one) + ((kings_black >> shift) & one))
+            score += pst[idx][content]
+
+        if mobility:
+            white_moves = _count_moves(Color.WHITE, white, black, kings_white)
+            black_moves = _count_moves(Color.BLACK, black, white, kings_black)
+            score = score + (white_moves - black_moves) * eng.mobility_weight
+
+        total_pieces = white_men + white_kings + black_men + black_kings
+        return np.where(total_pieces < eng.endgame_piece_limit, score * eng.endgame_multiplier, score)
+
+
+def move_counts(white: Sequence[int], black: Sequence[int], kings_white: Sequence[int],
+                kings_black: Sequence[int]):
+    """Número de lances legais (== count_moves) de brancas e de pretas em cada posição (requer NumPy)."""
+    if not HAVE_NUMPY:
+        raise ImportError("move_counts requer NumPy")
+    white, black, kings_white, kings_black = (np.asarray(a, dtype=np.uint64)
+                                              for a in (white, black, kings_white, kings_black))
+    return (_count_moves(Color.WHITE, white, black, kings_white),
+            _count_moves(Color.BLACK, black, white, kings_black))
+
+
+def evaluate_batch(white: Sequence[int], black: Sequence[int], kings_white: Sequence[int],
+                   kings_black: Sequence[int], engine: Optional[Engine] = None,
+                   mobility: bool = True, vectorized: Optional[bool] = None):
+    """
+    Avalia um lote de posições dadas pelas quatro bitboards (sequências ou arrays de
+    mesmo tamanho) com os parâmetros de `engine` (padrão: o engine do módulo engine).
+    Devolve, do ponto de vista das brancas, exatamente os valores de engine.evaluate;
+    com mobility=False, os de uma avaliação com mobility_weight=0.
+    Retorna um array float64 com NumPy, senão uma lista de floats.
+    `vectorized=False` força o laço escalar; `vectorized=True` exige NumPy.
+    """
+    eng = engine if engine is not None else default_engine()
+    if vectorized is None:
+        vectorized = HAVE_NUMPY
+    if vectorized:
+        if not HAVE_NUMPY:
+            raise ImportError("evaluate_batch(vectorized=True) requer NumPy")
+        return _evaluate_vectorized(white, black, kings_white, kings_black, eng, mobility)
+    scores = _evaluate_scalar(white, black, kings_white, kings_black, eng, mobility)
+    return np.array(scores, dtype=np.float64) if HAVE_NUMPY else scores
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Vazão e exatidão da avaliação em lote")
+    parser.add_argument('--positions', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=2000, help="posições aleatórias distintas (repetidas até o total)")
+    args = parser.parse_args(argv)
+
+    # importado aqui: benchmarks é uma ferramenta, não dependência do módulo
+    from benchmarks import sample_positions
+    sample = [board for board, _ in sample_positions(args.distinct)]
+    boards = [sample[i % len(sample)] for i in range(args.positions)]
+    planes = bitboards(boards)
+
+    start = time.perf_counter()
+    scalar = evaluate_batch(*planes, vectorized=False)
+    scalar_time = time.perf_counter() - start
+    print(f"escalar     {args.positions / scalar_time:12.0f} pos/s  {scalar_time:.2f}s")
+    if not HAVE_NUMPY:
+        print("NumPy indisponível: só o caminho escalar")
+        return 0
+    start = time.perf_counter()
+    batch = evaluate_batch(*planes, vectorized=True)
+    batch_time = time.perf_counter() - start
+    exact = all(float(a) == float(b) for a, b in zip(batch, scalar))
+    print(f"vetorizado  {args.positions / batch_time:12.0f} pos/s  {batch_time:.2f}s  "
+          f"speedup={scalar_time / batch_time:.1f}x  idêntico={exact}")
+    return 0 if exact else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
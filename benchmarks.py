@@ -0,0 +1,119 @@
+"""
+Benchmark de performance: geração de movimentos (perft), avaliação e busca completa.
+
+Os resultados saem em JSON para comparar commits:
+    python benchmarks.py --output bench.json
+    python benchmarks.py --perft-depth 6 --search-depth 6
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import utils
+from board import Board
+from engine import Engine, generate_moves, apply_move, evaluate, Color
+from perft import REFERENCE_POSITIONS, perft
+
+
+def sample_positions(count: int = 500, seed: int = 2024) -> List[Tuple[Board, Color]]:
+    """Posições de partidas aleatórias (semente fixa), cobrindo abertura, meio-jogo e finais."""
+    rng = random.Random(seed)
+    positions: List[Tuple[Board, Color]] = []
+    while len(positions) < count:
+        board, player = Board.initial(), Color.WHITE
+        for _ in range(rng.randint(4, 80)):
+            moves = generate_moves(board, player)
+            if not moves:
+                break
+            board = apply_move(board, rng.choice(moves))
+            player = Color.BLACK if player == Color.WHITE else Color.WHITE
+        positions.append((board, player))
+    return positions
+
+
+def bench_movegen(depth: int) -> Dict[str, Dict[str, float]]:
+    """perft em cada posição de referência: nós e nós/s do gerador."""
+    results = {}
+    for name, (board, player, _) in REFERENCE_POSITIONS.items():
+        start = time.perf_counter()
+        nodes = perft(board, player, depth)
+        elapsed = time.perf_counter() - start
+        results[name] = {'depth': depth, 'nodes': nodes, 'seconds': elapsed,
+                         'nodes_per_sec': nodes / elapsed if elapsed else 0.0}
+    return results
+
+
+def bench_evaluate(positions: List[Tuple[Board, Color]], repeat: int = 5) -> Dict[str, float]:
+    """Avaliações estáticas por segundo sobre `positions`."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for board, _ in positions:
+            evaluate(board)
+    elapsed = time.perf_counter() - start
+    calls = repeat * len(positions)
+    return {'calls': calls, 'seconds': elapsed, 'evals_per_sec': calls / elapsed if elapsed else 0.0}
+
+
+def bench_search(depth: int) -> Dict[str, Dict[str, object]]:
+    """suggest_move até `depth` em cada posição de referência, com tabelas limpas."""
+    results = {}
+    eng = Engine()
+    for name, (board, player, _) in REFERENCE_POSITIONS.items():
+        eng.clear()
+        start = time.perf_counter()
+        move = eng.suggest_move(board, max_depth=depth, player=player)
+        elapsed = time.perf_counter() - start
+        nodes = eng.nodes
+        results[name] = {'depth': depth, 'nodes': nodes, 'seconds': elapsed,
+                         'nodes_per_sec': nodes / elapsed if elapsed else 0.0,
+                         'best_move': str(move)}
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(perft_depth: int = 5, search_depth: int = 5, eval_positions: int = 500) -> Dict[str, object]:
+    """Executa todos os benchmarks e retorna o relatório (serializável em JSON)."""
+    # trace desligado: mede só o custo da busca
+    utils.TRACE.disable()
+    return {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'movegen': bench_movegen(perft_depth),
+        'evaluate': bench_evaluate(sample_positions(eval_positions)),
+        'search': bench_search(search_depth),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do engine de damas")
+    parser.add_argument('--perft-depth', type=int, default=5)
+    parser.add_argument('--search-depth', type=int, default=5)
+    parser.add_argument('--eval-positions', type=int, default=500)
+    parser.add_argument('--output', help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(args.perft_depth, args.search_depth, args.eval_positions)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,31 @@
+import random
+from typing import List, Optional, Tuple
+
+# Chaves Zobrist de 64 bits (semente fixa: chaves estáveis entre processos e execuções)
+ZOBRIST_SEED = 0x5EED_DA4A5
+
+
+def _build_zobrist_tables() -> Tuple[List[List[int]], int]:
+    rng = random.Random(ZOBRIST_SEED)
+    # ordem: homem branco, dama branca, homem preto, dama preta
+    pieces = [[rng.getrandbits(64) for _ in range(32)] for _ in range(4)]
+    side = rng.getrandbits(64)
+    return pieces, side
+
+_ZOBRIST_PIECES, ZOBRIST_BLACK_TO_MOVE = _build_zobrist_tables()
+_Z_WHITE_MAN, _Z_WHITE_KING, _Z_BLACK_MAN, _Z_BLACK_KING = _ZOBRIST_PIECES
+
+
+def _zobrist_of(mask: int, table: List[int]) -> int:
+    """XOR das chaves de `table` para cada casa presente em `mask`."""
+    key = 0
+    while mask:
+        low = mask & -mask
+        key ^= table[low.bit_length() - 1]
+        mask ^= low
+    return key
+
+
 class Board:
     """
     Representa o estado do tabuleiro usando bitboards de 32 bits (casas escuras).
@@ -5,12 +33,74 @@ class Board:
     - bitboard_black: peças pretas (homens e damas)
     - kings_white: damas brancas
     - kings_black: damas pretas
+    - zobrist: chave Zobrist de 64 bits das peças (sem o lado a jogar),
+      mantida incrementalmente por make_move/unmake_move
     """
-    def __init__(self, bitboard_white: int, bitboard_black: int, kings_white: int = 0, kings_black: int = 0):
+    def __init__(self, bitboard_white: int, bitboard_black: int, kings_white: int = 0, kings_black: int = 0,
+                 zobrist: Optional[int] = None):
         self.bitboard_white = bitboard_white
         self.bitboard_black = bitboard_black
         self.kings_white = kings_white
         self.kings_black = kings_black
+        if zobrist is None:
+            zobrist = Board.compute_zobrist(bitboard_white, bitboard_black, kings_white, kings_black)
+        self.zobrist = zobrist
+
+    @staticmethod
+    def compute_zobrist(bitboard_white: int, bitboard_black: int, kings_white: int = 0, kings_black: int = 0) -> int:
+        """Calcula a chave Zobrist do zero (homens e damas de cada cor)."""
+        return (_zobrist_of(bitboard_white & ~kings_white, _Z_WHITE_MAN)
+                ^ _zobrist_of(kings_white, _Z_WHITE_KING)
+                ^ _zobrist_of(bitboard_black & ~kings_black, _Z_BLACK_MAN)
+                ^ _zobrist_of(kings_black, _Z_BLACK_KING))
+
+    def copy(self) -> 'Board':
+        """Retorna uma cópia independente (para buscas que alteram o tabuleiro in-place)."""
+        return Board(self.bitboard_white, self.bitboard_black, self.kings_white, self.kings_black, self.zobrist)
+
+    def make_move(self, move) -> Tuple[int, int, int, int, int]:
+        """
+        Aplica `move` in-place invertendo bits com XOR.
+        Retorna o registro de desfazer (deltas dos quatro bitboards e da chave Zobrist) para unmake_move.
+        Promoções de homens a damas são tratadas automaticamente, preservando damas.
+        """
+        origin_bit = 1 << move.origin
+        dest_bit   = 1 << move.dest
+        captured   = move.captured_mask
+        if self.bitboard_white & origin_bit:
+            # preserva dama se já era, ou promove ao chegar na última linha
+            was_king = self.kings_white & origin_bit
+            d_white  = origin_bit | dest_bit
+            d_kw     = (origin_bit | dest_bit) if was_king else (dest_bit if move.dest >= 28 else 0)
+            d_black  = captured
+            d_kb     = captured & self.kings_black
+        else:
+            # preserva dama se já era, ou promove ao chegar na primeira linha
+            was_king = self.kings_black & origin_bit
+            d_black  = origin_bit | dest_bit
+            d_kb     = (origin_bit | dest_bit) if was_king else (dest_bit if move.dest < 4 else 0)
+            d_white  = captured
+            d_kw     = captured & self.kings_white
+        # homens = peças ^ damas, então o delta dos homens é d_peças ^ d_damas
+        d_key = (_zobrist_of(d_white ^ d_kw, _Z_WHITE_MAN)
+                 ^ _zobrist_of(d_kw, _Z_WHITE_KING)
+                 ^ _zobrist_of(d_black ^ d_kb, _Z_BLACK_MAN)
+                 ^ _zobrist_of(d_kb, _Z_BLACK_KING))
+        self.bitboard_white ^= d_white
+        self.bitboard_black ^= d_black
+        self.kings_white    ^= d_kw
+        self.kings_black    ^= d_kb
+        self.zobrist        ^= d_key
+        return d_white, d_black, d_kw, d_kb, d_key
+
+    def unmake_move(self, undo: Tuple[int, int, int, int, int]) -> None:
+        """Desfaz um make_move a partir do registro retornado por ele."""
+        d_white, d_black, d_kw, d_kb, d_key = undo
+        self.bitboard_white ^= d_white
+        self.bitboard_black ^= d_black
+        self.kings_white    ^= d_kw
+        self.kings_black    ^= d_kb
+        self.zobrist        ^= d_key
 
     @staticmethod
     def initial():
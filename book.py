@@ -0,0 +1,218 @@
+"""
+Livro de aberturas: chave Zobrist da posição (com lado a jogar) -> lance(s) com valor.
+
+O livro é gerado offline com buscas profundas sobre a árvore de aberturas e gravado
+num arquivo binário de registros de tamanho fixo ordenados pela chave; a consulta é
+uma busca binária sobre o arquivo mapeado em memória. Lances do livro são conferidos
+contra os lances legais antes de serem usados.
+
+Uso:
+    python book.py build book.bin --plies 4 --depth 8 --workers 8
+    python book.py show book.bin
+"""
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import utils
+from board import Board
+from engine import Color, Engine, generate_moves, position_key
+from move import Move, SHORT_CODE_MASK
+
+# --- formato do arquivo ---
+# cabeçalho: magic, versão, número de registros, CRC32 dos registros
+BOOK_FILE_MAGIC   = b'DIA-BK\x00\x00'
+BOOK_FILE_VERSION = 1
+_HEADER_FORMAT    = '<8sIQI4x'
+HEADER_BYTES      = struct.calcsize(_HEADER_FORMAT)
+# registro: chave da posição, código curto do lance (sem caminho), valor da busca
+_RECORD_FORMAT    = '<QQf'
+RECORD_BYTES      = struct.calcsize(_RECORD_FORMAT)
+
+# (chave, código do lance, valor)
+BookEntry = Tuple[int, int, float]
+
+
+class BookError(Exception):
+    """Arquivo de livro inválido, corrompido ou de outra versão."""
+
+
+def write_book(path: str, entries: Iterable[BookEntry]) -> int:
+    """
+    Grava `entries` ordenadas (chave crescente, melhor valor primeiro) de forma atômica.
+    Retorna o número de registros.
+    """
+    records = sorted(((key, code & SHORT_CODE_MASK, value) for key, code, value in entries),
+                     key=lambda e: (e[0], -e[2], e[1]))
+    data = b''.join(struct.pack(_RECORD_FORMAT, *record) for record in records)
+    header = struct.pack(_HEADER_FORMAT, BOOK_FILE_MAGIC, BOOK_FILE_VERSION, len(records), zlib.crc32(data))
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(records)
+
+
+class Book:
+    """Livro aberto de um arquivo (mmap somente leitura)."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_BYTES)
+            if len(header) < HEADER_BYTES:
+                raise BookError(f"{path}: cabeçalho truncado")
+            magic, version, count, crc = struct.unpack(_HEADER_FORMAT, header)
+            if magic != BOOK_FILE_MAGIC or version != BOOK_FILE_VERSION:
+                raise BookError(f"{path}: não é um livro desta versão")
+            if os.fstat(f.fileno()).st_size != HEADER_BYTES + count * RECORD_BYTES:
+                raise BookError(f"{path}: arquivo truncado")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = count
+        if zlib.crc32(memoryview(self._mmap)[HEADER_BYTES:]) != crc:
+            self.close()
+            raise BookError(f"{path}: CRC não confere")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, i: int) -> BookEntry:
+        return struct.unpack_from(_RECORD_FORMAT, self._mmap, HEADER_BYTES + i * RECORD_BYTES)
+
+    def _first(self, key: int) -> int:
+        """Índice do primeiro registro com chave >= key (busca binária)."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if struct.unpack_from('<Q', self._mmap, HEADER_BYTES + mid * RECORD_BYTES)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def entries(self, key: int) -> List[Tuple[int, float]]:
+        """[(código curto, valor)] gravados para a chave, melhor primeiro."""
+        out = []
+        i = self._first(key)
+        while i < self.count:
+            k, code, value = self._record(i)
+            if k != key:
+                break
+            out.append((code, value))
+            i += 1
+        return out
+
+    def lookup(self, board: Board, player: Color) -> List[Tuple[Move, float]]:
+        """Lances do livro para a posição que são legais nela, melhor primeiro."""
+        entries = self.entries(position_key(board, player))
+        if not entries:
+            return []
+        legal = {mv.code & SHORT_CODE_MASK: mv for mv in generate_moves(board, player)}
+        return [(legal[code], value) for code, value in entries if code in legal]
+
+    def best_move(self, board: Board, player: Color) -> Optional[Move]:
+        """Melhor lance legal do livro, ou None fora do livro."""
+        found = self.lookup(board, player)
+        return found[0][0] if found else None
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+# --- geração ---
+def opening_positions(plies: int) -> List[Tuple[Board, Color]]:
+    """Posições distintas (por chave) a até `plies` lances da inicial, com o lado a jogar."""
+    frontier = [(Board.initial(), Color.WHITE)]
+    seen = {position_key(*frontier[0])}
+    positions = list(frontier)
+    for _ in range(plies):
+        next_frontier = []
+        for board, player in frontier:
+            opponent = Color.BLACK if player == Color.WHITE else Color.WHITE
+            for mv in generate_moves(board, player):
+                child = board.copy()
+                child.make_move(mv)
+                key = position_key(child, opponent)
+                if key not in seen and generate_moves(child, opponent):
+                    seen.add(key)
+                    next_frontier.append((child, opponent))
+        positions.extend(next_frontier)
+        frontier = next_frontier
+    return positions
+
+
+# engine de cada processo do builder
+_BUILD_ENGINE: Dict[str, Engine] = {}
+
+
+def _search_position(board: Board, player: Color, depth: int) -> Optional[BookEntry]:
+    """Busca uma posição com tabelas limpas (resultado independente da ordem e dos processos)."""
+    if 'engine' not in _BUILD_ENGINE:
+        _BUILD_ENGINE['engine'] = Engine()
+    eng = _BUILD_ENGINE['engine']
+    eng.clear()
+    value = []
+    move = eng.suggest_move(board, max_depth=depth, player=player,
+                            progress=lambda d, v, mv, n: value.append(v))
+    if move is None or not value or not math.isfinite(value[-1]):
+        return None
+    return position_key(board, player), move.code, value[-1]
+
+
+def _worker_init() -> None:
+    # workers não emitem trace (os sinks do processo pai não são compartilhados)
+    utils.TRACE.disable()
+
+
+def build(path: str, plies: int = 4, depth: int = 8, workers: int = 1, verbose: bool = False) -> int:
+    """Busca todas as posições até `plies` lances a profundidade `depth` e grava o livro em `path`."""
+    positions = opening_positions(plies)
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            futures = [pool.submit(_search_position, b, p, depth) for b, p in positions]
+            results = [future.result() for future in futures]
+    else:
+        results = [_search_position(b, p, depth) for b, p in positions]
+    count = write_book(path, [r for r in results if r is not None])
+    if verbose:
+        print(f"{count} posições  plies={plies}  profundidade={depth}  {time.perf_counter() - start:.1f}s")
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Livro de aberturas")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('build')
+    p.add_argument('path')
+    p.add_argument('--plies', type=int, default=4)
+    p.add_argument('--depth', type=int, default=8)
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    p = sub.add_parser('show')
+    p.add_argument('path')
+    p.add_argument('--plies', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    utils.TRACE.disable()
+    if args.command == 'build':
+        build(args.path, args.plies, args.depth, args.workers, verbose=True)
+        return 0
+    book = Book(args.path)
+    print(f"{len(book)} registros")
+    for board, player in opening_positions(args.plies):
+        for mv, value in book.lookup(board, player):
+            print(f"{player.name:5} {mv}  valor={value:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
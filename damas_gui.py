@@ -1,13 +1,22 @@
 from board import Board
-from engine import generate_moves, apply_move, suggest_move, Color
+from engine import generate_moves, apply_move, Color, Engine
 from move import Move
 
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox
 
 BOARD_SIZE = 8
 SQUARE_SIZE = 60
 
+# orçamento de tempo (segundos) por sugestão da IA
+AI_TIME_LIMIT = 2.0
+# intervalo (ms) entre consultas ao progresso da busca em segundo plano
+POLL_INTERVAL_MS = 100
+# pondering: busca durante a vez do humano para aquecer a TT (liga/desliga na janela)
+PONDER_BY_DEFAULT = True
+
 # cores estilo "madeira" (claro / escuro)
 LIGHT_SQUARE = "#f0d9b5"
 DARK_SQUARE  = "#b58863"
@@ -25,18 +34,37 @@ class DamasGUI:
         self.canvas = tk.Canvas(master, width=BOARD_SIZE*SQUARE_SIZE, height=BOARD_SIZE*SQUARE_SIZE)
         self.canvas.pack()
         self.board = Board.initial()
+        # engine próprio da partida (TT, history e contadores não são compartilhados)
+        self.engine = Engine()
         self.selected = None
         self.turn = Color.WHITE
         # histórico de estados para desfazer
         self.history = []
+        # busca em segundo plano: a thread só conversa com a janela pela fila,
+        # consultada com after() na thread do Tk
+        self.search_thread = None
+        self.search_stop = None
+        self.search_queue = queue.Queue()
+        self.search_id = 0
+        self.pondering = False
+        self.polling = False
         self.canvas.bind("<Button-1>", self.on_click)
         self.draw_board()
         self.status = tk.Label(master, text="Turno: Pretas")
         self.status.pack()
+        self.progress = tk.Label(master, text="")
+        self.progress.pack()
         self.ai_button = tk.Button(master, text="Sugestão IA", command=self.ai_move)
         self.ai_button.pack()
+        self.cancel_button = tk.Button(master, text="Cancelar busca", command=self.cancel_search, state=tk.DISABLED)
+        self.cancel_button.pack()
         self.undo_button = tk.Button(master, text="Desfazer", command=self.undo_move)
         self.undo_button.pack()
+        self.ponder_var = tk.BooleanVar(value=PONDER_BY_DEFAULT)
+        tk.Checkbutton(master, text="Pensar na vez do jogador", variable=self.ponder_var,
+                       command=self.on_ponder_toggle).pack()
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.start_ponder()
 
     def draw_board(self):
         self.canvas.delete("all")
@@ -93,6 +121,9 @@ class DamasGUI:
                                          outline="red", width=3)
 
     def on_click(self, event):
+        # durante a busca da IA o tabuleiro não aceita lances
+        if self.search_thread is not None and not self.pondering:
+            return
         # mapeia clique diretamente
         col = event.x // SQUARE_SIZE
         row = event.y // SQUARE_SIZE
@@ -126,9 +157,109 @@ class DamasGUI:
             self.selected = None
             self.draw_board()
 
+    # --- busca em segundo plano ---
+    def start_search(self, player: Color, time_limit=None, ponder: bool = False):
+        """Dispara suggest_move numa thread; progresso e resultado chegam pela fila."""
+        self.stop_search()
+        self.search_id += 1
+        search_id = self.search_id
+        stop = threading.Event()
+        board = self.board.copy()
+
+        def progress(depth, value, move, nodes):
+            self.search_queue.put(('progress', search_id, depth, value, move, nodes))
+
+        def run():
+            move = self.engine.suggest_move(board, player=player, time_limit=time_limit,
+                                            progress=progress, stop_event=stop)
+            self.search_queue.put(('done', search_id, move))
+
+        self.search_stop = stop
+        self.pondering = ponder
+        self.search_thread = threading.Thread(target=run, daemon=True)
+        self.search_thread.start()
+        if not ponder:
+            self.cancel_button.config(state=tk.NORMAL)
+            self.ai_button.config(state=tk.DISABLED)
+            self.progress.config(text="IA pensando...")
+        if not self.polling:
+            self.polling = True
+            self.master.after(POLL_INTERVAL_MS, self.poll_search)
+
+    def stop_search(self):
+        """Interrompe a busca em andamento (se houver) e espera a thread terminar."""
+        if self.search_thread is None:
+            return
+        self.search_stop.set()
+        self.search_thread.join()
+        self.search_thread = None
+        # resultados pendentes da busca interrompida são descartados
+        self.search_id += 1
+        self.pondering = False
+        self.cancel_button.config(state=tk.DISABLED)
+        self.ai_button.config(state=tk.NORMAL)
+
+    def poll_search(self):
+        """Consome a fila da busca (na thread do Tk) e reagenda enquanto ela roda."""
+        while True:
+            try:
+                item = self.search_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[1] != self.search_id:
+                continue
+            if item[0] == 'progress':
+                _, _, depth, value, move, nodes = item
+                prefix = "Pensando na vez do jogador" if self.pondering else "IA"
+                self.progress.config(text=f"{prefix}: prof. {depth}  nós {nodes}  melhor {move}")
+            else:
+                self.search_thread = None
+                self.cancel_button.config(state=tk.DISABLED)
+                self.ai_button.config(state=tk.NORMAL)
+                self.polling = False
+                if self.pondering:
+                    self.pondering = False
+                else:
+                    self.on_ai_result(item[2])
+                return
+        if self.search_thread is not None:
+            self.master.after(POLL_INTERVAL_MS, self.poll_search)
+        else:
+            self.polling = False
+
+    def cancel_search(self):
+        """Botão de cancelar: descarta a busca da IA e devolve a vez às brancas."""
+        if self.search_thread is None or self.pondering:
+            return
+        self.stop_search()
+        self.progress.config(text="Busca cancelada")
+        self.turn = Color.WHITE
+        self.status.config(text="Turno: Brancas")
+        self.start_ponder()
+
+    def start_ponder(self):
+        """Na vez do humano, busca a posição pelo lado dele: as respostas esperadas ficam na TT."""
+        if self.ponder_var.get() and self.turn == Color.WHITE and generate_moves(self.board, Color.WHITE):
+            self.start_search(Color.WHITE, ponder=True)
+
+    def on_ponder_toggle(self):
+        if not self.ponder_var.get() and self.pondering:
+            self.stop_search()
+            self.progress.config(text="")
+        elif self.search_thread is None:
+            self.start_ponder()
+
+    def on_close(self):
+        self.stop_search()
+        self.master.destroy()
+
     def ai_move(self):
-        # Sugere jogada para as pretas (Color.BLACK)
-        suggestion = suggest_move(self.board, max_depth=6, player=Color.BLACK)
+        # Sugere jogada para as pretas (Color.BLACK) sem travar a janela
+        if self.search_thread is not None and not self.pondering:
+            return
+        self.start_search(Color.BLACK, time_limit=AI_TIME_LIMIT)
+
+    def on_ai_result(self, suggestion):
         if suggestion:
             self.highlight_move(suggestion)
             start, end = suggestion.path[0], suggestion.path[-1]
@@ -141,16 +272,19 @@ class DamasGUI:
         # volta a vez para o jogador (brancas)
         self.turn = Color.WHITE
         self.status.config(text="Turno: Brancas")
+        self.start_ponder()
 
     def undo_move(self):
         """Desfaz a última jogada, retornando ao estado anterior."""
         if not self.history:
             return
+        self.stop_search()
         board, turn = self.history.pop()
         self.board = board
         self.turn = turn
         self.draw_board()
         self.status.config(text=f"Turno: {'Brancas' if self.turn == Color.WHITE else 'Pretas'}")
+        self.start_ponder()
 
 if __name__ == "__main__":
     root = tk.Tk()
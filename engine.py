@@ -1,9 +1,16 @@
-from typing import List, Tuple, Dict, Optional
-from enum import Enum
-from board import Board
-from move import Move
+from typing import Callable, Iterator, List, Tuple, Dict, Optional
+from enum import Enum, IntEnum
+from board import Board, ZOBRIST_BLACK_TO_MOVE
+from move import Move, SHORT_CODE_MASK
+from transposition import TranspositionTable, DEFAULT_TT_MB
+import json
 import math
-from utils import debug_move, DEBUG
+import sys
+import threading
+import time
+import types
+import zlib
+from utils import TRACE, TraceLevel
 
 # --- PARÂMETROS DE TUNING ---
 PST_WEIGHT           = 0.02
@@ -19,12 +26,114 @@ HISTORY_CUTOFF_BONUS = lambda d: d*d
 # profundidade máxima de busca padrão
 MAX_SEARCH_DEPTH = 10
 
-# contador de nós de busca
-nodes = 0
+# controle de orçamento da busca (tempo/nós): nunca conferir, se a busca não tem orçamento
+_NO_CHECK = 1 << 62
+# intervalo de nós entre consultas ao relógio
+TIME_CHECK_INTERVAL = 256
+# fator de crescimento assumido entre iterações enquanto não há duas medidas
+DEFAULT_ITERATION_GROWTH = 4.0
+
+class SearchAborted(Exception):
+    """Levantada dentro da busca quando o orçamento de tempo ou de nós se esgota (ou em Engine.stop)."""
+
+# progresso de suggest_move, chamado ao fim de cada iteração: (profundidade, valor, melhor lance, nós)
+ProgressCallback = Callable[[int, float, Optional[Move], int], None]
+
+class SearchStats:
+    """
+    Estatísticas de uma chamada de suggest_move (Engine.last_stats, Engine.search).
+    Contadores são do intervalo da busca; movegen_*/eval_* só são medidos com
+    Engine.instrument ligado (None caso contrário).
+    """
+    # contadores acumulados pelo Engine, copiados como diferença antes/depois da busca
+    COUNTERS = ('nodes', 'qnodes', 'tt_probes', 'tt_hits', 'tt_cutoffs', 'beta_cutoffs', 'first_move_cutoffs')
+    TIMED = ('movegen', 'eval')
+
+    def __init__(self):
+        # 'search', 'book' (lance do livro) ou 'parallel' (workers > 1: só nós e profundidade)
+        self.source = 'search'
+        self.depth = 0
+        self.best_move: Optional[str] = None
+        self.value: Optional[float] = None
+        self.seconds = 0.0
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.movegen_calls: Optional[int] = None
+        self.movegen_seconds: Optional[float] = None
+        self.eval_calls: Optional[int] = None
+        self.eval_seconds: Optional[float] = None
+        # uma entrada por iteração completa: depth, nodes, seconds, value, move
+        self.iterations: List[Dict[str, object]] = []
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """Fração dos cortes beta feitos pelo primeiro lance (qualidade da ordenação)."""
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    @property
+    def effective_branching_factor(self) -> Optional[float]:
+        """Crescimento médio de nós por profundidade entre a primeira e a última iteração."""
+        done = [it for it in self.iterations if it['nodes'] > 0]
+        if len(done) < 2 or done[-1]['depth'] == done[0]['depth']:
+            return None
+        return (done[-1]['nodes'] / done[0]['nodes']) ** (1.0 / (done[-1]['depth'] - done[0]['depth']))
+
+    def to_dict(self) -> Dict[str, object]:
+        """Campos e taxas derivadas, serializáveis em JSON (valores infinitos viram None)."""
+        out: Dict[str, object] = {'source': self.source, 'depth': self.depth, 'best_move': self.best_move,
+                                  'value': _finite(self.value), 'seconds': self.seconds}
+        for name in self.COUNTERS:
+            out[name] = getattr(self, name)
+        for name in self.TIMED:
+            out[f'{name}_calls'] = getattr(self, f'{name}_calls')
+            out[f'{name}_seconds'] = getattr(self, f'{name}_seconds')
+        out.update(nodes_per_sec=self.nodes_per_sec, tt_hit_rate=self.tt_hit_rate,
+                   first_move_cutoff_rate=self.first_move_cutoff_rate,
+                   effective_branching_factor=self.effective_branching_factor,
+                   iterations=[dict(it, value=_finite(it['value'])) for it in self.iterations])
+        return out
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def __str__(self) -> str:
+        ebf = self.effective_branching_factor
+        return (f"depth={self.depth} nodes={self.nodes} qnodes={self.qnodes} nps={self.nodes_per_sec:.0f} "
+                f"tt_hit={self.tt_hit_rate:.1%} tt_cutoffs={self.tt_cutoffs} "
+                f"first_move_cutoffs={self.first_move_cutoff_rate:.1%} "
+                f"ebf={'-' if ebf is None else f'{ebf:.2f}'}")
+
+def _finite(value: Optional[float]) -> Optional[float]:
+    return value if value is not None and math.isfinite(value) else None
+
+# recebe as estatísticas ao fim de cada suggest_move
+StatsCallback = Callable[[SearchStats], None]
 
 # flag para ligar/desligar quiescence
 USE_QUIESCENCE = True
 
+# --- BUSCA SELETIVA (cada técnica pode ser ligada/desligada; todas desligadas por padrão) ---
+USE_PVS            = False  # principal variation search (janela nula após o 1º lance)
+USE_ASPIRATION     = False  # janela de aspiração em torno do valor da iteração anterior
+ASPIRATION_WINDOW  = 0.25   # 1/4 de homem (evaluate: homem = 1.0)
+USE_KILLERS        = False  # dois killer moves por ply
+USE_LMR            = False  # late-move reductions para lances quietos tardios
+LMR_MIN_DEPTH      = 3
+LMR_MIN_MOVE       = 3      # índice (na ordem) a partir do qual o lance pode ser reduzido
+LMR_REDUCTION      = 1
+# largura da janela nula (avaliação em ponto flutuante)
+NULL_WINDOW        = 1e-6
+# plies com slots de killer
+MAX_PLY            = 64
+
 # valores para MVV-LVA
 PIECE_VALUES = {
     'man': 100,
@@ -50,17 +159,12 @@ class Color(Enum):
     WHITE = 1
     BLACK = 2
 
-# Pré-computação das tabelas de deslocamento
-# simple_shifts[player][is_king][idx] -> List[int]
+# quatro direções diagonais, na ordem usada pelo gerador
+_DIRECTIONS = [(-1, -1), (-1, +1), (+1, -1), (+1, +1)]
+
+# Pré-computação das tabelas de captura
 # capture_shifts[player][is_king][idx] -> List[Tuple[int destino, int meio]]
-def _build_shift_tables() -> Tuple[
-    Dict[Color, Dict[bool, Dict[int, List[int]]]],
-    Dict[Color, Dict[bool, Dict[int, List[Tuple[int,int]]]]]
-]:
-    simple_shifts = {
-        Color.WHITE: {False: {}, True: {}},
-        Color.BLACK: {False: {}, True: {}}
-    }
+def _build_shift_tables() -> Dict[Color, Dict[bool, Dict[int, List[Tuple[int,int]]]]]:
     capture_shifts = {
         Color.WHITE: {False: {}, True: {}},
         Color.BLACK: {False: {}, True: {}}
@@ -70,245 +174,368 @@ def _build_shift_tables() -> Tuple[
         row, col = Board.index_to_coords(idx)
         for player in (Color.WHITE, Color.BLACK):
             for is_king in (False, True):
-                simple_shifts[player][is_king][idx]  = []
                 capture_shifts[player][is_king][idx] = []
 
         # quatro direções diagonais
-        for dr, dc in [(-1, -1), (-1, +1), (+1, -1), (+1, +1)]:
-            nr, nc = row + dr, col + dc
-            ni = Board.dark_square_index(nr, nc)
-            jr, jc = row + 2*dr, col + 2*dc
-            ji = Board.dark_square_index(jr, jc)
-
-            for player in (Color.WHITE, Color.BLACK):
-                # branco avança dr = +1; preto avança dr = -1
-                forward_ok = (player == Color.WHITE and dr == +1) or \
-                             (player == Color.BLACK and dr == -1)
-
-                # movimentos simples: só "para frente" para homens; damas em todas
-                if ni != -1:
-                    if forward_ok:
-                        simple_shifts[player][False][idx].append(ni)
-                    simple_shifts[player][True][idx].append(ni)
-
-                # capturas: homens e damas em todas as direções
-                if ji != -1 and ni != -1:
+        for dr, dc in _DIRECTIONS:
+            ni = Board.dark_square_index(row + dr, col + dc)
+            ji = Board.dark_square_index(row + 2*dr, col + 2*dc)
+
+            # capturas: homens e damas em todas as direções
+            if ji != -1 and ni != -1:
+                for player in (Color.WHITE, Color.BLACK):
                     capture_shifts[player][False][idx].append((ji, ni))
                     capture_shifts[player][True][idx].append((ji, ni))
 
-    return simple_shifts, capture_shifts
+    return capture_shifts
+
+_CAPTURE_SHIFTS = _build_shift_tables()
+
+# Pré-computação dos raios diagonais (movimentos "flyer" de damas)
+# rays[idx][d]      -> Tuple[int, ...] casas na direção d, da mais próxima à mais distante
+# ray_masks[idx][d] -> int bitmask das mesmas casas
+def _build_ray_tables() -> Tuple[List[List[Tuple[int, ...]]], List[List[int]]]:
+    rays: List[List[Tuple[int, ...]]] = []
+    ray_masks: List[List[int]] = []
+    for idx in range(32):
+        row, col = Board.index_to_coords(idx)
+        idx_rays = []
+        idx_masks = []
+        for dr, dc in _DIRECTIONS:
+            squares = []
+            r, c = row + dr, col + dc
+            while True:
+                sq = Board.dark_square_index(r, c)
+                if sq < 0:
+                    break
+                squares.append(sq)
+                r += dr; c += dc
+            idx_rays.append(tuple(squares))
+            mask = 0
+            for sq in squares:
+                mask |= 1 << sq
+            idx_masks.append(mask)
+        rays.append(idx_rays)
+        ray_masks.append(idx_masks)
+    return rays, ray_masks
+
+_RAYS, _RAY_MASKS = _build_ray_tables()
+# direções com dr = +1 percorrem índices crescentes
+_RAY_ASCENDING = [dr > 0 for dr, _ in _DIRECTIONS]
+
+def _first_blocker(blockers: int, ascending: bool) -> int:
+    """Índice da primeira casa ocupada ao longo de um raio (blockers != 0)."""
+    if ascending:
+        return (blockers & -blockers).bit_length() - 1
+    return blockers.bit_length() - 1
+
+# Deslocamentos em conjunto (todas as peças de uma vez)
+# Na numeração de 32 casas o deslocamento de uma diagonal depende da paridade
+# da linha, então cada direção vira uma lista de (máscara de origem, delta).
+# _STEP_GROUPS[d]: origem -> casa vizinha
+# _STEP_BACK[d] / _JUMP_BACK[d]: destino -> origem (passo simples / salto)
+def _build_group_shifts(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    masks: Dict[int, int] = {}
+    for src, dst in pairs:
+        delta = dst - src
+        masks[delta] = masks.get(delta, 0) | (1 << src)
+    return [(mask, delta) for delta, mask in sorted(masks.items())]
+
+def _build_set_shift_tables() -> Tuple[List[List[Tuple[int, int]]], ...]:
+    step_groups, step_back, jump_back = [], [], []
+    for d in range(4):
+        steps = [(idx, _RAYS[idx][d][0]) for idx in range(32) if len(_RAYS[idx][d]) >= 1]
+        jumps = [(idx, _RAYS[idx][d][1]) for idx in range(32) if len(_RAYS[idx][d]) >= 2]
+        step_groups.append(_build_group_shifts(steps))
+        step_back.append(_build_group_shifts([(dst, src) for src, dst in steps]))
+        jump_back.append(_build_group_shifts([(dst, src) for src, dst in jumps]))
+    return step_groups, step_back, jump_back
 
-_SIMPLE_SHIFTS, _CAPTURE_SHIFTS = _build_shift_tables()
+_STEP_GROUPS, _STEP_BACK, _JUMP_BACK = _build_set_shift_tables()
+
+# direções "para frente" dos homens de cada cor
+_FORWARD_DIRS = {
+    Color.WHITE: [d for d, (dr, _) in enumerate(_DIRECTIONS) if dr == +1],
+    Color.BLACK: [d for d, (dr, _) in enumerate(_DIRECTIONS) if dr == -1],
+}
+# linha de promoção de cada cor
+_PROMOTION_MASK = {
+    Color.WHITE: 0xF << 28,
+    Color.BLACK: 0xF,
+}
+_FULL_MASK = (1 << 32) - 1
+
+def _shift(bb: int, groups: List[Tuple[int, int]]) -> int:
+    """Desloca todas as casas de `bb` segundo os grupos (máscara, delta)."""
+    out = 0
+    for mask, delta in groups:
+        part = bb & mask
+        if part:
+            out |= (part << delta) if delta > 0 else (part >> -delta)
+    return out
+
+def _man_jumpers(men: int, opp_bb: int, empty: int) -> int:
+    """Homens com pelo menos uma captura simples disponível (em qualquer direção)."""
+    jumpers = 0
+    for d in range(4):
+        jumpers |= _shift(empty, _JUMP_BACK[d]) & _shift(opp_bb, _STEP_BACK[d])
+    return men & jumpers
+
+def _king_capturers(kings: int, opp_bb: int, occupied: int) -> int:
+    """Damas com pelo menos uma captura disponível: peça adversária mais próxima
+    na diagonal seguida de casa vazia."""
+    capturers = 0
+    while kings:
+        low = kings & -kings
+        idx = low.bit_length() - 1
+        kings ^= low
+        for d in range(4):
+            blockers = _RAY_MASKS[idx][d] & occupied
+            if not blockers:
+                continue
+            mid = _first_blocker(blockers, _RAY_ASCENDING[d])
+            if not ((opp_bb >> mid) & 1):
+                continue
+            beyond = _RAYS[mid][d]
+            if beyond and not ((occupied >> beyond[0]) & 1):
+                capturers |= low
+                break
+    return capturers
+
+def _search_man_captures(player, opp_bb, occupied, origin, pos, used_mid, used_pos, inter, shift, out):
+    """
+    Busca recursiva de capturas múltiplas de um homem a partir de `pos`.
+    used_mid é a máscara das capturadas; inter/shift acumulam os pousos anteriores a `pos`.
+    """
+    found = False
+    occupancy = occupied & ~used_mid
+    promotion = _PROMOTION_MASK[player]
+    # pousos até `pos` inclusive (a origem não entra no caminho empacotado)
+    if used_mid:
+        next_inter, next_shift = inter | (pos << shift), shift + 5
+    else:
+        next_inter, next_shift = 0, 0
+    for dest, mid in _CAPTURE_SHIFTS[player][False][pos]:
+        if ((opp_bb >> mid) & 1) and not ((occupancy >> dest) & 1) and not (used_pos & (1 << dest)):
+            # não promovido ainda; promoção final interrompe
+            if promotion & (1 << dest):
+                packed = (next_inter | (1 << next_shift)) if next_shift else 0
+                out.append(Move(origin, dest, used_mid | (1 << mid), packed))
+                continue
+            found = True
+            _search_man_captures(
+                player, opp_bb, occupied, origin,
+                dest,
+                used_mid | (1 << mid),
+                used_pos | (1 << dest),
+                next_inter, next_shift,
+                out
+            )
+    if not found and used_mid:
+        out.append(Move(origin, pos, used_mid, (inter | (1 << shift)) if shift else 0))
+
+def _search_king_captures(opp_bb, occupied, origin, pos, used_mid, used_pos, inter, shift, out):
+    """Busca recursiva de capturas de dama (flyer captures) a partir de `pos`."""
+    found = False
+    if used_mid:
+        next_inter, next_shift = inter | (pos << shift), shift + 5
+    else:
+        next_inter, next_shift = 0, 0
+    for d in range(4):
+        # primeiro encontre a peça mais próxima na diagonal
+        blockers = _RAY_MASKS[pos][d] & occupied
+        if not blockers:
+            continue
+        mid = _first_blocker(blockers, _RAY_ASCENDING[d])
+        if not ((opp_bb >> mid) & 1) or (used_mid & (1<<mid)):
+            continue
+        # a seguir, possíveis landing points
+        for dest in _RAYS[mid][d]:
+            if (occupied & (1<<dest)) or (used_pos & (1<<dest)):
+                break
+            found = True
+            _search_king_captures(
+                opp_bb, occupied, origin,
+                dest,
+                used_mid | (1<<mid),
+                used_pos | (1<<dest),
+                next_inter, next_shift,
+                out
+            )
+    if not found and used_mid:
+        out.append(Move(origin, pos, used_mid, (inter | (1 << shift)) if shift else 0))
 
 def generate_moves(board: Board, player: Color) -> List[Move]:
     """
     Gera todos os movimentos válidos para o jogador atual,
     respeitando captura obrigatória, múltiplos saltos e movimentos "flyer" de damas.
+
+    Homens são tratados em conjunto: saltos simples e movimentos simples saem de
+    deslocamentos mascarados dos bitboards; só as peças que realmente capturam
+    descem na busca recursiva de capturas múltiplas.
     """
     our_bb    = board.bitboard_white if player == Color.WHITE else board.bitboard_black
     opp_bb    = board.bitboard_black if player == Color.WHITE else board.bitboard_white
     our_kings = board.kings_white     if player == Color.WHITE else board.kings_black
+    occupied  = our_bb | opp_bb
+    empty     = ~occupied & _FULL_MASK
+    men       = our_bb & ~our_kings
 
     all_captures: List[Move] = []
-    all_simples:  List[Move] = []
-
-    # Para cada peça nossa
-    for idx in range(32):
-        if not ((our_bb >> idx) & 1):
-            continue
-        is_king = bool((our_kings >> idx) & 1)
-        row0, col0 = Board.index_to_coords(idx)
-
-        # Função recursiva para capturas de homens
-        def _search_man_captures(pos, used_mid, used_pos, captured, path):
-            found = False
-            occupancy = (our_bb | opp_bb) & ~used_mid
-            for dest, mid in _CAPTURE_SHIFTS[player][False][pos]:
-                if ((opp_bb >> mid) & 1) and not ((occupancy >> dest) & 1) and not (used_pos & (1 << dest)):
-                    # não promovido ainda; promoção final interrompe
-                    r_dest, _ = Board.index_to_coords(dest)
-                    promote = (player == Color.WHITE and r_dest == 7) or \
-                              (player == Color.BLACK and r_dest == 0)
-                    if promote:
-                        all_captures.append(Move(path + [dest], captured + [mid]))
-                        continue
-                    found = True
-                    _search_man_captures(
-                        dest,
-                        used_mid | (1 << mid),
-                        used_pos | (1 << dest),
-                        captured + [mid],
-                        path + [dest]
-                    )
-            if not found and captured:
-                all_captures.append(Move(path, captured))
-
-        # Função recursiva para capturas de damas (flyer captures)
-        def _search_king_captures(pos, used_mid, used_pos, captured, path):
-            found = False
-            r0, c0 = Board.index_to_coords(pos)
-            for dr, dc in [(-1,-1),(-1,1),(1,-1),(1,1)]:
-                # primeiro encontre o adversário na diagonal
-                r, c = r0+dr, c0+dc
-                while True:
-                    mid = Board.dark_square_index(r, c)
-                    if mid < 0: break
-                    if ((opp_bb >> mid) & 1) and not (used_mid & (1<<mid)):
-                        # a seguir, possíveis landing points
-                        lr, lc = r+dr, c+dc
-                        while True:
-                            dest = Board.dark_square_index(lr, lc)
-                            if dest < 0: break
-                            if ((our_bb|opp_bb) & (1<<dest)) or (used_pos & (1<<dest)):
-                                break
-                            found = True
-                            _search_king_captures(
-                                dest,
-                                used_mid | (1<<mid),
-                                used_pos | (1<<dest),
-                                captured + [mid],
-                                path + [dest]
-                            )
-                            lr += dr; lc += dc
-                        break
-                    if ((our_bb|opp_bb) & (1<<mid)):
-                        break
-                    r += dr; c += dc
-            if not found and captured:
-                all_captures.append(Move(path, captured))
 
-        # chama a busca de capturas apropriada
-        if is_king:
-            _search_king_captures(idx, 0, 1<<idx, [], [idx])
+    # capturas: só peças com algum salto disponível, em ordem de casa
+    pieces = _man_jumpers(men, opp_bb, empty) | _king_capturers(our_kings, opp_bb, occupied)
+    while pieces:
+        low = pieces & -pieces
+        idx = low.bit_length() - 1
+        pieces ^= low
+        if our_kings & low:
+            _search_king_captures(opp_bb, occupied, idx, idx, 0, low, 0, 0, all_captures)
         else:
-            _search_man_captures(idx, 0, 1<<idx, [], [idx])
-
-        # movimentos simples (só se não houver capturas em todo tabuleiro)
-        if not all_captures:
-            if is_king:
-                # flyer moves
-                for dr, dc in [(-1,-1),(-1,1),(1,-1),(1,1)]:
-                    r, c = row0+dr, col0+dc
-                    while True:
-                        dest = Board.dark_square_index(r, c)
-                        if dest < 0 or ((our_bb|opp_bb) & (1<<dest)):
-                            break
-                        all_simples.append(Move([idx, dest]))
-                        r += dr; c += dc
-            else:
-                # movimentos simples de homem
-                for dest in _SIMPLE_SHIFTS[player][False][idx]:
-                    if not (((our_bb|opp_bb) >> dest) & 1):
-                        all_simples.append(Move([idx, dest]))
+            _search_man_captures(player, opp_bb, occupied, idx, idx, 0, low, 0, 0, all_captures)
 
     # se há capturas, filtra só as de maior comprimento (obrigatório)
     if all_captures:
-        max_cap = max(len(m.captured) for m in all_captures)
-        return [m for m in all_captures if len(m.captured) == max_cap]
+        max_cap = max(m.captured_mask.bit_count() for m in all_captures)
+        return [m for m in all_captures if m.captured_mask.bit_count() == max_cap]
+
+    # movimentos simples: homens por direção em conjunto, damas pelos raios
+    all_simples: List[Move] = []
+    forward = _FORWARD_DIRS[player]
+    movers = [men & _shift(empty, _STEP_BACK[d]) for d in forward]
+    pieces = our_kings
+    for m in movers:
+        pieces |= m
+    while pieces:
+        low = pieces & -pieces
+        idx = low.bit_length() - 1
+        pieces ^= low
+        if our_kings & low:
+            # flyer moves
+            for ray in _RAYS[idx]:
+                for dest in ray:
+                    if occupied & (1<<dest):
+                        break
+                    all_simples.append(Move(idx, dest))
+        else:
+            # movimentos simples de homem
+            for d, m in zip(forward, movers):
+                if m & low:
+                    all_simples.append(Move(idx, _RAYS[idx][d][0]))
     return all_simples
 
-def apply_move(board: Board, move: Move) -> Board:
-    """
-    Aplica um movimento (simples ou com captura) e retorna novo Board.
-    Promoções de homens a damas são tratadas automaticamente, preservando damas.
-    """
-    w_bb, b_bb = board.bitboard_white, board.bitboard_black
-    w_k,  b_k  = board.kings_white, board.kings_black
+def _merge_counts(best: int, count: int, length: int, n: int) -> Tuple[int, int]:
+    """Combina contagens (maior nº de capturas, quantas sequências com esse nº)."""
+    if length > best:
+        return length, n
+    if length == best:
+        return best, count + n
+    return best, count
 
-    origin = move.path[0]
-    is_white = ((w_bb >> origin) & 1) == 1
+def _count_man_captures(player, opp_bb, occupied, pos, used_mid, used_pos, ncap) -> Tuple[int, int]:
+    """Como _search_man_captures, mas só conta as sequências: (maior nº de capturas, quantidade)."""
+    best, count = 0, 0
+    found = False
+    occupancy = occupied & ~used_mid
+    promotion = _PROMOTION_MASK[player]
+    for dest, mid in _CAPTURE_SHIFTS[player][False][pos]:
+        if ((opp_bb >> mid) & 1) and not ((occupancy >> dest) & 1) and not (used_pos & (1 << dest)):
+            if promotion & (1 << dest):
+                best, count = _merge_counts(best, count, ncap + 1, 1)
+                continue
+            found = True
+            length, n = _count_man_captures(player, opp_bb, occupied, dest,
+                                            used_mid | (1 << mid), used_pos | (1 << dest), ncap + 1)
+            best, count = _merge_counts(best, count, length, n)
+    if not found and ncap:
+        best, count = _merge_counts(best, count, ncap, 1)
+    return best, count
 
-    # grava se era dama antes de limpar
-    if is_white:
-        was_king = ((w_k >> origin) & 1) == 1
-    else:
-        was_king = ((b_k >> origin) & 1) == 1
+def _count_king_captures(opp_bb, occupied, pos, used_mid, used_pos, ncap) -> Tuple[int, int]:
+    """Como _search_king_captures, mas só conta as sequências: (maior nº de capturas, quantidade)."""
+    best, count = 0, 0
+    found = False
+    for d in range(4):
+        blockers = _RAY_MASKS[pos][d] & occupied
+        if not blockers:
+            continue
+        mid = _first_blocker(blockers, _RAY_ASCENDING[d])
+        if not ((opp_bb >> mid) & 1) or (used_mid & (1<<mid)):
+            continue
+        for dest in _RAYS[mid][d]:
+            if (occupied & (1<<dest)) or (used_pos & (1<<dest)):
+                break
+            found = True
+            length, n = _count_king_captures(opp_bb, occupied, dest,
+                                             used_mid | (1<<mid), used_pos | (1<<dest), ncap + 1)
+            best, count = _merge_counts(best, count, length, n)
+    if not found and ncap:
+        best, count = _merge_counts(best, count, ncap, 1)
+    return best, count
 
-    # remove origem
-    if is_white:
-        w_bb &= ~(1 << origin)
-        w_k  &= ~(1 << origin)
-    else:
-        b_bb &= ~(1 << origin)
-        b_k  &= ~(1 << origin)
-
-    # remove capturadas
-    for mid in move.captured:
-        if is_white:
-            b_bb &= ~(1 << mid)
-            b_k  &= ~(1 << mid)
-        else:
-            w_bb &= ~(1 << mid)
-            w_k  &= ~(1 << mid)
-
-    # coloca na casa destino
-    dest = move.path[-1]
-    if is_white:
-        w_bb |= (1 << dest)
-        # preserva dama se já era, ou promove ao chegar na última linha
-        if was_king or dest // 4 == 7:
-            w_k |= (1 << dest)
-    else:
-        b_bb |= (1 << dest)
-        # preserva dama se já era, ou promove ao chegar na primeira linha
-        if was_king or dest // 4 == 0:
-            b_k |= (1 << dest)
+def count_moves(board: Board, player: Color) -> int:
+    """
+    Número de movimentos legais de `player` (== len(generate_moves(board, player)))
+    sem criar objetos Move. Sem capturas, a contagem sai só de máscaras: popcount
+    dos deslocamentos dos homens e dos raios livres de cada dama. Com captura
+    obrigatória, as sequências máximas são contadas por uma busca que não aloca.
+    """
+    our_bb    = board.bitboard_white if player == Color.WHITE else board.bitboard_black
+    opp_bb    = board.bitboard_black if player == Color.WHITE else board.bitboard_white
+    our_kings = board.kings_white     if player == Color.WHITE else board.kings_black
+    occupied  = our_bb | opp_bb
+    empty     = ~occupied & _FULL_MASK
+    men       = our_bb & ~our_kings
 
-    return Board(w_bb, b_bb, w_k, b_k)
+    capturers = _man_jumpers(men, opp_bb, empty) | _king_capturers(our_kings, opp_bb, occupied)
+    if capturers:
+        best, count = 0, 0
+        while capturers:
+            low = capturers & -capturers
+            idx = low.bit_length() - 1
+            capturers ^= low
+            if our_kings & low:
+                length, n = _count_king_captures(opp_bb, occupied, idx, 0, low, 0)
+            else:
+                length, n = _count_man_captures(player, opp_bb, occupied, idx, 0, low, 0)
+            best, count = _merge_counts(best, count, length, n)
+        return count
 
-def evaluate_material_only(board: Board) -> float:
-    # material: 1.0 por man, 1.5 por king
-    wm = bin(board.bitboard_white & ~board.kings_white).count("1")
-    wk = bin(board.kings_white).count("1")
-    bm = bin(board.bitboard_black & ~board.kings_black).count("1")
-    bk = bin(board.kings_black).count("1")
-    return (wm + 1.5*wk) - (bm + 1.5*bk)
+    total = 0
+    for d in _FORWARD_DIRS[player]:
+        total += (men & _shift(empty, _STEP_BACK[d])).bit_count()
+    kings = our_kings
+    while kings:
+        low = kings & -kings
+        idx = low.bit_length() - 1
+        kings ^= low
+        for d in range(4):
+            ray = _RAY_MASKS[idx][d]
+            blockers = ray & occupied
+            if blockers:
+                first = _first_blocker(blockers, _RAY_ASCENDING[d])
+                # casas livres antes do primeiro bloqueio
+                ray &= ~(_RAY_MASKS[first][d] | (1 << first))
+            total += ray.bit_count()
+    return total
 
-def evaluate(board: Board, move_cache: Optional[Dict[Color, List[Move]]] = None) -> float:
+def apply_move(board: Board, move: Move) -> Board:
     """
-    Heurística simples: diferença de material com bônus de posição e mobilidade.
-    Se move_cache for fornecido, usa-o para calcular mobilidade sem gerar movimentos novamente.
+    Aplica um movimento (simples ou com captura) e retorna novo Board.
+    Promoções de homens a damas são tratadas automaticamente, preservando damas.
+    API imutável (GUI); a busca usa Board.make_move/unmake_move in-place.
     """
-    white_men   = bin(board.bitboard_white & ~board.kings_white).count("1")
-    white_kings = bin(board.kings_white).count("1")
-    black_men   = bin(board.bitboard_black & ~board.kings_black).count("1")
-    black_kings = bin(board.kings_black).count("1")
-
-    # base de material
-    score = (white_men + 1.5 * white_kings) - (black_men + 1.5 * black_kings)
-    # PST com peso maior e penalidade em bordas
-    for idx in range(32):
-        row, col = Board.index_to_coords(idx)
-        border = row in (0, 7) or col in (0, 7)
-        bit = 1 << idx
-        if board.bitboard_white & bit:
-            pst_val = PSQT_KING[idx] if (board.kings_white & bit) else PSQT_MAN[idx]
-            weight = PST_WEIGHT * (BORDER_PST_FACTOR if border else 1.0)
-            score += pst_val * weight
-        if board.bitboard_black & bit:
-            pst_val = PSQT_KING[idx] if (board.kings_black & bit) else PSQT_MAN[idx]
-            weight = PST_WEIGHT * (BORDER_PST_FACTOR if border else 1.0)
-            score -= pst_val * weight
-
-    # mobilidade: usa cache se disponível
-    if move_cache is not None:
-        white_moves = len(move_cache[Color.WHITE])
-        black_moves = len(move_cache[Color.BLACK])
-    else:
-        white_moves = len(generate_moves(board, Color.WHITE))
-        black_moves = len(generate_moves(board, Color.BLACK))
-    score += (white_moves - black_moves) * MOBILITY_WEIGHT
+    new_board = board.copy()
+    new_board.make_move(move)
+    return new_board
 
-    # Endgame material bonus
-    total_pieces = white_men + white_kings + black_men + black_kings
-    if total_pieces < ENDGAME_PIECE_LIMIT:
-        score *= ENDGAME_MULTIPLIER
-    return score
-
-def eval_side(board: Board, player: Color) -> float:
-    """Avalia a posição do ponto de vista de `player`."""
-    base = evaluate(board)
-    return base if player == Color.WHITE else -base
+def evaluate_material_only(board: Board) -> float:
+    # material: 1.0 por man, 1.5 por king
+    wm = (board.bitboard_white & ~board.kings_white).bit_count()
+    wk = board.kings_white.bit_count()
+    bm = (board.bitboard_black & ~board.kings_black).bit_count()
+    bk = board.kings_black.bit_count()
+    return (wm + 1.5*wk) - (bm + 1.5*bk)
 
 def mvv_lva_score(move: Move, board: Board, player: Color) -> int:
     """
@@ -318,43 +545,71 @@ def mvv_lva_score(move: Move, board: Board, player: Color) -> int:
     if not move.is_capture():
         return 0
     # a vítima mais valiosa
-    victim_idxs = move.captured
     opp_kings = board.kings_black if player == Color.WHITE else board.kings_white
-    max_victim_value = max(
-        PIECE_VALUES['king'] if (opp_kings >> mid) & 1 else PIECE_VALUES['man']
-        for mid in victim_idxs
-    )
+    max_victim_value = PIECE_VALUES['king'] if opp_kings & move.captured_mask else PIECE_VALUES['man']
     # atacante
-    origin = move.path[0]
+    origin = move.origin
     our_kings = board.kings_white if player == Color.WHITE else board.kings_black
     attacker_value = PIECE_VALUES['king'] if (our_kings >> origin) & 1 else PIECE_VALUES['man']
     return max_victim_value - attacker_value
 
-# tipos de bound para Negamax e quiescence
-class BoundType(Enum):
+# tipos de bound para Negamax e quiescence (inteiros: gravados direto na TT)
+class BoundType(IntEnum):
     EXACT = 1
     LOWER = 2
     UPPER = 3
 
-# tabela global de transposição: key->(depth, value, bound, best_move)
-TT: Dict[Tuple[int,int,int,int,Color], Tuple[int, float, BoundType, Optional[Move]]] = {}
-# history heuristic: map (origem, destino) to score
-HISTORY: Dict[Tuple[int,int], int] = {}
-
-def _board_key(board: Board) -> Tuple[int,int,int,int]:
-    return (
-        board.bitboard_white,
-        board.bitboard_black,
-        board.kings_white,
-        board.kings_black
-    )
+def position_key(board: Board, player: Color) -> int:
+    """Chave Zobrist de 64 bits da posição com o lado a jogar (TT e demais caches)."""
+    if player == Color.BLACK:
+        return board.zobrist ^ ZOBRIST_BLACK_TO_MOVE
+    return board.zobrist
 
 def has_forced_capture(board: Board, player: Color) -> bool:
     """
     Retorna True se há pelo menos uma captura obrigatória para `player`.
+    Responde só com máscaras de ataque, sem gerar movimentos.
+    """
+    if player == Color.WHITE:
+        our_bb, opp_bb, our_kings = board.bitboard_white, board.bitboard_black, board.kings_white
+    else:
+        our_bb, opp_bb, our_kings = board.bitboard_black, board.bitboard_white, board.kings_black
+    occupied = our_bb | opp_bb
+    if _man_jumpers(our_bb & ~our_kings, opp_bb, ~occupied & _FULL_MASK):
+        return True
+    return bool(_king_capturers(our_kings, opp_bb, occupied))
+
+def hanging_pieces(board: Board, player: Color) -> int:
+    """
+    Bitmask das peças de `player` que o adversário pode capturar no próximo lance
+    (primeiro salto de homens e damas), calculada só com máscaras de ataque.
     """
-    moves = generate_moves(board, player)
-    return bool(moves and moves[0].is_capture())
+    if player == Color.WHITE:
+        our_bb, opp_bb, opp_kings = board.bitboard_white, board.bitboard_black, board.kings_black
+    else:
+        our_bb, opp_bb, opp_kings = board.bitboard_black, board.bitboard_white, board.kings_white
+    occupied = our_bb | opp_bb
+    empty = ~occupied & _FULL_MASK
+    opp_men = opp_bb & ~opp_kings
+    hanging = 0
+    # homens: vítima vizinha na direção d, com a casa seguinte vazia
+    for d in range(4):
+        hanging |= _shift(opp_men, _STEP_GROUPS[d]) & _shift(empty, _STEP_BACK[d])
+    # damas: primeira peça no raio é nossa e a casa seguinte está vazia
+    kings = opp_kings
+    while kings:
+        low = kings & -kings
+        idx = low.bit_length() - 1
+        kings ^= low
+        for d in range(4):
+            blockers = _RAY_MASKS[idx][d] & occupied
+            if not blockers:
+                continue
+            first = _first_blocker(blockers, _RAY_ASCENDING[d])
+            beyond = _RAYS[first][d]
+            if beyond and not ((occupied >> beyond[0]) & 1):
+                hanging |= 1 << first
+    return hanging & our_bb
 
 def is_quiet(board: Board, player: Color) -> bool:
     """
@@ -362,142 +617,754 @@ def is_quiet(board: Board, player: Color) -> bool:
     """
     return not has_forced_capture(board, player)
 
-# Quiescence search minimal (Qsearch) para trocas e capturas
-def qsearch(board: Board, alpha: float, beta: float, player: Color) -> float:
-    global nodes
-    nodes += 1
-    # avaliação estática para o jogador
-    stand_pat = eval_side(board, player)
-    # cortes alpha-beta clássicos
-    if stand_pat >= beta:
-        return beta
-    if alpha < stand_pat:
-        alpha = stand_pat
-    # gera apenas movimentos de captura
-    captures = [m for m in generate_moves(board, player) if m.is_capture()]
-    # explora capturas em recusa negamax
-    for m in captures:
-        next_b = apply_move(board, m)
-        opponent = Color.WHITE if player == Color.BLACK else Color.BLACK
-        score = -qsearch(next_b, -beta, -alpha, opponent)
-        # logging padronizado (forçado)
-        debug_move(0, m, score, True)
-        if score >= beta:
+def _quiet_move_is_legal(board: Board, player: Color, origin: int, dest: int) -> bool:
+    """
+    Valida um lance simples vindo da TT ou dos killers sem gerar a lista de lances:
+    peça própria na origem, destino vazio e alcançável (passo à frente do homem,
+    raio livre da dama). Supõe que não há captura obrigatória na posição.
+    """
+    if player == Color.WHITE:
+        our_bb, our_kings = board.bitboard_white, board.kings_white
+    else:
+        our_bb, our_kings = board.bitboard_black, board.kings_black
+    occupied = board.bitboard_white | board.bitboard_black
+    if not (our_bb >> origin) & 1 or (occupied >> dest) & 1:
+        return False
+    if (our_kings >> origin) & 1:
+        for d, ray_mask in enumerate(_RAY_MASKS[origin]):
+            if (ray_mask >> dest) & 1:
+                for sq in _RAYS[origin][d]:
+                    if sq == dest:
+                        return True
+                    if (occupied >> sq) & 1:
+                        return False
+        return False
+    rays = _RAYS[origin]
+    return any(rays[d] and rays[d][0] == dest for d in _FORWARD_DIRS[player])
+
+# parâmetros de um Engine -> constante do módulo com o valor padrão
+_PARAM_DEFAULTS = {
+    'pst_weight':          'PST_WEIGHT',
+    'border_pst_factor':   'BORDER_PST_FACTOR',
+    'mobility_weight':     'MOBILITY_WEIGHT',
+    'futility_depth':      'FUTILITY_DEPTH',
+    'futility_margin':     'FUTILITY_MARGIN',
+    'endgame_piece_limit': 'ENDGAME_PIECE_LIMIT',
+    'endgame_multiplier':  'ENDGAME_MULTIPLIER',
+    'use_quiescence':      'USE_QUIESCENCE',
+    'use_pvs':             'USE_PVS',
+    'use_aspiration':      'USE_ASPIRATION',
+    'aspiration_window':   'ASPIRATION_WINDOW',
+    'use_killers':         'USE_KILLERS',
+    'use_lmr':             'USE_LMR',
+    'lmr_min_depth':       'LMR_MIN_DEPTH',
+    'lmr_min_move':        'LMR_MIN_MOVE',
+    'lmr_reduction':       'LMR_REDUCTION',
+    'psqt_man':            'PSQT_MAN',
+    'psqt_king':           'PSQT_KING',
+}
+# parâmetros que mudam os valores da busca ou a profundidade/limites gravados (entram no fingerprint da TT)
+_EVAL_PARAMS = ('pst_weight', 'border_pst_factor', 'mobility_weight', 'futility_depth', 'futility_margin',
+                'endgame_piece_limit', 'endgame_multiplier', 'use_quiescence', 'psqt_man', 'psqt_king',
+                'use_pvs', 'use_lmr', 'lmr_min_depth', 'lmr_min_move', 'lmr_reduction')
+
+def default_params() -> Dict[str, object]:
+    """Parâmetros padrão de um Engine, lidos das constantes de tuning do módulo."""
+    values = globals()
+    return {name: list(values[const]) if isinstance(values[const], list) else values[const]
+            for name, const in _PARAM_DEFAULTS.items()}
+
+class Engine:
+    """
+    Motor de busca re-entrante. Cada instância tem sua tabela de transposição, history,
+    killers, contador de nós, orçamento e parâmetros de avaliação/busca, então várias
+    partidas (threads ou processos) podem buscar ao mesmo tempo sem interferir.
+    As funções de módulo (suggest_move, negamax, evaluate, ...) usam um engine padrão.
+    """
+    def __init__(self, tt_mb: float = DEFAULT_TT_MB, params: Optional[Dict[str, object]] = None,
+                 tablebase=None, book=None):
+        self.history: Dict[int, int] = {}
+        # tablebase de finais (tablebase.Tablebase ou None): consultada em negamax/qsearch
+        # para posições com até tablebase.max_pieces peças
+        self.tablebase = tablebase
+        # livro de aberturas (book.Book ou None): consultado antes de buscar em suggest_move
+        self.book = book
+        # killers[ply] = [code, code] dos lances quietos que causaram corte
+        self.killers: List[List[int]] = [[0, 0] for _ in range(MAX_PLY)]
+        self.nodes = 0
+        # orçamento: _next_check é o próximo valor de `nodes` em que os limites são conferidos
+        self._next_check = _NO_CHECK
+        self._deadline: Optional[float] = None
+        self._node_stop: Optional[int] = None
+        # evento de parada da busca em andamento (ver suggest_move)
+        self._stop_event: Optional[threading.Event] = None
+        # contadores para SearchStats (nodes inclui qnodes)
+        self.qnodes = 0
+        self.tt_cutoffs = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.last_stats: Optional[SearchStats] = None
+        # instrumentação (ver instrument): [chamadas, segundos] por categoria
+        self._timings: Dict[str, List[float]] = {name: [0, 0.0] for name in SearchStats.TIMED}
+        self._generate_moves = generate_moves
+        self._instrument = False
+        # PSQT já multiplicada pelo peso (pst_weight, reduzido nas bordas), por casa 0–31
+        self._pst_man: List[float] = []
+        self._pst_king: List[float] = []
+        self._apply_params(default_params())
+        if params:
+            self._apply_params(params)
+        self.tt = TranspositionTable(tt_mb, self.eval_fingerprint())
+
+    # --- parâmetros ---
+    def _apply_params(self, params: Dict[str, object]) -> None:
+        unknown = set(params) - set(_PARAM_DEFAULTS)
+        if unknown:
+            raise ValueError(f"parâmetros desconhecidos: {', '.join(sorted(unknown))}")
+        for name, value in params.items():
+            setattr(self, name, list(value) if isinstance(value, (list, tuple)) else value)
+        self._rebuild_eval_tables()
+
+    @property
+    def params(self) -> Dict[str, object]:
+        """Cópia dos parâmetros atuais (serializável em JSON)."""
+        return {name: list(getattr(self, name)) if isinstance(getattr(self, name), list) else getattr(self, name)
+                for name in _PARAM_DEFAULTS}
+
+    def configure(self, **params: object) -> 'Engine':
+        """
+        Altera parâmetros de avaliação/busca. Se os valores da busca mudam, a TT
+        (calculada com os parâmetros antigos) é esvaziada.
+        """
+        self._apply_params(params)
+        fingerprint = self.eval_fingerprint()
+        if fingerprint != self.tt.fingerprint:
+            self.tt.fingerprint = fingerprint
+            self.tt.clear()
+        return self
+
+    def load_params(self, path: str) -> 'Engine':
+        """Carrega parâmetros de um arquivo JSON ({nome: valor}, só os que mudam)."""
+        with open(path) as f:
+            return self.configure(**json.load(f))
+
+    def save_params(self, path: str) -> None:
+        """Grava todos os parâmetros atuais em JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.params, f, indent=2)
+            f.write('\n')
+
+    def eval_fingerprint(self) -> int:
+        """Fingerprint dos parâmetros que afetam os valores da busca (invalida TTs persistidas)."""
+        values = tuple(tuple(v) if isinstance(v, list) else v for v in (getattr(self, n) for n in _EVAL_PARAMS))
+        return zlib.crc32(repr(values).encode())
+
+    def _rebuild_eval_tables(self) -> None:
+        man, king = [], []
+        for idx in range(32):
+            row, col = Board.index_to_coords(idx)
+            border = row in (0, 7) or col in (0, 7)
+            weight = self.pst_weight * (self.border_pst_factor if border else 1.0)
+            man.append(self.psqt_man[idx] * weight)
+            king.append(self.psqt_king[idx] * weight)
+        self._pst_man[:] = man
+        self._pst_king[:] = king
+
+    def clear(self) -> None:
+        """Esvazia TT, history, killers e os contadores de nós e cortes."""
+        self.tt.clear()
+        self.history.clear()
+        for slots in self.killers:
+            slots[0] = slots[1] = 0
+        self.nodes = self.qnodes = 0
+        self.tt_cutoffs = self.beta_cutoffs = self.first_move_cutoffs = 0
+
+    # --- instrumentação ---
+    @property
+    def instrument(self) -> bool:
+        """
+        Com instrument ligado, geração de lances e avaliação da busca são contadas e
+        cronometradas (movegen_*/eval_* de SearchStats). Custa tempo: desligado por padrão.
+        """
+        return self._instrument
+
+    @instrument.setter
+    def instrument(self, on: bool) -> None:
+        self._instrument = bool(on)
+        if on:
+            self._generate_moves = self._timed('movegen', generate_moves)
+            self.eval_side = self._timed('eval', Engine.eval_side.__get__(self))
+        else:
+            self._generate_moves = generate_moves
+            self.__dict__.pop('eval_side', None)
+
+    def _timed(self, name: str, fn: Callable) -> Callable:
+        timing = self._timings[name]
+        clock = time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            try:
+                return fn(*args)
+            finally:
+                timing[0] += 1
+                timing[1] += clock() - start
+        return timed
+
+    def _counters(self) -> Dict[str, float]:
+        """Valores atuais dos contadores de SearchStats (diferenças dão os da busca)."""
+        counters = {'nodes': self.nodes, 'qnodes': self.qnodes, 'tt_probes': self.tt.probes,
+                    'tt_hits': self.tt.hits, 'tt_cutoffs': self.tt_cutoffs, 'beta_cutoffs': self.beta_cutoffs,
+                    'first_move_cutoffs': self.first_move_cutoffs}
+        for name, (calls, seconds) in self._timings.items():
+            counters[f'{name}_calls'], counters[f'{name}_seconds'] = calls, seconds
+        return counters
+
+    # --- tabela de transposição ---
+    def resize_tt(self, size_mb: float) -> None:
+        """Substitui a tabela de transposição por uma nova de `size_mb` MB."""
+        self.tt.close()
+        self.tt = TranspositionTable(size_mb, self.eval_fingerprint())
+
+    def open_tt(self, path: str, size_mb: float = DEFAULT_TT_MB, readonly: bool = False) -> TranspositionTable:
+        """
+        Passa a usar uma tabela de transposição mapeada do arquivo `path` (criada se preciso).
+        Arquivos inválidos ou obsoletos são descartados; veja TranspositionTable.open.
+        """
+        if self.tt.path == path and not self.tt.readonly:
+            # o próprio engine trava o arquivo para escrita: precisa soltá-lo antes de reabrir
+            self.tt.close()
+        # abre antes de fechar a atual: se a abertura falhar, o engine segue com a tabela anterior
+        table = TranspositionTable.open(path, size_mb, self.eval_fingerprint(), readonly)
+        self.tt.close()
+        self.tt = table
+        return self.tt
+
+    def save_tt(self, path: str) -> None:
+        """Grava a tabela de transposição atual em `path`."""
+        self.tt.fingerprint = self.eval_fingerprint()
+        self.tt.save(path)
+
+    def load_tt(self, path: str) -> TranspositionTable:
+        """Carrega `path` como tabela de transposição em memória; levanta TTFileError se inválido ou obsoleto."""
+        table = TranspositionTable.load(path, self.eval_fingerprint())
+        self.tt.close()
+        self.tt = table
+        return self.tt
+
+    # --- orçamento ---
+    def _check_limits(self) -> None:
+        """Confere parada, prazo e orçamento de nós; agenda a próxima conferência."""
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise SearchAborted()
+        if self._node_stop is not None and self.nodes >= self._node_stop:
+            raise SearchAborted()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchAborted()
+        self._next_check = self.nodes + TIME_CHECK_INTERVAL
+        if self._node_stop is not None:
+            self._next_check = min(self._next_check, self._node_stop)
+
+    def _set_limits(self, deadline: Optional[float], node_stop: Optional[int]) -> None:
+        self._deadline, self._node_stop = deadline, node_stop
+        if deadline is None and node_stop is None and self._stop_event is None:
+            self._next_check = _NO_CHECK
+        else:
+            self._next_check = self.nodes + 1
+
+    # --- avaliação ---
+    def evaluate(self, board: Board, move_cache: Optional[Dict[Color, List[Move]]] = None) -> float:
+        """
+        Heurística simples: diferença de material com bônus de posição e mobilidade.
+        Se move_cache for fornecido, usa-o para calcular mobilidade sem gerar movimentos novamente.
+        """
+        white, black = board.bitboard_white, board.bitboard_black
+        kings_white, kings_black = board.kings_white, board.kings_black
+        white_men   = (white & ~kings_white).bit_count()
+        white_kings = kings_white.bit_count()
+        black_men   = (black & ~kings_black).bit_count()
+        black_kings = kings_black.bit_count()
+
+        # base de material
+        score = (white_men + 1.5 * white_kings) - (black_men + 1.5 * black_kings)
+        # PST com peso maior e penalidade em bordas (tabelas pré-ponderadas);
+        # só casas ocupadas, em ordem crescente, preservando a ordem das somas
+        pst_man, pst_king = self._pst_man, self._pst_king
+        occupied = white | black
+        while occupied:
+            low = occupied & -occupied
+            idx = low.bit_length() - 1
+            occupied ^= low
+            if white & low:
+                score += pst_king[idx] if (kings_white & low) else pst_man[idx]
+            else:
+                score -= pst_king[idx] if (kings_black & low) else pst_man[idx]
+
+        # mobilidade: usa cache se disponível
+        if move_cache is not None:
+            white_moves = len(move_cache[Color.WHITE])
+            black_moves = len(move_cache[Color.BLACK])
+        else:
+            white_moves = count_moves(board, Color.WHITE)
+            black_moves = count_moves(board, Color.BLACK)
+        score += (white_moves - black_moves) * self.mobility_weight
+
+        # Endgame material bonus
+        total_pieces = white_men + white_kings + black_men + black_kings
+        if total_pieces < self.endgame_piece_limit:
+            score *= self.endgame_multiplier
+        return score
+
+    def eval_side(self, board: Board, player: Color) -> float:
+        """Avalia a posição do ponto de vista de `player`."""
+        base = self.evaluate(board)
+        return base if player == Color.WHITE else -base
+
+    # --- busca ---
+    def qsearch(self, board: Board, alpha: float, beta: float, player: Color) -> float:
+        """Quiescence search mínima (qsearch) para trocas e capturas."""
+        self.nodes += 1
+        self.qnodes += 1
+        if self.nodes >= self._next_check:
+            self._check_limits()
+        # final na tablebase: valor exato
+        tb = self.tablebase
+        if tb is not None and (board.bitboard_white | board.bitboard_black).bit_count() <= tb.max_pieces:
+            score = tb.probe_score(board, player)
+            if score is not None:
+                return max(alpha, min(beta, score))
+        # avaliação estática para o jogador
+        stand_pat = self.eval_side(board, player)
+        # cortes alpha-beta clássicos
+        if stand_pat >= beta:
             return beta
-        if score > alpha:
-            alpha = score
-    return alpha
-
-def negamax(board: Board, depth: int, alpha: float, beta: float, player: Color) -> Tuple[float, Optional[Move]]:
-    """Retorna (valor, melhor_move) usando Negamax + Poda Alpha-Beta."""
-    global nodes, TT
-    nodes += 1
-    # guardo α e β originais antes de qualquer modificação em α
-    alpha_orig, beta_orig = alpha, beta
-    # Transposition Table lookup
-    key = (*_board_key(board), player)
-    if key in TT:
-        d_stored, val_stored, bound_stored, mv_stored = TT[key]
-        if d_stored >= depth:
-            if bound_stored == BoundType.EXACT:
-                return val_stored, mv_stored
-            elif bound_stored == BoundType.LOWER:
-                alpha = max(alpha, val_stored)
+        if alpha < stand_pat:
+            alpha = stand_pat
+        # sem capturas disponíveis a posição já é quieta
+        if not has_forced_capture(board, player):
+            return alpha
+        # com captura obrigatória, todos os movimentos gerados são capturas
+        captures = self._generate_moves(board, player)
+        # explora capturas em recusa negamax
+        for m in captures:
+            undo = board.make_move(m)
+            opponent = Color.WHITE if player == Color.BLACK else Color.BLACK
+            score = -self.qsearch(board, -beta, -alpha, opponent)
+            board.unmake_move(undo)
+            if TRACE.level >= TraceLevel.DEBUG:
+                TRACE.emit(TraceLevel.DEBUG, 'qsearch_capture', depth=0, move=m, score=score, forced=True)
+            if score >= beta:
+                return beta
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def _staged_moves(self, board: Board, player: Color, hash_code: int, killers) -> Iterator[Move]:
+        """
+        Entrega os lances de `player` em estágios, gerando só o necessário:
+          1. lance da TT (validado sem gerar a lista, se for simples)
+          2. capturas, pontuadas uma única vez (MVV-LVA, history)
+          3. killers válidos
+          4. demais lances simples por history e PSQT
+        Um corte no lance da TT ou nos killers dispensa a geração dos lances simples.
+        Capturas precisam ser todas geradas (captura máxima obrigatória); nesse caso o
+        lance da TT é reconhecido pelo código curto (sem o caminho intermediário).
+        """
+        history = self.history
+        psqt = self.psqt_man
+        if has_forced_capture(board, player):
+            captures = self._generate_moves(board, player)
+            if hash_code:
+                short = hash_code & SHORT_CODE_MASK
+                for k, mv in enumerate(captures):
+                    if mv.code & SHORT_CODE_MASK == short:
+                        yield captures.pop(k)
+                        break
+            scored = [((-mvv_lva_score(mv, board, player), -history.get(mv.from_to, 0)), mv) for mv in captures]
+            scored.sort(key=lambda item: item[0])
+            for _, mv in scored:
+                yield mv
+            return
+
+        tried = []
+        if hash_code:
+            mv = Move.decode(hash_code)
+            if not mv.is_capture() and _quiet_move_is_legal(board, player, mv.origin, mv.dest):
+                tried.append(mv.code)
+                yield mv
+        for code in killers:
+            if code and code not in tried:
+                mv = Move.decode(code)
+                if _quiet_move_is_legal(board, player, mv.origin, mv.dest):
+                    tried.append(code)
+                    yield mv
+        quiets = [mv for mv in self._generate_moves(board, player) if mv.code not in tried]
+        quiets.sort(key=lambda mv: (-history.get(mv.from_to, 0), -psqt[mv.dest]))
+        yield from quiets
+
+    def negamax(self, board: Board, depth: int, alpha: float, beta: float, player: Color,
+                ply: int = 0) -> Tuple[float, Optional[Move]]:
+        """
+        Retorna (valor, melhor_move) usando Negamax + Poda Alpha-Beta,
+        com PVS, killer moves e LMR conforme use_pvs/use_killers/use_lmr.
+        `board` é alterado in-place (make/unmake) durante a busca e restaurado ao final.
+        `ply` é a distância até a raiz (índice dos killers).
+        """
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_limits()
+        # final na tablebase: valor exato, sem busca (na raiz ainda é preciso escolher o lance)
+        tb = self.tablebase
+        if tb is not None and ply > 0 and (board.bitboard_white | board.bitboard_black).bit_count() <= tb.max_pieces:
+            score = tb.probe_score(board, player)
+            if score is not None:
+                return score, None
+        tt = self.tt
+        # guardo α e β originais antes de qualquer modificação em α
+        alpha_orig, beta_orig = alpha, beta
+        # Transposition Table lookup
+        key = position_key(board, player)
+        entry = tt.probe(key)
+        if entry is not None:
+            d_stored, val_stored, bound_stored, code_stored = entry
+            if d_stored >= depth:
+                mv_stored = Move.decode(code_stored) if code_stored else None
+                if bound_stored == BoundType.EXACT:
+                    self.tt_cutoffs += 1
+                    return val_stored, mv_stored
+                elif bound_stored == BoundType.LOWER:
+                    alpha = max(alpha, val_stored)
+                else:
+                    beta = min(beta, val_stored)
+                if alpha >= beta:
+                    self.tt_cutoffs += 1
+                    return val_stored, mv_stored
+
+        # nó terminal ─────────────────────────────────────────────────
+        if depth == 0:
+            # quiescence somente se habilitado e posição quieta
+            if self.use_quiescence and is_quiet(board, player):
+                val = self.qsearch(board, alpha, beta, player)
+            else:
+                val = self.eval_side(board, player)
+            return val, None
+
+        opponent = Color.BLACK if player == Color.WHITE else Color.WHITE
+        # detector de peça pendurada só quando o trace pede
+        trace_hanging = TRACE.level >= TraceLevel.DEBUG and TRACE.detect_hanging
+        killers = self.killers[ply] if self.use_killers and ply < MAX_PLY else (0, 0)
+        # lance da TT mesmo quando a profundidade guardada não basta para o corte
+        hash_code = entry[3] if entry is not None else 0
+        moves = self._staged_moves(board, player, hash_code, killers)
+
+        best_val = -math.inf
+        best_move: Optional[Move] = None
+        # futility pruning: descarta moves simples em profundidade rasa usando alpha original para evitar não-determinismo
+        for i, mv in enumerate(moves):
+            undo = board.make_move(mv)
+            if trace_hanging and not mv.is_capture() and (hanging_pieces(board, player) >> mv.dest) & 1:
+                TRACE.emit(TraceLevel.DEBUG, 'hanging', depth=depth, move=mv, alpha=alpha, forced=True)
+            if depth <= self.futility_depth and not mv.is_capture():
+                # futility pruning usando avaliação do lado atual para consistência
+                static_val = self.eval_side(board, player)
+                if static_val <= alpha_orig - self.futility_margin:
+                    board.unmake_move(undo)
+                    continue
+            if i == 0 or alpha == -math.inf:
+                val = -self.negamax(board, depth - 1, -beta, -alpha, opponent, ply + 1)[0]
             else:
-                beta = min(beta, val_stored)
+                # LMR: lances quietos tardios (exceto killers) em profundidade reduzida
+                reduction = 0
+                if (self.use_lmr and depth >= self.lmr_min_depth and i >= self.lmr_min_move
+                        and not mv.is_capture() and mv.code not in killers):
+                    reduction = self.lmr_reduction
+                if self.use_pvs:
+                    # janela nula: só prova que o lance não supera alpha
+                    val = -self.negamax(board, depth - 1 - reduction, -alpha - NULL_WINDOW, -alpha, opponent, ply + 1)[0]
+                    if val > alpha and (reduction or val < beta):
+                        val = -self.negamax(board, depth - 1, -beta, -alpha, opponent, ply + 1)[0]
+                else:
+                    val = -self.negamax(board, depth - 1 - reduction, -beta, -alpha, opponent, ply + 1)[0]
+                    if reduction and val > alpha:
+                        val = -self.negamax(board, depth - 1, -beta, -alpha, opponent, ply + 1)[0]
+            board.unmake_move(undo)
+            if val > best_val:
+                best_val, best_move = val, mv
+            alpha = max(alpha, val)
             if alpha >= beta:
-                return val_stored, mv_stored
+                self.beta_cutoffs += 1
+                if i == 0:
+                    self.first_move_cutoffs += 1
+                # history heuristic: penaliza movimentos não-capture que causam cutoff (ranking positivo)
+                if not mv.is_capture():
+                    key_move = mv.from_to
+                    self.history[key_move] = self.history.get(key_move, 0) + HISTORY_CUTOFF_BONUS(depth)
+                    if self.use_killers and ply < MAX_PLY and killers[0] != mv.code:
+                        killers[1] = killers[0]
+                        killers[0] = mv.code
+                break
 
-    # nó terminal ─────────────────────────────────────────────────
-    if depth == 0:
-        # quiescence somente se habilitado e posição quieta
-        if USE_QUIESCENCE and is_quiet(board, player):
-            val = qsearch(board, alpha, beta, player)
-        else:
-            val = eval_side(board, player)
-        return val, None
-
-    # gera e ordena movimentos (MVV-LVA)
-    moves = generate_moves(board, player)
-    move_cache = {
-        Color.WHITE: moves, 
-        Color.BLACK: generate_moves(board, Color.BLACK if player == Color.WHITE else Color.WHITE)
-    }
-    score = evaluate(board, move_cache)
-    # SEE DEBUG (temporariamente desativado): imprimindo quando haveria forced capture
-    filtered_moves: List[Move] = []
-    opponent = Color.BLACK if player == Color.WHITE else Color.WHITE
-    for mv in moves:
-        if mv.is_capture():
-            filtered_moves.append(mv)
+        # Armazena resultado na Transposition Table
+        if best_val <= alpha_orig:
+            bound_type = BoundType.UPPER
+        elif best_val >= beta_orig:
+            bound_type = BoundType.LOWER
         else:
-            b2 = apply_move(board, mv)
-            # verifica se haveria captura forçada em mv.path[-1]
-            forced = any(
-                opp_mv.is_capture() and mv.path[-1] in opp_mv.captured
-                for opp_mv in generate_moves(b2, opponent)
-            )
-            if forced:
-                debug_move(depth, mv, score, forced)
-            # mantém todos os movimentos (não descarto mais)
-            filtered_moves.append(mv)
-    moves = filtered_moves
-    # ordena movimentos: capturas primeiro, por mvv-lva (calculado só para capturas), history heuristic e PSQT
-    moves.sort(
-        key=lambda mv: (
-            -int(mv.is_capture()),
-            -(mvv_lva_score(mv, board, player) if mv.is_capture() else 0),
-            -HISTORY.get((mv.path[0], mv.path[-1]), 0),
-            0 if mv.is_capture() else -PSQT_MAN[mv.path[-1]]
-        )
-    )
-
-    best_val = -math.inf
-    best_move: Optional[Move] = None
-    # futility pruning: descarta moves simples em profundidade rasa usando alpha original para evitar não-determinismo
-    for mv in moves:
-        next_board = apply_move(board, mv)
-        if depth <= FUTILITY_DEPTH and not mv.is_capture():
-            # futility pruning usando avaliação do lado atual para consistência
-            static_val = eval_side(next_board, player)
-            if static_val <= alpha_orig - FUTILITY_MARGIN:
-                continue
-        val, _ = negamax(next_board, depth - 1, -beta, -alpha, opponent)
-        val = -val
-        if val > best_val:
-            best_val, best_move = val, mv
-        alpha = max(alpha, val)
-        if alpha >= beta:
-            # history heuristic: penaliza movimentos não-capture que causam cutoff (ranking positivo)
-            if not mv.is_capture():
-                key_move = (mv.path[0], mv.path[-1])
-                HISTORY[key_move] = HISTORY.get(key_move, 0) + HISTORY_CUTOFF_BONUS(depth)
-            break
-
-    # Armazena resultado na Transposition Table
-    if best_val <= alpha_orig:
-        bound_type = BoundType.UPPER
-    elif best_val >= beta_orig:
-        bound_type = BoundType.LOWER
-    else:
-        bound_type = BoundType.EXACT
-    TT[key] = (depth, best_val, bound_type, best_move)
-    # history heuristic: reforça movimento que foi efetivamente escolhido
-    if best_move is not None and not best_move.is_capture():
-        key_best = (best_move.path[0], best_move.path[-1])
-        HISTORY[key_best] = HISTORY.get(key_best, 0) + HISTORY_CUTOFF_BONUS(depth)
-    return best_val, best_move
-
-def suggest_move(board: Board, max_depth: int = MAX_SEARCH_DEPTH, player: Color = Color.WHITE, debug: bool = False) -> Optional[Move]:
-    """Se debug=True, imprime para cada profundidade quantos nós foram buscados e o melhor movimento."""
-    best_move: Optional[Move] = None
-    for d in range(1, max_depth + 1):
-        if debug:
-            start_nodes = nodes
-        value, mv = negamax(board, d, -math.inf, math.inf, player)
+            bound_type = BoundType.EXACT
+        tt.store(key, depth, best_val, bound_type,
+                 best_move.code if best_move is not None and bound_type != BoundType.UPPER else 0)
+        # history heuristic: reforça movimento que foi efetivamente escolhido
+        if best_move is not None and not best_move.is_capture():
+            key_best = best_move.from_to
+            self.history[key_best] = self.history.get(key_best, 0) + HISTORY_CUTOFF_BONUS(depth)
+        return best_val, best_move
+
+    def suggest_move(self, board: Board, max_depth: int = MAX_SEARCH_DEPTH, player: Color = Color.WHITE,
+                     debug: bool = False, tt_path: Optional[str] = None, time_limit: Optional[float] = None,
+                     node_limit: Optional[int] = None, workers: int = 1,
+                     progress: Optional[ProgressCallback] = None,
+                     stop_event: Optional[threading.Event] = None,
+                     stats_callback: Optional[StatsCallback] = None) -> Optional[Move]:
+        """
+        Iterative deepening até max_depth, opcionalmente limitado por tempo (segundos) e/ou nós.
+        Com orçamento, a busca é interrompida no meio da iteração e devolve o melhor lance da
+        última profundidade completa; uma nova iteração só começa se a previsão do seu custo
+        (custo da anterior × crescimento observado) couber no que resta. A profundidade 1 sempre
+        completa, garantindo um lance.
+        Se debug=True, imprime para cada profundidade quantos nós foram buscados e o melhor movimento.
+        Se tt_path for dado, a tabela de transposição é mapeada desse arquivo e gravada ao final,
+        reaproveitando resultados entre execuções e processos.
+        Com workers > 1 os lances da raiz são buscados em paralelo por processos
+        (parallel.py, modo determinístico); só max_depth vale como limite. Os workers
+        consultam a tablebase e, só para leitura, a TT mapeada (tt_path ou a já aberta);
+        uma TT em memória não é compartilhada.
+        `progress`, se dado, é chamado ao fim de cada iteração completa (na thread da busca).
+        `stop_event` permite interromper a busca de outra thread (stop_event.set()): é
+        conferido junto com o orçamento e tem o mesmo efeito de um prazo esgotado.
+        Com um livro de aberturas (self.book), um lance legal do livro é devolvido sem busca.
+        As estatísticas da busca (SearchStats) ficam em self.last_stats e, se dado, são
+        passadas a `stats_callback` ao final.
+        """
+        stats = SearchStats()
+        self.last_stats = stats
+        start_time = time.perf_counter()
+        before = self._counters()
+        if self.book is not None:
+            mv = self.book.best_move(board, player)
+            if mv is not None:
+                if TRACE.level >= TraceLevel.INFO:
+                    TRACE.emit(TraceLevel.INFO, 'book', move=mv)
+                stats.source, stats.best_move = 'book', str(mv)
+                self._finish_stats(stats, before, start_time, stats_callback)
+                return mv
+        if workers > 1:
+            if time_limit is not None or node_limit is not None:
+                raise ValueError("busca paralela aceita só max_depth como limite")
+            # importado aqui: parallel depende deste módulo
+            from parallel import parallel_search
+            if tt_path is not None and self.tt.path != tt_path:
+                self.open_tt(tt_path, self.tt.size_mb)
+            shared_tt = self.tt.path
+            reopen = shared_tt is not None and not self.tt.readonly
+            if reopen:
+                # os workers mapeiam o arquivo só para leitura: fica fechado (limpo) durante a busca
+                self.tt.close()
+            try:
+                move, value, searched = parallel_search(
+                    board, player, max_depth, workers, params=self.params, tt_path=shared_tt,
+                    tablebase_path=self.tablebase.path if self.tablebase is not None else None)
+            finally:
+                if reopen:
+                    self.open_tt(shared_tt, self.tt.size_mb)
+            before = self._counters()
+            self.nodes += searched
+            stats.source, stats.depth, stats.value = 'parallel', max_depth, value
+            stats.best_move = str(move) if move is not None else None
+            self._finish_stats(stats, before, start_time, stats_callback)
+            return move
+        if tt_path is not None and self.tt.path != tt_path:
+            self.open_tt(tt_path, self.tt.size_mb)
+            before = self._counters()
+        best_move: Optional[Move] = None
+        # a busca trabalha in-place sobre uma cópia mutável
+        board = board.copy()
+        # envelhece entradas das buscas anteriores
+        self.tt.new_search()
+        start_nodes = self.nodes
+        deadline = start_time + time_limit if time_limit is not None else None
+        node_stop = start_nodes + node_limit if node_limit is not None else None
+        # custo (segundos, nós) das duas últimas iterações completas
+        last_cost: Optional[Tuple[float, int]] = None
+        growth = DEFAULT_ITERATION_GROWTH
+        prev_value: Optional[float] = None
+        for slots in self.killers:
+            slots[0] = slots[1] = 0
+        try:
+            for d in range(1, max_depth + 1):
+                iter_time, iter_nodes = time.perf_counter(), self.nodes
+                # a primeira iteração roda sem limites (nem parada)
+                if best_move is not None:
+                    self._stop_event = stop_event
+                    self._set_limits(deadline, node_stop)
+                else:
+                    self._stop_event = None
+                    self._set_limits(None, None)
+                try:
+                    if self.use_aspiration and prev_value is not None and math.isfinite(prev_value):
+                        # janela de aspiração; se o valor cair fora, repete com janela cheia
+                        alpha, beta = prev_value - self.aspiration_window, prev_value + self.aspiration_window
+                        value, mv = self.negamax(board, d, alpha, beta, player)
+                        if value <= alpha or value >= beta:
+                            value, mv = self.negamax(board, d, -math.inf, math.inf, player)
+                    else:
+                        value, mv = self.negamax(board, d, -math.inf, math.inf, player)
+                except SearchAborted:
+                    if debug:
+                        print(f"[DEBUG] Depth={d}: abortada após {self.nodes - iter_nodes} nós")
+                    break
+                now = time.perf_counter()
+                cost = (now - iter_time, self.nodes - iter_nodes)
+                if debug:
+                    print(f"[DEBUG] Depth={d}: nodes={cost[1]}, best_move={mv}, value={value:.2f}")
+                if TRACE.level >= TraceLevel.INFO:
+                    TRACE.emit(TraceLevel.INFO, 'iteration', depth=d, move=mv, score=value, nodes=self.nodes)
+                if mv is not None:
+                    best_move = mv
+                prev_value = value
+                stats.depth, stats.value = d, value
+                stats.iterations.append({'depth': d, 'nodes': cost[1], 'seconds': cost[0], 'value': value,
+                                         'move': str(mv) if mv is not None else None})
+                if progress is not None:
+                    progress(d, value, best_move, self.nodes - start_nodes)
+                # previsão: a próxima iteração custa a atual × crescimento observado
+                if last_cost is not None and last_cost[1] > 0:
+                    growth = min(max(cost[1] / last_cost[1], 1.5), 10.0)
+                last_cost = cost
+                if deadline is not None and now + cost[0] * growth > deadline:
+                    break
+                if node_stop is not None and self.nodes + cost[1] * growth > node_stop:
+                    break
+        finally:
+            self._stop_event = None
+            self._set_limits(None, None)
+        self.tt.flush()
+        stats.best_move = str(best_move) if best_move is not None else None
+        self._finish_stats(stats, before, start_time, stats_callback)
         if debug:
-            nodes_searched = nodes - start_nodes
-            print(f"[DEBUG] Depth={d}: nodes={nodes_searched}, best_move={mv}, value={value:.2f}")
-        if mv is not None:
-            best_move = mv
-    return best_move
+            print(f"[DEBUG] TT fill={self.tt.fill_rate():.1%} hit_rate={self.tt.hit_rate():.1%}")
+            print(f"[DEBUG] {stats}")
+        return best_move
+
+    def _finish_stats(self, stats: SearchStats, before: Dict[str, float], start_time: float,
+                      callback: Optional[StatsCallback]) -> None:
+        stats.seconds = time.perf_counter() - start_time
+        after = self._counters()
+        for name in SearchStats.COUNTERS:
+            setattr(stats, name, after[name] - before[name])
+        if self._instrument:
+            for name in SearchStats.TIMED:
+                for field in (f'{name}_calls', f'{name}_seconds'):
+                    setattr(stats, field, after[field] - before[field])
+        if callback is not None:
+            callback(stats)
+
+    def search(self, board: Board, max_depth: int = MAX_SEARCH_DEPTH, player: Color = Color.WHITE,
+               **options) -> Tuple[Optional[Move], SearchStats]:
+        """suggest_move (mesmas opções) devolvendo (lance, SearchStats)."""
+        move = self.suggest_move(board, max_depth, player, **options)
+        return move, self.last_stats
+
+# --- engine padrão e API de módulo ---
+# As funções abaixo mantêm a API anterior à classe Engine, delegando a um engine
+# padrão construído a partir das constantes de tuning do módulo.
+_DEFAULT_ENGINE = Engine()
+
+# estado do engine padrão visível como atributo do módulo (engine.TT, engine.nodes, ...)
+_DEFAULT_STATE = {
+    'TT': 'tt',
+    'HISTORY': 'history',
+    'KILLERS': 'killers',
+    'nodes': 'nodes',
+    'last_stats': 'last_stats',
+    '_PST_MAN_WEIGHTED': '_pst_man',
+    '_PST_KING_WEIGHTED': '_pst_king',
+}
+
+# constante de tuning do módulo -> parâmetro do engine padrão
+_CONSTANT_PARAMS = {const: name for name, const in _PARAM_DEFAULTS.items()}
+
+def __getattr__(name: str):
+    if name in _DEFAULT_STATE:
+        return getattr(_DEFAULT_ENGINE, _DEFAULT_STATE[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class _EngineModule(types.ModuleType):
+    """
+    Encaminha escritas de fora no módulo ao engine padrão: engine.nodes = 0 altera o
+    contador do engine e engine.USE_QUIESCENCE = False o reconfigura (como configure).
+    """
+    def __setattr__(self, name: str, value) -> None:
+        if name in _DEFAULT_STATE:
+            setattr(_DEFAULT_ENGINE, _DEFAULT_STATE[name], value)
+            return
+        super().__setattr__(name, value)
+        if name in _CONSTANT_PARAMS:
+            _DEFAULT_ENGINE.configure(**{_CONSTANT_PARAMS[name]: value})
+
+sys.modules[__name__].__class__ = _EngineModule
+
+def default_engine() -> Engine:
+    """Engine usado pelas funções de módulo."""
+    return _DEFAULT_ENGINE
+
+def rebuild_eval_tables() -> None:
+    """
+    Recarrega no engine padrão os parâmetros das constantes do módulo (PSQT_MAN/PSQT_KING,
+    PST_WEIGHT, BORDER_PST_FACTOR, ...). Atribuições (engine.PST_WEIGHT = ...) já são
+    aplicadas; chame após alterar uma tabela no lugar (engine.PSQT_MAN[i] = ...).
+    """
+    _DEFAULT_ENGINE.configure(**default_params())
+
+def evaluate(board: Board, move_cache: Optional[Dict[Color, List[Move]]] = None) -> float:
+    return _DEFAULT_ENGINE.evaluate(board, move_cache)
+
+def eval_side(board: Board, player: Color) -> float:
+    return _DEFAULT_ENGINE.eval_side(board, player)
+
+def eval_fingerprint() -> int:
+    return _DEFAULT_ENGINE.eval_fingerprint()
+
+def resize_tt(size_mb: float) -> None:
+    _DEFAULT_ENGINE.resize_tt(size_mb)
+
+def open_tt(path: str, size_mb: float = DEFAULT_TT_MB, readonly: bool = False) -> TranspositionTable:
+    return _DEFAULT_ENGINE.open_tt(path, size_mb, readonly)
+
+def save_tt(path: str) -> None:
+    _DEFAULT_ENGINE.save_tt(path)
+
+def load_tt(path: str) -> TranspositionTable:
+    return _DEFAULT_ENGINE.load_tt(path)
+
+def qsearch(board: Board, alpha: float, beta: float, player: Color) -> float:
+    return _DEFAULT_ENGINE.qsearch(board, alpha, beta, player)
+
+def _staged_moves(board: Board, player: Color, hash_code: int, killers) -> Iterator[Move]:
+    return _DEFAULT_ENGINE._staged_moves(board, player, hash_code, killers)
+
+def negamax(board: Board, depth: int, alpha: float, beta: float, player: Color,
+            ply: int = 0) -> Tuple[float, Optional[Move]]:
+    return _DEFAULT_ENGINE.negamax(board, depth, alpha, beta, player, ply)
+
+def suggest_move(board: Board, max_depth: int = MAX_SEARCH_DEPTH, player: Color = Color.WHITE, debug: bool = False,
+                 tt_path: Optional[str] = None, time_limit: Optional[float] = None,
+                 node_limit: Optional[int] = None, workers: int = 1,
+                 progress: Optional[ProgressCallback] = None,
+                 stop_event: Optional[threading.Event] = None,
+                 stats_callback: Optional[StatsCallback] = None) -> Optional[Move]:
+    return _DEFAULT_ENGINE.suggest_move(board, max_depth, player, debug, tt_path, time_limit, node_limit,
+                                        workers, progress, stop_event, stats_callback)
+
+def search(board: Board, max_depth: int = MAX_SEARCH_DEPTH, player: Color = Color.WHITE,
+           **options) -> Tuple[Optional[Move], SearchStats]:
+    return _DEFAULT_ENGINE.search(board, max_depth, player, **options)
@@ -0,0 +1,385 @@
+"""
+Partidas engine contra engine para testes de regressão de força.
+
+Duas configurações de Engine (parâmetros de avaliação/busca) jogam a partir de um
+conjunto de aberturas, cada abertura duas vezes com as cores trocadas. As partidas
+rodam num pool de processos com limite por lance (profundidade, tempo ou nós) e são
+gravadas à medida que terminam, uma linha JSON por partida. O relatório traz Elo com
+margem de 95%, o veredito do SPRT, profundidade média e nós/s de cada lado.
+
+Regras de término: sem lances legais o lado a jogar perde; empate por repetição
+(mesma posição pela terceira vez), por 20 lances de cada lado só com damas e sem
+captura, ou pelo limite de lances da partida.
+
+Uso:
+    python match.py --b mobility_weight=0.15 --depth 4 --games 200 --workers 8 --output games.jsonl
+    python match.py --a-params base.json --b-params tuned.json --time 0.1 --sprt 0 10
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import utils
+from board import Board
+from engine import MAX_SEARCH_DEPTH, Color, Engine, generate_moves, position_key
+from move import Move
+
+# limites da partida
+MAX_GAME_PLIES      = 300
+KING_ONLY_PLIES     = 40    # 20 lances de cada lado só com damas, sem captura
+REPETITION_COUNT    = 3
+
+# SPRT padrão: H0 elo0 = 0 contra H1 elo1 = 5, erros alfa = beta = 5%
+SPRT_ELO0  = 0.0
+SPRT_ELO1  = 5.0
+SPRT_ALPHA = 0.05
+SPRT_BETA  = 0.05
+# partidas fictícias somadas quando todas têm o mesmo resultado (variância nula)
+REGULARIZATION_GAMES = 0.5
+
+# resultados do ponto de vista das brancas
+WHITE_WINS = '1-0'
+BLACK_WINS = '0-1'
+DRAW       = '1/2-1/2'
+
+
+# --- notação e registros ---
+def move_notation(mv: Move) -> str:
+    """'9-13' para lances simples, '9x18x27' (casas do caminho) para capturas."""
+    if mv.is_capture():
+        return 'x'.join(map(str, mv.path))
+    return f"{mv.origin}-{mv.dest}"
+
+
+def parse_move(board: Board, player: Color, text: str) -> Move:
+    """Lance legal de `player` com a notação `text`; ValueError se não houver."""
+    for mv in generate_moves(board, player):
+        if move_notation(mv) == text:
+            return mv
+    raise ValueError(f"lance ilegal: {text}")
+
+
+def replay_game(record: Dict[str, object]) -> Iterator[Tuple[Board, Color, Move]]:
+    """Posições de uma partida gravada: (tabuleiro antes do lance, lado a jogar, lance), abertura incluída."""
+    board, player = Board.initial(), Color.WHITE
+    for text in list(record['opening']) + list(record['moves']):
+        mv = parse_move(board, player, text)
+        yield board.copy(), player, mv
+        board.make_move(mv)
+        player = Color.BLACK if player == Color.WHITE else Color.WHITE
+
+
+def read_games(path: str) -> Iterator[Dict[str, object]]:
+    """Partidas de um arquivo JSONL gravado por run_match."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def opening_lines(plies: int) -> List[List[str]]:
+    """Sequências de `plies` lances a partir da inicial, uma por posição final distinta (ordem do gerador)."""
+    lines: List[List[str]] = [[]]
+    frontier = [(Board.initial(), Color.WHITE, [])]
+    for _ in range(plies):
+        seen = set()
+        next_frontier = []
+        for board, player, line in frontier:
+            opponent = Color.BLACK if player == Color.WHITE else Color.WHITE
+            for mv in generate_moves(board, player):
+                child = board.copy()
+                child.make_move(mv)
+                key = position_key(child, opponent)
+                if key not in seen and generate_moves(child, opponent):
+                    seen.add(key)
+                    next_frontier.append((child, opponent, line + [move_notation(mv)]))
+        frontier = next_frontier
+        lines = [line for _, _, line in frontier]
+    return lines
+
+
+def select_openings(lines: Sequence[List[str]], count: Optional[int]) -> List[List[str]]:
+    """`count` aberturas espaçadas igualmente em `lines` (todas se count for None)."""
+    if count is None or count >= len(lines):
+        return list(lines)
+    return [lines[i * len(lines) // count] for i in range(count)]
+
+
+# --- partidas (rodam nos workers) ---
+# engines deste processo, por configuração (reaproveitados entre partidas, limpos a cada uma)
+_ENGINES: Dict[str, Engine] = {}
+
+
+def _engine_for(config: Dict[str, object]) -> Engine:
+    key = json.dumps(config, sort_keys=True)
+    if key not in _ENGINES:
+        _ENGINES[key] = Engine(params=config.get('params') or None)
+    return _ENGINES[key]
+
+
+def _worker_init() -> None:
+    # workers não emitem trace (os sinks do processo pai não são compartilhados)
+    utils.TRACE.disable()
+
+
+def play_game(game: int, opening: List[str], white: Dict[str, object], black: Dict[str, object],
+              limits: Dict[str, object], max_plies: int = MAX_GAME_PLIES) -> Dict[str, object]:
+    """
+    Joga uma partida a partir da abertura `opening` (notação) entre as configurações
+    `white` e `black` ({'name': ..., 'params': {...}}); `limits` tem 'depth', 'time'
+    e/ou 'nodes' por lance. Retorna o registro da partida.
+    """
+    engines = {Color.WHITE: _engine_for(white), Color.BLACK: _engine_for(black)}
+    names = {Color.WHITE: white['name'], Color.BLACK: black['name']}
+    for eng in engines.values():
+        eng.clear()
+    stats = {name: {'moves': 0, 'depth': 0, 'nodes': 0, 'seconds': 0.0} for name in names.values()}
+
+    board, player = Board.initial(), Color.WHITE
+    for text in opening:
+        board.make_move(parse_move(board, player, text))
+        player = Color.BLACK if player == Color.WHITE else Color.WHITE
+
+    moves: List[str] = []
+    seen: Dict[int, int] = {}
+    king_only = 0
+    result, reason = DRAW, 'move_limit'
+    while len(moves) < max_plies:
+        key = position_key(board, player)
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] >= REPETITION_COUNT:
+            result, reason = DRAW, 'repetition'
+            break
+        if king_only >= KING_ONLY_PLIES:
+            result, reason = DRAW, 'king_moves'
+            break
+        eng = engines[player]
+        depth = []
+        start_nodes, start = eng.nodes, time.perf_counter()
+        mv = eng.suggest_move(board, max_depth=limits.get('depth') or MAX_SEARCH_DEPTH, player=player,
+                              time_limit=limits.get('time'), node_limit=limits.get('nodes'),
+                              progress=lambda d, value, best, nodes: depth.append(d))
+        if mv is None:
+            result = BLACK_WINS if player == Color.WHITE else WHITE_WINS
+            reason = 'no_moves'
+            break
+        s = stats[names[player]]
+        s['moves'] += 1
+        s['depth'] += depth[-1] if depth else 0
+        s['nodes'] += eng.nodes - start_nodes
+        s['seconds'] += time.perf_counter() - start
+
+        kings = board.kings_white if player == Color.WHITE else board.kings_black
+        king_only = king_only + 1 if (kings >> mv.origin) & 1 and not mv.is_capture() else 0
+        moves.append(move_notation(mv))
+        board.make_move(mv)
+        player = Color.BLACK if player == Color.WHITE else Color.WHITE
+
+    return {'game': game, 'opening': opening, 'white': names[Color.WHITE], 'black': names[Color.BLACK],
+            'result': result, 'reason': reason, 'moves': moves, 'stats': stats}
+
+
+# --- estatística ---
+def _score_stats(wins: int, draws: int, losses: int) -> Tuple[int, float, float]:
+    """
+    (partidas, pontuação média, variância por partida). Se todas as partidas têm o mesmo
+    resultado a variância seria zero (SPRT e margem do Elo degeneram): soma-se então
+    REGULARIZATION_GAMES partidas fictícias (empates após só vitórias ou só derrotas;
+    metade vitórias, metade derrotas após só empates).
+    """
+    n = wins + draws + losses
+    if n == 0:
+        return 0, 0.5, 0.0
+    if draws == n:
+        wins, losses = wins + REGULARIZATION_GAMES / 2, losses + REGULARIZATION_GAMES / 2
+    elif wins == n or losses == n:
+        draws = draws + REGULARIZATION_GAMES
+    total = wins + draws + losses
+    score = (wins + 0.5 * draws) / total
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / total
+    return n, score, variance
+
+
+def _elo_from_score(score: float) -> float:
+    if score <= 0.0:
+        return -math.inf
+    if score >= 1.0:
+        return math.inf
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def elo(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """Diferença de Elo (logística) e meia-largura do intervalo de 95%."""
+    n, score, variance = _score_stats(wins, draws, losses)
+    if n == 0:
+        return 0.0, math.inf
+    margin = 1.96 * math.sqrt(variance / n)
+    # limites do intervalo presos às pontuações regularizadas de só derrotas / só vitórias
+    edge = REGULARIZATION_GAMES / (2 * (n + REGULARIZATION_GAMES))
+    low = _elo_from_score(max(score - margin, edge))
+    high = _elo_from_score(min(score + margin, 1 - edge))
+    return _elo_from_score(score), (high - low) / 2
+
+
+def sprt(wins: int, draws: int, losses: int, elo0: float = SPRT_ELO0, elo1: float = SPRT_ELO1,
+         alpha: float = SPRT_ALPHA, beta: float = SPRT_BETA) -> Dict[str, object]:
+    """
+    SPRT de H0 (diferença = elo0) contra H1 (diferença = elo1) com a aproximação normal
+    do resultado trinomial. verdict: 'H1' (mais forte), 'H0' (não mais forte) ou None (continuar).
+    """
+    lower, upper = math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+    n, score, variance = _score_stats(wins, draws, losses)
+    s0 = 1 / (1 + 10 ** (-elo0 / 400))
+    s1 = 1 / (1 + 10 ** (-elo1 / 400))
+    llr = n * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance) if variance > 0 else 0.0
+    verdict = 'H1' if llr >= upper else 'H0' if llr <= lower else None
+    return {'llr': llr, 'lower': lower, 'upper': upper, 'verdict': verdict, 'elo0': elo0, 'elo1': elo1}
+
+
+def _outcome(record: Dict[str, object], name: str) -> int:
+    """+1, 0 ou -1: resultado da partida para o engine `name`."""
+    if record['result'] == DRAW:
+        return 0
+    return 1 if (record['result'] == WHITE_WINS) == (record['white'] == name) else -1
+
+
+def summarize(records: Sequence[Dict[str, object]], name_a: str, name_b: str,
+              sprt_args: Optional[Dict[str, float]] = None) -> Dict[str, object]:
+    """Relatório do ponto de vista de `name_a`: V/E/D, Elo, SPRT e estatísticas de busca por engine."""
+    wins = draws = losses = 0
+    totals = {name: {'moves': 0, 'depth': 0, 'nodes': 0, 'seconds': 0.0} for name in (name_a, name_b)}
+    reasons: Dict[str, int] = {}
+    for r in records:
+        reasons[r['reason']] = reasons.get(r['reason'], 0) + 1
+        outcome = _outcome(r, name_a)
+        wins += outcome > 0
+        draws += outcome == 0
+        losses += outcome < 0
+        for name, s in r['stats'].items():
+            for field in totals[name]:
+                totals[name][field] += s[field]
+    diff, margin = elo(wins, draws, losses)
+    engines = {name: {'moves': t['moves'],
+                      'avg_depth': t['depth'] / t['moves'] if t['moves'] else 0.0,
+                      'nodes_per_sec': t['nodes'] / t['seconds'] if t['seconds'] else 0.0}
+               for name, t in totals.items()}
+    return {'games': wins + draws + losses, 'wins': wins, 'draws': draws, 'losses': losses,
+            'score': (wins + 0.5 * draws) / len(records) if records else 0.5, 'elo': diff, 'elo_margin': margin,
+            'sprt': sprt(wins, draws, losses, **(sprt_args or {})), 'reasons': reasons, 'engines': engines}
+
+
+# --- execução ---
+def run_match(engine_a: Dict[str, object], engine_b: Dict[str, object], openings: Sequence[List[str]],
+              limits: Dict[str, object], workers: int = 1, output: Optional[TextIO] = None,
+              max_plies: int = MAX_GAME_PLIES, sprt_args: Optional[Dict[str, float]] = None,
+              stop_on_sprt: bool = False) -> Dict[str, object]:
+    """
+    Joga cada abertura duas vezes (A de brancas, depois de pretas) e retorna o relatório
+    de summarize. Cada partida é escrita em `output` (JSONL) assim que termina.
+    Com stop_on_sprt, as partidas pendentes são canceladas quando o SPRT conclui.
+    """
+    tasks = []
+    for opening in openings:
+        tasks.append((len(tasks), opening, engine_a, engine_b, limits, max_plies))
+        tasks.append((len(tasks), opening, engine_b, engine_a, limits, max_plies))
+    records: List[Dict[str, object]] = []
+    # vitórias, empates e derrotas de A até aqui
+    tally = [0, 0, 0]
+
+    def finished(record: Dict[str, object]) -> bool:
+        records.append(record)
+        if output is not None:
+            output.write(json.dumps(record, separators=(',', ':')) + '\n')
+            output.flush()
+        tally[1 - _outcome(record, engine_a['name'])] += 1
+        return stop_on_sprt and sprt(*tally, **(sprt_args or {}))['verdict'] is not None
+
+    if workers == 1:
+        for task in tasks:
+            if finished(play_game(*task)):
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            pending = {pool.submit(play_game, *task) for task in tasks}
+            stop = False
+            while pending and not stop:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stop = finished(future.result()) or stop
+            for future in pending:
+                future.cancel()
+    records.sort(key=lambda r: r['game'])
+    return summarize(records, engine_a['name'], engine_b['name'], sprt_args)
+
+
+def _config(name: str, params_path: Optional[str], overrides: Sequence[str]) -> Dict[str, object]:
+    """Configuração de engine a partir de um JSON de parâmetros e de pares nome=valor (valor em JSON)."""
+    params: Dict[str, object] = {}
+    if params_path:
+        with open(params_path) as f:
+            params.update(json.load(f))
+    for item in overrides:
+        key, _, value = item.partition('=')
+        try:
+            params[key] = json.loads(value)
+        except json.JSONDecodeError:
+            params[key] = value
+    Engine(tt_mb=0, params=params)  # valida os nomes antes de iniciar os workers
+    return {'name': name, 'params': params}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Partidas engine contra engine com Elo e SPRT")
+    parser.add_argument('--a', nargs='*', default=[], metavar='NOME=VALOR', help="parâmetros do engine A")
+    parser.add_argument('--b', nargs='*', default=[], metavar='NOME=VALOR', help="parâmetros do engine B")
+    parser.add_argument('--a-params', help="JSON de parâmetros do engine A (Engine.save_params)")
+    parser.add_argument('--b-params', help="JSON de parâmetros do engine B")
+    parser.add_argument('--depth', type=int, help="profundidade por lance")
+    parser.add_argument('--time', type=float, help="segundos por lance")
+    parser.add_argument('--nodes', type=int, help="nós por lance")
+    parser.add_argument('--opening-plies', type=int, default=2)
+    parser.add_argument('--games', type=int, help="número de partidas (pares de cores; padrão: todas as aberturas)")
+    parser.add_argument('--max-plies', type=int, default=MAX_GAME_PLIES)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--sprt', nargs=2, type=float, metavar=('ELO0', 'ELO1'), default=(SPRT_ELO0, SPRT_ELO1))
+    parser.add_argument('--stop-on-sprt', action='store_true', help="encerra quando o SPRT concluir")
+    parser.add_argument('--output', help="arquivo JSONL das partidas")
+    args = parser.parse_args(argv)
+
+    if args.depth is None and args.time is None and args.nodes is None:
+        args.depth = 4
+    utils.TRACE.disable()
+    engine_a = _config('A', args.a_params, args.a)
+    engine_b = _config('B', args.b_params, args.b)
+    pairs = None if args.games is None else max(1, args.games // 2)
+    openings = select_openings(opening_lines(args.opening_plies), pairs)
+    limits = {'depth': args.depth, 'time': args.time, 'nodes': args.nodes}
+    sprt_args = {'elo0': args.sprt[0], 'elo1': args.sprt[1]}
+
+    output = open(args.output, 'w') if args.output else None
+    try:
+        report = run_match(engine_a, engine_b, openings, limits, args.workers, output,
+                           args.max_plies, sprt_args, args.stop_on_sprt)
+    finally:
+        if output is not None:
+            output.close()
+
+    s = report['sprt']
+    print(f"partidas={report['games']}  A: +{report['wins']} ={report['draws']} -{report['losses']}  "
+          f"pontuação={report['score']:.3f}")
+    print(f"Elo(A-B)={report['elo']:+.1f} ± {report['elo_margin']:.1f}")
+    print(f"SPRT [{s['elo0']:g}, {s['elo1']:g}]: LLR={s['llr']:.2f} ({s['lower']:.2f}, {s['upper']:.2f})  "
+          f"veredito={s['verdict'] or 'inconclusivo'}")
+    for name, e in report['engines'].items():
+        print(f"{name}: profundidade média={e['avg_depth']:.2f}  nós/s={e['nodes_per_sec']:.0f}")
+    print("términos: " + ", ".join(f"{k}={v}" for k, v in sorted(report['reasons'].items())))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,21 +1,145 @@
-from typing import List
+from typing import List, Optional
+from board import Board
+
+# Codificação inteira de um movimento (Move.code):
+#   bits 0-4    origem
+#   bits 5-9    destino
+#   bits 10-41  máscara das casas capturadas
+#   bits 42+    caminho empacotado (casas intermediárias, 5 bits cada, + bit sentinela)
+_SQUARE_BITS    = 5
+_SQUARE_MASK    = (1 << _SQUARE_BITS) - 1
+_CAPTURED_SHIFT = 2 * _SQUARE_BITS
+_PATH_SHIFT     = _CAPTURED_SHIFT + 32
+# origem + destino: chave usada pela history heuristic
+FROM_TO_MASK    = (1 << _CAPTURED_SHIFT) - 1
+# origem + destino + capturadas: suficiente para aplicar o movimento
+SHORT_CODE_MASK = (1 << _PATH_SHIFT) - 1
+
+
+def pack_path(squares: List[int]) -> int:
+    """Empacota casas intermediárias (5 bits cada) com bit sentinela; lista vazia -> 0."""
+    if not squares:
+        return 0
+    packed = 0
+    shift = 0
+    for sq in squares:
+        packed |= sq << shift
+        shift += _SQUARE_BITS
+    return packed | (1 << shift)
+
+
+def unpack_path(packed: int) -> List[int]:
+    """Inverso de pack_path."""
+    squares = []
+    while packed > 1:
+        squares.append(packed & _SQUARE_MASK)
+        packed >>= _SQUARE_BITS
+    return squares
+
 
 class Move:
     """
-    Representa um movimento no tabuleiro.
-    - path: lista de índices das casas visitadas (inclui origem, capturas e destino)
-    - captured: lista de índices das peças capturadas
+    Representa um movimento no tabuleiro de forma compacta.
+    - origin: casa de origem
+    - dest: casa de destino
+    - captured_mask: bitmask das peças capturadas
+    - packed_path: casas intermediárias de capturas múltiplas (0 se o caminho é origem -> destino)
+    `path` e `captured` continuam disponíveis como listas, calculadas sob demanda.
     """
-    def __init__(self, path: List[int], captured: List[int] = None):
-        self.path = path  # Exemplo: [12, 19, 26] (origem -> destino)
-        self.captured = captured if captured is not None else []
+    __slots__ = ('origin', 'dest', 'captured_mask', 'packed_path')
+
+    def __init__(self, origin: int, dest: int, captured_mask: int = 0, packed_path: int = 0):
+        self.origin = origin
+        self.dest = dest
+        self.captured_mask = captured_mask
+        self.packed_path = packed_path
+
+    @classmethod
+    def from_path(cls, path: List[int], captured: Optional[List[int]] = None) -> 'Move':
+        """Constrói a partir da representação em listas (caminho e capturadas)."""
+        mask = 0
+        for sq in captured or ():
+            mask |= 1 << sq
+        return cls(path[0], path[-1], mask, pack_path(path[1:-1]))
+
+    @property
+    def code(self) -> int:
+        """Codificação inteira sem perdas do movimento."""
+        return (self.origin
+                | (self.dest << _SQUARE_BITS)
+                | (self.captured_mask << _CAPTURED_SHIFT)
+                | (self.packed_path << _PATH_SHIFT))
+
+    @classmethod
+    def decode(cls, code: int) -> 'Move':
+        """Inverso de `code`. Códigos truncados em SHORT_CODE_MASK perdem só o caminho."""
+        return cls(
+            code & _SQUARE_MASK,
+            (code >> _SQUARE_BITS) & _SQUARE_MASK,
+            (code >> _CAPTURED_SHIFT) & 0xFFFFFFFF,
+            code >> _PATH_SHIFT
+        )
+
+    @property
+    def from_to(self) -> int:
+        """Chave inteira (origem, destino)."""
+        return self.origin | (self.dest << _SQUARE_BITS)
+
+    @property
+    def path(self) -> List[int]:
+        """Lista das casas visitadas (origem, pousos intermediários e destino)."""
+        return [self.origin] + unpack_path(self.packed_path) + [self.dest]
+
+    @property
+    def captured(self) -> List[int]:
+        """
+        Lista das peças capturadas, na ordem em que são saltadas.
+        Levanta ValueError se um passo do caminho não é diagonal.
+        """
+        remaining = self.captured_mask
+        captured = []
+        path = self.path
+        for a, b in zip(path, path[1:]):
+            ra, ca = Board.index_to_coords(a)
+            rb, cb = Board.index_to_coords(b)
+            if ra == rb or abs(rb - ra) != abs(cb - ca):
+                if not self.packed_path:
+                    # código truncado de captura múltipla: origem -> destino não é um passo
+                    break
+                raise ValueError(f"passo {a} -> {b} do caminho não é diagonal")
+            dr = 1 if rb > ra else -1
+            dc = 1 if cb > ca else -1
+            r, c = ra + dr, ca + dc
+            while (r, c) != (rb, cb):
+                sq = Board.dark_square_index(r, c)
+                if remaining & (1 << sq):
+                    captured.append(sq)
+                    remaining &= ~(1 << sq)
+                    break
+                r += dr; c += dc
+        # caminho desconhecido (código truncado): completa em ordem de casa
+        while remaining:
+            low = remaining & -remaining
+            captured.append(low.bit_length() - 1)
+            remaining ^= low
+        return captured
 
     def is_capture(self) -> bool:
         """Retorna True se o movimento for uma captura."""
-        return len(self.captured) > 0
+        return self.captured_mask != 0
+
+    def __eq__(self, other):
+        if not isinstance(other, Move):
+            return NotImplemented
+        return (self.origin == other.origin and self.dest == other.dest
+                and self.captured_mask == other.captured_mask
+                and self.packed_path == other.packed_path)
+
+    def __hash__(self):
+        return hash(self.code)
 
     def __str__(self):
         if self.is_capture():
             return f"Capture: {' -> '.join(map(str, self.path))} | Captured: {self.captured}"
         else:
-            return f"Move: {self.path[0]} -> {self.path[-1]}" 
\ No newline at end of file
+            return f"Move: {self.origin} -> {self.dest}"
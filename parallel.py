@@ -0,0 +1,205 @@
+"""
+Busca paralela na raiz: os lances da raiz são distribuídos entre processos
+(ProcessPoolExecutor), contornando o GIL.
+
+Dois modos:
+  - determinístico: cada lance da raiz é buscado isoladamente (tabelas limpas,
+    janela cheia, iterative deepening próprio). O resultado não depende do número
+    de processos nem da ordem de término, então workers=1 e workers=N devolvem o
+    mesmo lance; empates ficam com o primeiro lance na ordem do gerador.
+  - rápido: os lances são repartidos em `workers` lotes e cada processo faz
+    alpha-beta sobre o seu lote reaproveitando TT/history entre os lances.
+    Menos nós, mas o lance escolhido pode variar com o número de processos.
+
+Uso:
+    python parallel.py --depth 8 --workers 4
+
+A tabela de transposição persistente (tt_path) é mapeada só para leitura em cada
+processo: as escritas da busca ficam no processo (copy-on-write) e são descartadas
+a cada lance no modo determinístico. A tablebase (tablebase_path) é aberta em cada
+processo a partir do diretório.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import utils
+from board import Board
+from engine import Color, Engine, generate_moves
+from move import Move
+from tablebase import Tablebase
+
+
+# (código do lance, valor, nós buscados)
+RootResult = Tuple[int, float, int]
+
+
+# engines deste processo, um por (parâmetros, TT, tablebase) (reaproveitados entre tarefas)
+_ENGINES: Dict[Tuple[str, Optional[str], Optional[str]], Engine] = {}
+
+
+def _engine_for(params: Optional[Dict[str, object]], tt_path: Optional[str] = None,
+                tablebase_path: Optional[str] = None) -> Engine:
+    key = (json.dumps(params, sort_keys=True) if params else '', tt_path, tablebase_path)
+    if key not in _ENGINES:
+        tablebase = Tablebase(tablebase_path) if tablebase_path is not None else None
+        _ENGINES[key] = Engine(params=params, tablebase=tablebase)
+    return _ENGINES[key]
+
+
+def _reset(eng: Engine, tt_path: Optional[str]) -> None:
+    """Volta o engine ao estado inicial: TT limpa ou, com tt_path, remapeada do arquivo."""
+    if tt_path is None:
+        eng.clear()
+        return
+    # remapear descarta as escritas locais (copy-on-write) das buscas anteriores
+    eng.open_tt(tt_path, readonly=True)
+    eng.history.clear()
+    for slots in eng.killers:
+        slots[0] = slots[1] = 0
+
+
+def _search_after(eng: Engine, board: Board, mv: Move, player: Color, depth: int, alpha: float) -> float:
+    """Valor de `mv` para `player` com iterative deepening até `depth` (board restaurado ao final)."""
+    opponent = Color.BLACK if player == Color.WHITE else Color.WHITE
+    undo = board.make_move(mv)
+    try:
+        value = -math.inf
+        # iterative deepening abaixo da raiz: profundidades 0 .. depth-1
+        for d in range(depth):
+            value = -eng.negamax(board, d, -math.inf, -alpha, opponent, 1)[0]
+    finally:
+        board.unmake_move(undo)
+    return value
+
+
+def search_root_moves(board: Board, player: Color, depth: int, codes: Sequence[int],
+                      deterministic: bool = True, params: Optional[Dict[str, object]] = None,
+                      tt_path: Optional[str] = None, tablebase_path: Optional[str] = None) -> List[RootResult]:
+    """
+    Busca os lances `codes` da raiz até `depth` e retorna [(código, valor, nós)].
+    No modo determinístico cada lance começa com tabelas limpas (ou recém-mapeadas de
+    tt_path) e janela cheia, e o valor é exato; no modo rápido os lances compartilham
+    tabelas e alpha, e só o melhor valor do lote é exato (os demais são limites superiores).
+    Roda tanto no processo principal quanto nos workers, num Engine próprio com `params`.
+    """
+    eng = _engine_for(params, tt_path, tablebase_path)
+    board = board.copy()
+    results: List[RootResult] = []
+    alpha = -math.inf
+    if not deterministic:
+        _reset(eng, tt_path)
+    for code in codes:
+        if deterministic:
+            _reset(eng, tt_path)
+        start_nodes = eng.nodes
+        value = _search_after(eng, board, Move.decode(code), player, depth, alpha)
+        if not deterministic:
+            alpha = max(alpha, value)
+        results.append((code, value, eng.nodes - start_nodes))
+    return results
+
+
+def _worker_init() -> None:
+    # workers não emitem trace (os sinks do processo pai não são compartilhados)
+    utils.TRACE.disable()
+
+
+def _split(codes: List[int], parts: int) -> List[List[int]]:
+    """Reparte os lances em lotes intercalados (lances bem ordenados em lotes diferentes)."""
+    return [codes[i::parts] for i in range(parts) if codes[i::parts]]
+
+
+def parallel_search(board: Board, player: Color, depth: int, workers: Optional[int] = None,
+                    deterministic: bool = True, params: Optional[Dict[str, object]] = None,
+                    tt_path: Optional[str] = None,
+                    tablebase_path: Optional[str] = None) -> Tuple[Optional[Move], float, int]:
+    """
+    Busca a raiz distribuindo os lances entre `workers` processos (padrão: os.cpu_count()).
+    `params` são os parâmetros do Engine usado em cada processo (padrão: os do módulo).
+    `tt_path` (arquivo de TT válido e fechado para escrita) é mapeado só para leitura e
+    `tablebase_path` é o diretório da tablebase consultada pela busca.
+    Retorna (melhor lance, valor, nós somados de todos os processos).
+    Com workers=1 roda no próprio processo, com o mesmo algoritmo.
+    """
+    moves = generate_moves(board, player)
+    if not moves:
+        return None, -math.inf, 0
+    workers = workers or os.cpu_count() or 1
+    codes = [mv.code for mv in moves]
+    tasks = [[code] for code in codes] if deterministic else _split(codes, workers)
+
+    results: Dict[int, Tuple[float, int]] = {}
+    if workers == 1:
+        for task in tasks:
+            for code, value, n in search_root_moves(board, player, depth, task, deterministic, params,
+                                                    tt_path, tablebase_path):
+                results[code] = (value, n)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            futures = [pool.submit(search_root_moves, board, player, depth, task, deterministic, params,
+                                   tt_path, tablebase_path)
+                       for task in tasks]
+            for future in futures:
+                for code, value, n in future.result():
+                    results[code] = (value, n)
+
+    total_nodes = sum(n for _, n in results.values())
+    # melhor valor; empate fica com o primeiro lance na ordem do gerador
+    best_index = max(range(len(codes)), key=lambda i: (results[codes[i]][0], -i))
+    best_code = codes[best_index]
+    return Move.decode(best_code), results[best_code][0], total_nodes
+
+
+def measure_speedup(board: Board, player: Color, depth: int, workers: int, deterministic: bool = True,
+                    params: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """
+    Compara a busca de um único processo (Engine.suggest_move) com a busca paralela
+    em `workers` processos, à mesma profundidade e com os mesmos `params`.
+    """
+    report: Dict[str, object] = {'depth': depth, 'workers': workers, 'deterministic': deterministic}
+    eng = Engine(params=params)
+    start = time.perf_counter()
+    move = eng.suggest_move(board, depth, player)
+    elapsed = time.perf_counter() - start
+    report['serial'] = {'seconds': elapsed, 'nodes': eng.nodes, 'best_move': str(move),
+                        'value': eng.last_stats.value}
+    start = time.perf_counter()
+    move, value, nodes = parallel_search(board, player, depth, workers, deterministic, params)
+    elapsed = time.perf_counter() - start
+    report['parallel'] = {'seconds': elapsed, 'nodes': nodes, 'best_move': str(move), 'value': value}
+    serial, parallel = report['serial'], report['parallel']
+    report['speedup'] = serial['seconds'] / parallel['seconds'] if parallel['seconds'] else 0.0
+    report['same_move'] = serial['best_move'] == parallel['best_move']
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Busca paralela na raiz e medição de speedup")
+    parser.add_argument('--depth', type=int, default=7)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--fast', action='store_true', help="modo rápido (não determinístico)")
+    parser.add_argument('--params', help="JSON de parâmetros do engine (Engine.save_params)")
+    args = parser.parse_args(argv)
+
+    params = None
+    if args.params:
+        with open(args.params) as f:
+            params = json.load(f)
+    utils.TRACE.disable()
+    report = measure_speedup(Board.initial(), Color.WHITE, args.depth, args.workers, not args.fast, params)
+    for label in ('serial', 'parallel'):
+        r = report[label]
+        value = '-' if r['value'] is None else f"{r['value']:.2f}"
+        print(f"{label:8} tempo={r['seconds']:.2f}s  nós={r['nodes']}  lance={r['best_move']}  valor={value}")
+    print(f"speedup={report['speedup']:.2f}x com {args.workers} processos  mesmo lance={report['same_move']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+perft / divide: contagem de nós da árvore de movimentos legais.
+
+Valida o gerador de movimentos (generate_moves + apply_move) contra contagens de
+referência e mede sua velocidade bruta.
+
+Uso:
+    python perft.py perft initial 6
+    python perft.py divide kings 4
+    python perft.py verify
+"""
+import argparse
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from board import Board
+from engine import generate_moves, apply_move, Color
+from move import Move
+
+
+def _squares(*squares: int) -> int:
+    mask = 0
+    for sq in squares:
+        mask |= 1 << sq
+    return mask
+
+
+# Posições de referência: nome -> (tabuleiro, lado a jogar, {profundidade: nós}).
+# As contagens são as do gerador deste repositório (captura máxima obrigatória,
+# promoção encerra a captura) e servem de regressão para qualquer mudança nele.
+REFERENCE_POSITIONS: Dict[str, Tuple[Board, Color, Dict[int, int]]] = {
+    'initial': (
+        Board.initial(),
+        Color.WHITE,
+        {1: 7, 2: 49, 3: 302, 4: 1469, 5: 7473, 6: 37628, 7: 187302},
+    ),
+    # damas dos dois lados com capturas "flyer" à distância
+    'kings': (
+        Board(_squares(0, 5, 13, 26), _squares(9, 20, 22, 31), _squares(0, 13, 26), _squares(20, 22, 31)),
+        Color.WHITE,
+        {1: 4, 2: 19, 3: 154, 4: 923, 5: 7616, 6: 67654},
+    ),
+    # capturas múltiplas de homens com escolha de caminho
+    'multi_capture': (
+        Board(_squares(1, 2, 4, 5, 6, 8), _squares(9, 10, 13, 17, 18, 25, 26)),
+        Color.WHITE,
+        {1: 4, 2: 13, 3: 47, 4: 218, 5: 1254, 6: 7669},
+    ),
+}
+
+
+def _opponent(player: Color) -> Color:
+    return Color.BLACK if player == Color.WHITE else Color.WHITE
+
+
+def perft(board: Board, player: Color, depth: int) -> int:
+    """Número de folhas da árvore de movimentos legais com `depth` lances."""
+    if depth <= 0:
+        return 1
+    moves = generate_moves(board, player)
+    if depth == 1:
+        return len(moves)
+    opponent = _opponent(player)
+    return sum(perft(apply_move(board, mv), opponent, depth - 1) for mv in moves)
+
+
+def divide(board: Board, player: Color, depth: int) -> List[Tuple[Move, int]]:
+    """perft separado por lance da raiz: [(lance, nós abaixo dele)]."""
+    opponent = _opponent(player)
+    return [(mv, perft(apply_move(board, mv), opponent, depth - 1))
+            for mv in generate_moves(board, player)]
+
+
+def verify(max_depth: int = 5) -> bool:
+    """Confere todas as posições de referência até `max_depth`; imprime e retorna o resultado."""
+    ok = True
+    for name, (board, player, counts) in REFERENCE_POSITIONS.items():
+        for depth, expected in sorted(counts.items()):
+            if depth > max_depth:
+                break
+            got = perft(board, player, depth)
+            status = "ok" if got == expected else "FALHOU"
+            ok &= got == expected
+            print(f"{name:14} d={depth}  esperado={expected:8}  obtido={got:8}  {status}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="perft / divide do gerador de movimentos")
+    sub = parser.add_subparsers(dest='command', required=True)
+    for command in ('perft', 'divide'):
+        p = sub.add_parser(command)
+        p.add_argument('position', choices=sorted(REFERENCE_POSITIONS))
+        p.add_argument('depth', type=int)
+    p = sub.add_parser('verify')
+    p.add_argument('--max-depth', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == 'verify':
+        return 0 if verify(args.max_depth) else 1
+
+    board, player, _ = REFERENCE_POSITIONS[args.position]
+    start = time.perf_counter()
+    if args.command == 'divide':
+        total = 0
+        for mv, count in divide(board, player, args.depth):
+            print(f"{mv}: {count}")
+            total += count
+    else:
+        total = perft(board, player, args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"nós={total}  tempo={elapsed:.3f}s  nós/s={total / elapsed if elapsed else 0:.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
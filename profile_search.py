@@ -0,0 +1,308 @@
+"""
+Perfil da busca: roda suggest_move num conjunto de posições sob um profiler e atribui o
+tempo às partes do caminho quente (geração, aplicação de lances, avaliação, qsearch, TT).
+
+Dois modos:
+- cprofile: determinístico (cProfile); tempo próprio exato por função, com o overhead do
+  profiler em toda chamada.
+- sampling: uma thread amostra periodicamente a pilha da thread da busca
+  (sys._current_frames); overhead baixo e pilhas completas.
+
+Cada função tem sua categoria (CATEGORIES); funções sem categoria (builtins, Move,
+helpers de bits) herdam a da chamadora categorizada mais próxima. Além do relatório em
+texto, grava as pilhas no formato "collapsed" ("a;b;c contagem" por linha), entrada de
+flamegraph.pl, speedscope e inferno. No modo cprofile só há tempo próprio por função,
+então as "pilhas" são categoria;função pesadas em microssegundos.
+
+Uso:
+    python profile_search.py --depth 7
+    python profile_search.py --depth 8 --mode sampling --sample 20 --stacks search.folded
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import utils
+from benchmarks import sample_positions
+from board import Board
+from engine import Color, Engine
+from perft import REFERENCE_POSITIONS
+
+# categoria -> {módulo: funções}; o que não está aqui herda a categoria da chamadora
+CATEGORIES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    'generation': {
+        'engine': ('generate_moves', '_search_man_captures', '_search_king_captures', '_man_jumpers',
+                   '_king_capturers', 'has_forced_capture', '_staged_moves', '_quiet_move_is_legal',
+                   'is_quiet', 'hanging_pieces'),
+    },
+    'application': {
+        'board': ('make_move', 'unmake_move', 'copy', '_zobrist_of', 'compute_zobrist'),
+        'engine': ('apply_move',),
+    },
+    'evaluation': {
+        'engine': ('evaluate', 'eval_side', 'count_moves', '_count_man_captures', '_count_king_captures',
+                   '_merge_counts', 'evaluate_material_only'),
+    },
+    'qsearch': {
+        'engine': ('qsearch',),
+    },
+    'tt': {
+        'transposition': ('probe', 'store', 'new_search'),
+        'engine': ('position_key',),
+    },
+    'search': {
+        'engine': ('negamax', 'suggest_move', 'mvv_lva_score', '_check_limits'),
+    },
+}
+CATEGORY_ORDER = tuple(CATEGORIES) + ('other',)
+MODES = ('cprofile', 'sampling')
+
+# ancestrais visitados ao herdar a categoria no modo cprofile
+_MAX_INHERIT = 8
+
+_CATEGORY_OF: Dict[Tuple[str, str], str] = {
+    (module, name): category
+    for category, modules in CATEGORIES.items()
+    for module, names in modules.items()
+    for name in names
+}
+
+
+def _module(filename: str) -> str:
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def category_of(filename: str, name: str) -> Optional[str]:
+    """Categoria da função `name` definida em `filename`, ou None (herda da chamadora)."""
+    return _CATEGORY_OF.get((_module(filename), name))
+
+
+def _label(filename: str, name: str) -> str:
+    # builtins do cProfile vêm com arquivo '~'
+    if filename == '~':
+        return name
+    return f"{_module(filename)}.{name}"
+
+
+def profile_positions(samples: int = 0, seed: int = 2024) -> List[Tuple[str, Board, Color]]:
+    """As posições de referência do perft mais `samples` posições aleatórias de benchmarks."""
+    positions = [(name, board, player) for name, (board, player, _) in REFERENCE_POSITIONS.items()]
+    positions.extend((f"sample{i}", board, player)
+                     for i, (board, player) in enumerate(sample_positions(samples, seed) if samples else []))
+    return positions
+
+
+def _run_searches(eng: Engine, positions: Iterable[Tuple[str, Board, Color]], depth: int,
+                  profiler) -> Tuple[int, float]:
+    """
+    suggest_move em cada posição com tabelas limpas, com o profiler ligado (enable/disable)
+    só durante a busca. Retorna (nós, segundos de busca).
+    """
+    nodes, elapsed = 0, 0.0
+    for _, board, player in positions:
+        eng.clear()
+        board = board.copy()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            eng.suggest_move(board, max_depth=depth, player=player)
+        finally:
+            profiler.disable()
+        elapsed += time.perf_counter() - start
+        nodes += eng.nodes
+    return nodes, elapsed
+
+
+# --- modo determinístico ---
+def _charge(stats, func, seconds: float, out: Counter, label: str, depth: int = 0) -> None:
+    """Soma `seconds` de `label` na categoria de `func` ou, sem categoria, nas das chamadoras."""
+    filename, _, name = func
+    category = category_of(filename, name)
+    if category is not None:
+        out[category, label] += seconds
+        return
+    callers = stats[func][4] if func in stats else {}
+    # primeiro nível: tempo próprio por chamadora (exato); acima: tempo acumulado (proporcional)
+    weights = {caller: data[2 if depth == 0 else 3] for caller, data in callers.items()}
+    total = sum(weights.values())
+    if depth >= _MAX_INHERIT or not total:
+        out['other', label] += seconds
+        return
+    for caller, weight in weights.items():
+        if weight:
+            _charge(stats, caller, seconds * weight / total, out, label, depth + 1)
+
+
+def profile_deterministic(positions: List[Tuple[str, Board, Color]], depth: int,
+                          eng: Optional[Engine] = None) -> Dict[str, object]:
+    """Busca `positions` sob cProfile; ver report() para o conteúdo do resultado."""
+    eng = eng or Engine()
+    profiler = cProfile.Profile()
+    nodes, elapsed = _run_searches(eng, positions, depth, profiler)
+    stats = pstats.Stats(profiler).stats
+
+    charged: Counter = Counter()
+    functions: Counter = Counter()
+    for func, (_, _, tottime, _, _) in stats.items():
+        label = _label(func[0], func[2])
+        functions[label] += tottime
+        if tottime:
+            _charge(stats, func, tottime, charged, label)
+    categories = dict.fromkeys(CATEGORY_ORDER, 0.0)
+    stacks: Counter = Counter()
+    for (category, label), seconds in charged.items():
+        categories[category] += seconds
+        stacks[f"{category};{label}"] += round(seconds * 1e6)
+    return {'mode': 'cprofile', 'depth': depth, 'positions': len(positions), 'seconds': elapsed,
+            'nodes': nodes, 'categories': categories, 'functions': functions,
+            'stacks': +stacks}
+
+
+# --- modo por amostragem ---
+class StackSampler:
+    """
+    Amostra a pilha de outra thread a cada `interval` segundos (sys._current_frames),
+    só enquanto ligado (enable/disable, como cProfile.Profile).
+    """
+    def __init__(self, thread_id: int, interval: float = 0.001, root_code=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        # só amostras que passam por este código contam, com a pilha cortada acima dele
+        self.root_code = root_code
+        self.samples: Counter = Counter()
+        self.active = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if not self.active:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                if frame.f_code is self.root_code:
+                    break
+                frame = frame.f_back
+            if stack and (frame is not None or self.root_code is None):
+                self.samples[tuple(reversed(stack))] += 1
+
+    def enable(self) -> None:
+        self.active = True
+
+    def disable(self) -> None:
+        self.active = False
+
+    def start(self) -> 'StackSampler':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def profile_sampling(positions: List[Tuple[str, Board, Color]], depth: int, interval: float = 0.001,
+                     eng: Optional[Engine] = None) -> Dict[str, object]:
+    """Busca `positions` amostrando a pilha; tempos estimados pela fração de amostras."""
+    eng = eng or Engine()
+    # a thread da busca só cede o GIL a cada switch interval: amostra no máximo nesse ritmo
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(min(switch, interval))
+    sampler = StackSampler(threading.get_ident(), interval, root_code=Engine.suggest_move.__code__)
+    sampler.start()
+    try:
+        nodes, elapsed = _run_searches(eng, positions, depth, sampler)
+    finally:
+        sampler.stop()
+        sys.setswitchinterval(switch)
+
+    total = sum(sampler.samples.values())
+    per_sample = elapsed / total if total else 0.0
+    categories = dict.fromkeys(CATEGORY_ORDER, 0.0)
+    functions: Counter = Counter()
+    stacks: Counter = Counter()
+    for codes, count in sampler.samples.items():
+        # categoria do quadro categorizado mais interno
+        category = next((c for c in (category_of(code.co_filename, code.co_name) for code in reversed(codes))
+                         if c is not None), 'other')
+        categories[category] += count * per_sample
+        functions[_label(codes[-1].co_filename, codes[-1].co_name)] += count * per_sample
+        stacks[';'.join(_label(code.co_filename, code.co_name) for code in codes)] += count
+    return {'mode': 'sampling', 'depth': depth, 'positions': len(positions), 'seconds': elapsed,
+            'nodes': nodes, 'categories': categories, 'functions': functions, 'stacks': stacks,
+            'samples': total}
+
+
+def profile(positions: List[Tuple[str, Board, Color]], depth: int, mode: str = 'cprofile',
+            interval: float = 0.001) -> Dict[str, object]:
+    """
+    Perfil da busca em `positions` até `depth`. Retorna {'mode', 'depth', 'positions',
+    'seconds', 'nodes', 'categories': {categoria: s}, 'functions': {função: s próprios},
+    'stacks': {pilha collapsed: contagem}} (+ 'samples' no modo sampling).
+    """
+    if mode == 'cprofile':
+        return profile_deterministic(positions, depth)
+    if mode == 'sampling':
+        return profile_sampling(positions, depth, interval)
+    raise ValueError(f"modo desconhecido: {mode}")
+
+
+# --- saída ---
+def write_collapsed(path: str, stacks: Dict[str, int]) -> None:
+    """Grava as pilhas no formato collapsed ("a;b;c contagem"), maiores primeiro."""
+    with open(path, 'w') as f:
+        for stack, count in sorted(stacks.items(), key=lambda item: (-item[1], item[0])):
+            f.write(f"{stack} {count}\n")
+
+
+def report(result: Dict[str, object], top: int = 15) -> str:
+    """Relatório em texto: tempo por categoria e as funções com mais tempo próprio."""
+    seconds, nodes = result['seconds'], result['nodes']
+    header = (f"modo={result['mode']}  profundidade={result['depth']}  posições={result['positions']}  "
+              f"tempo={seconds:.2f}s  nós={nodes}  nós/s={nodes / seconds if seconds else 0.0:.0f}")
+    if 'samples' in result:
+        header += f"  amostras={result['samples']}"
+    categories = result['categories']
+    total = sum(categories.values()) or 1.0
+    lines = [header, '', f"{'categoria':12} {'segundos':>9} {'%':>6}"]
+    for category in CATEGORY_ORDER:
+        lines.append(f"{category:12} {categories[category]:9.3f} {100 * categories[category] / total:6.1f}")
+    lines += ['', f"{'segundos':>9} {'%':>6}  função (tempo próprio)"]
+    for label, own in result['functions'].most_common(top):
+        lines.append(f"{own:9.3f} {100 * own / total:6.1f}  {label}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Perfil da busca por categoria do caminho quente")
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--mode', choices=MODES, default='cprofile')
+    parser.add_argument('--sample', type=int, default=0, help="posições aleatórias além das de referência")
+    parser.add_argument('--interval', type=float, default=0.001, help="intervalo de amostragem (s)")
+    parser.add_argument('--top', type=int, default=15, help="funções listadas no relatório")
+    parser.add_argument('--stacks', help="arquivo de pilhas collapsed para flamegraph")
+    parser.add_argument('--output', help="grava o relatório também neste arquivo")
+    args = parser.parse_args(argv)
+
+    utils.TRACE.disable()
+    result = profile(profile_positions(args.sample), args.depth, args.mode, args.interval)
+    text = report(result, args.top)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    if args.stacks:
+        write_collapsed(args.stacks, result['stacks'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
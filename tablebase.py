@@ -0,0 +1,476 @@
+"""
+Tablebase de finais: vitória/derrota/empate com distância (em plies) para todas as
+posições com até N peças, calculada por análise retrógrada.
+
+Cada classe de material (homens/damas de cada cor) vira um arquivo próprio no
+diretório da tablebase, com um byte por posição indexada e acesso por mmap.
+As classes são resolvidas em ordem de dependência: menos peças primeiro (capturas
+levam a classes menores) e, com o mesmo total, menos homens primeiro (promoções
+trocam homem por dama). A geração das sucessoras de cada classe roda em paralelo;
+classes já gravadas são reaproveitadas, então uma geração interrompida continua de
+onde parou.
+
+Uso:
+    python tablebase.py build tb/ --pieces 4 --workers 8
+    python tablebase.py probe tb/ W:k14 B:k27
+"""
+import argparse
+import itertools
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+from engine import Color, generate_moves
+
+# --- códigos de resultado (um byte, do ponto de vista do lado a jogar) ---
+DRAW    = 0
+# vitória em d plies: d (1..MAX_DISTANCE); derrota em d plies: LOSS_BASE + d (0..MAX_DISTANCE)
+LOSS_BASE = 128
+MAX_DISTANCE = 126
+# índice sem posição válida (peças sobrepostas)
+INVALID = 255
+
+# valor de busca de uma vitória de tablebase (menos a distância), acima de qualquer avaliação
+TB_WIN_SCORE = 1000.0
+
+# --- formato do arquivo ---
+# magic, versão, (homens brancos, damas brancas, homens pretos, damas pretas),
+# reservado, número de posições, CRC32 dos dados
+TB_FILE_MAGIC   = b'DIA-TB\x00\x00'
+TB_FILE_VERSION = 1
+_HEADER_FORMAT  = '<8sH4BHQI4x'
+HEADER_BYTES    = struct.calcsize(_HEADER_FORMAT)
+
+# casas possíveis por tipo de peça (homens nunca estão na linha de promoção)
+_WHITE_MAN_SQUARES = list(range(28))
+_BLACK_MAN_SQUARES = list(range(4, 32))
+_KING_SQUARES      = list(range(32))
+
+# classe de material: (homens brancos, damas brancas, homens pretos, damas pretas)
+Material = Tuple[int, int, int, int]
+
+
+class TablebaseError(Exception):
+    """Arquivo de tablebase inválido, corrompido ou de outra versão."""
+
+
+def is_win(code: int) -> bool:
+    return 0 < code <= MAX_DISTANCE
+
+
+def is_loss(code: int) -> bool:
+    return LOSS_BASE <= code <= LOSS_BASE + MAX_DISTANCE
+
+
+def distance(code: int) -> int:
+    """Distância em plies até o fim da partida (0 para empate)."""
+    if is_win(code):
+        return code
+    if is_loss(code):
+        return code - LOSS_BASE
+    return 0
+
+
+def _win(d: int) -> int:
+    return min(d, MAX_DISTANCE)
+
+
+def _loss(d: int) -> int:
+    return LOSS_BASE + min(d, MAX_DISTANCE)
+
+
+# --- indexação ---
+# combinações de k casas de uma lista, em ordem colex: (máscaras por posto, posto por máscara)
+_COMBINATIONS: Dict[Tuple[int, int, int], Tuple[List[int], Dict[int, int]]] = {}
+
+
+def _combinations(k: int, squares: List[int]) -> Tuple[List[int], Dict[int, int]]:
+    key = (k, squares[0], len(squares))
+    if key not in _COMBINATIONS:
+        masks = [0] * comb(len(squares), k)
+        for positions in itertools.combinations(range(len(squares)), k):
+            # posto colex: soma de C(posição, i + 1)
+            rank = sum(comb(p, i + 1) for i, p in enumerate(positions))
+            mask = 0
+            for p in positions:
+                mask |= 1 << squares[p]
+            masks[rank] = mask
+        _COMBINATIONS[key] = masks, {mask: rank for rank, mask in enumerate(masks)}
+    return _COMBINATIONS[key]
+
+
+def material_of(board: Board) -> Material:
+    return ((board.bitboard_white & ~board.kings_white).bit_count(), board.kings_white.bit_count(),
+            (board.bitboard_black & ~board.kings_black).bit_count(), board.kings_black.bit_count())
+
+
+class _Indexer:
+    """Bijeção entre posições de uma classe de material (com lado a jogar) e 0..size-1."""
+    def __init__(self, material: Material):
+        self.material = material
+        wm, wk, bm, bk = material
+        # grupos na ordem dos dígitos do índice: homens brancos, homens pretos, damas brancas, damas pretas
+        self.groups = [_combinations(wm, _WHITE_MAN_SQUARES), _combinations(bm, _BLACK_MAN_SQUARES),
+                       _combinations(wk, _KING_SQUARES), _combinations(bk, _KING_SQUARES)]
+        self.radices = [len(masks) for masks, _ in self.groups] + [2]
+        self.size = 1
+        for r in self.radices:
+            self.size *= r
+
+    def index(self, board: Board, player: Color) -> Optional[int]:
+        """Índice da posição, ou None se ela não é indexável (homem na linha de promoção)."""
+        (_, r_wm), (_, r_bm), (_, r_wk), (_, r_bk) = self.groups
+        _, n_bm, n_wk, n_bk, _ = self.radices
+        try:
+            idx = r_wm[board.bitboard_white & ~board.kings_white]
+            idx = idx * n_bm + r_bm[board.bitboard_black & ~board.kings_black]
+        except KeyError:
+            return None
+        idx = idx * n_wk + r_wk[board.kings_white]
+        idx = idx * n_bk + r_bk[board.kings_black]
+        return idx * 2 + (0 if player == Color.WHITE else 1)
+
+    def position(self, idx: int) -> Optional[Tuple[Board, Color]]:
+        """Posição do índice, ou None se as peças se sobrepõem."""
+        side, idx = idx & 1, idx >> 1
+        masks = []
+        for masks_by_rank, _ in reversed(self.groups):
+            idx, rank = divmod(idx, len(masks_by_rank))
+            masks.append(masks_by_rank[rank])
+        kings_black, kings_white, black_men, white_men = masks
+        if (white_men | black_men | kings_white | kings_black).bit_count() != sum(self.material):
+            return None
+        board = Board(white_men | kings_white, black_men | kings_black, kings_white, kings_black)
+        return board, Color.WHITE if side == 0 else Color.BLACK
+
+
+def materials(max_pieces: int) -> List[Material]:
+    """Classes com até `max_pieces` peças (ambos os lados com peças), em ordem de resolução."""
+    classes = [m for m in itertools.product(range(max_pieces + 1), repeat=4)
+               if m[0] + m[1] >= 1 and m[2] + m[3] >= 1 and sum(m) <= max_pieces]
+    return sorted(classes, key=lambda m: (sum(m), m[0] + m[2], m))
+
+
+def _filename(material: Material) -> str:
+    return "{}{}{}{}.dtb".format(*material)
+
+
+# --- arquivos ---
+class _Table:
+    """Uma classe de material mapeada do disco (somente leitura)."""
+    def __init__(self, path: str, material: Material):
+        self.indexer = _Indexer(material)
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_BYTES)
+            if len(header) < HEADER_BYTES:
+                raise TablebaseError(f"{path}: cabeçalho truncado")
+            magic, version, wm, wk, bm, bk, _, size, crc = struct.unpack(_HEADER_FORMAT, header)
+            if magic != TB_FILE_MAGIC or version != TB_FILE_VERSION:
+                raise TablebaseError(f"{path}: não é uma tablebase desta versão")
+            if (wm, wk, bm, bk) != material or size != self.indexer.size:
+                raise TablebaseError(f"{path}: classe ou tamanho inesperado")
+            if os.fstat(f.fileno()).st_size != HEADER_BYTES + size:
+                raise TablebaseError(f"{path}: arquivo truncado")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = memoryview(self._mmap)[HEADER_BYTES:]
+        if zlib.crc32(self.data) != crc:
+            self.close()
+            raise TablebaseError(f"{path}: CRC não confere")
+
+    def close(self) -> None:
+        self.data.release()
+        self._mmap.close()
+
+
+def _write_table(path: str, material: Material, data: bytearray) -> None:
+    """Grava de forma atômica (arquivo temporário + rename)."""
+    header = struct.pack(_HEADER_FORMAT, TB_FILE_MAGIC, TB_FILE_VERSION, *material, 0, len(data), zlib.crc32(data))
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Tablebase:
+    """
+    Tablebase no diretório `path`: classes carregadas sob demanda por mmap.
+    `max_pieces` é o maior N com todas as classes de até N peças presentes;
+    probe só responde para posições com até esse número de peças.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._tables: Dict[Material, Optional[_Table]] = {}
+        self.max_pieces = 0
+        n = 2
+        while all(os.path.exists(os.path.join(path, _filename(m))) for m in materials(n) if sum(m) == n):
+            self.max_pieces = n
+            n += 1
+
+    def _table(self, material: Material) -> Optional[_Table]:
+        if material not in self._tables:
+            path = os.path.join(self.path, _filename(material))
+            self._tables[material] = _Table(path, material) if os.path.exists(path) else None
+        return self._tables[material]
+
+    def probe(self, board: Board, player: Color) -> Optional[int]:
+        """Código do resultado para o lado a jogar, ou None se a posição não está na tablebase."""
+        material = material_of(board)
+        wm, wk, bm, bk = material
+        # lado sem peças não tem lances: derrota imediata
+        if (wm + wk == 0) if player == Color.WHITE else (bm + bk == 0):
+            return _loss(0)
+        if wm + wk + bm + bk > self.max_pieces or wm + wk == 0 or bm + bk == 0:
+            return None
+        table = self._table(material)
+        if table is None:
+            return None
+        idx = table.indexer.index(board, player)
+        return None if idx is None else table.data[idx]
+
+    def probe_score(self, board: Board, player: Color) -> Optional[float]:
+        """Valor de busca para o lado a jogar: ±(TB_WIN_SCORE - distância) ou 0.0 (empate)."""
+        code = self.probe(board, player)
+        if code is None:
+            return None
+        if is_win(code):
+            return TB_WIN_SCORE - code
+        if is_loss(code):
+            return -(TB_WIN_SCORE - (code - LOSS_BASE))
+        return 0.0
+
+    def close(self) -> None:
+        for table in self._tables.values():
+            if table is not None:
+                table.close()
+        self._tables.clear()
+
+
+# --- geração ---
+# tablebase das classes já resolvidas, aberta uma vez por processo
+_WORKER_TB: Dict[str, Tablebase] = {}
+
+
+def _lower_tablebase(path: str) -> Tablebase:
+    if path not in _WORKER_TB:
+        _WORKER_TB[path] = Tablebase(path)
+    return _WORKER_TB[path]
+
+
+def _successors(path: str, material: Material, start: int, stop: int):
+    """
+    Sucessoras das posições start..stop-1 da classe: (válidas, deslocamentos e índices das
+    sucessoras na própria classe, deslocamentos e códigos das sucessoras em outras classes).
+    """
+    indexer = _Indexer(material)
+    lower = _lower_tablebase(path)
+    valid = bytearray(stop - start)
+    inner_off, inner = array('I', [0]), array('I')
+    outer_off, outer = array('I', [0]), array('B')
+    for idx in range(start, stop):
+        pos = indexer.position(idx)
+        if pos is not None:
+            valid[idx - start] = 1
+            board, player = pos
+            opponent = Color.BLACK if player == Color.WHITE else Color.WHITE
+            seen = set()
+            for mv in generate_moves(board, player):
+                undo = board.make_move(mv)
+                child = material_of(board)
+                if child == material:
+                    seen.add(indexer.index(board, opponent))
+                else:
+                    # classes menores completas (ou lado sem peças) pelo probe; promoções, direto na classe
+                    code = lower.probe(board, opponent)
+                    if code is None:
+                        table = lower._table(child)
+                        if table is None:
+                            raise TablebaseError(f"classe {_filename(child)} ausente para {_filename(material)}")
+                        code = table.data[table.indexer.index(board, opponent)]
+                    outer.append(code)
+                board.unmake_move(undo)
+            inner.extend(sorted(seen))
+        inner_off.append(len(inner))
+        outer_off.append(len(outer))
+    return valid, inner_off, inner, outer_off, outer
+
+
+def _solve(size: int, valid: bytearray, inner_off: array, inner: array,
+           outer_off: array, outer: array) -> bytearray:
+    """Análise retrógrada por camadas de distância sobre o grafo de sucessoras da classe."""
+    # predecessoras (grafo reverso em formato CSR)
+    pred_count = array('I', bytes(4 * (size + 1)))
+    for q in inner:
+        pred_count[q + 1] += 1
+    for i in range(size):
+        pred_count[i + 1] += pred_count[i]
+    pred = array('I', bytes(4 * len(inner)))
+    fill = array('I', pred_count)
+    for p in range(size):
+        for k in range(inner_off[p], inner_off[p + 1]):
+            q = inner[k]
+            pred[fill[q]] = p
+            fill[q] += 1
+
+    result = bytearray([INVALID]) * size
+    resolved = bytearray(size)
+    pending = array('I', (inner_off[p + 1] - inner_off[p] for p in range(size)))
+    longest = array('H', bytes(2 * size))
+    can_draw = bytearray(size)
+    can_win = bytearray(size)
+    buckets: List[List[Tuple[int, bool]]] = [[] for _ in range(MAX_DISTANCE + 1)]
+
+    for p in range(size):
+        if not valid[p]:
+            continue
+        result[p] = DRAW
+        win_at = 0
+        for k in range(outer_off[p], outer_off[p + 1]):
+            code = outer[k]
+            if is_loss(code):
+                d = code - LOSS_BASE + 1
+                win_at = d if not win_at else min(win_at, d)
+            elif is_win(code):
+                longest[p] = max(longest[p], code + 1)
+            else:
+                can_draw[p] = 1
+        if win_at:
+            can_win[p] = 1
+            buckets[min(win_at, MAX_DISTANCE)].append((p, True))
+        elif pending[p] == 0 and not can_draw[p]:
+            # sem lances (derrota em 0) ou só lances para fora da classe que perdem
+            buckets[min(longest[p], MAX_DISTANCE)].append((p, False))
+
+    for d in range(MAX_DISTANCE + 1):
+        for p, win in buckets[d]:
+            if resolved[p]:
+                continue
+            resolved[p] = 1
+            result[p] = _win(d) if win else _loss(d)
+            for k in range(pred_count[p], pred_count[p + 1]):
+                q = pred[k]
+                if resolved[q]:
+                    continue
+                if not win:
+                    # q move para uma derrota do adversário: vitória em d + 1
+                    can_win[q] = 1
+                    buckets[min(d + 1, MAX_DISTANCE)].append((q, True))
+                else:
+                    pending[q] -= 1
+                    longest[q] = max(longest[q], d + 1)
+                    if pending[q] == 0 and not can_draw[q] and not can_win[q]:
+                        buckets[min(longest[q], MAX_DISTANCE)].append((q, False))
+    # o que não foi resolvido fica em ciclo: empate
+    return result
+
+
+def build_class(path: str, material: Material, workers: int = 1, chunk: int = 20000) -> bytearray:
+    """Resolve uma classe (as classes de que ela depende já devem estar em `path`)."""
+    size = _Indexer(material).size
+    ranges = [(start, min(start + chunk, size)) for start in range(0, size, chunk)]
+    valid = bytearray()
+    inner_off, inner = array('I', [0]), array('I')
+    outer_off, outer = array('I', [0]), array('B')
+
+    def merge(part) -> None:
+        p_valid, p_inner_off, p_inner, p_outer_off, p_outer = part
+        valid.extend(p_valid)
+        base_inner, base_outer = len(inner), len(outer)
+        inner_off.extend(base_inner + o for o in p_inner_off[1:])
+        outer_off.extend(base_outer + o for o in p_outer_off[1:])
+        inner.extend(p_inner)
+        outer.extend(p_outer)
+
+    if workers > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_successors, *zip(*((path, material, a, b) for a, b in ranges))):
+                merge(part)
+    else:
+        for a, b in ranges:
+            merge(_successors(path, material, a, b))
+    return _solve(size, valid, inner_off, inner, outer_off, outer)
+
+
+def build(path: str, max_pieces: int, workers: int = 1, verbose: bool = False) -> None:
+    """
+    Gera todas as classes com até `max_pieces` peças em `path`. Classes já presentes e
+    válidas são mantidas (retomada); as inválidas são refeitas.
+    """
+    os.makedirs(path, exist_ok=True)
+    for material in materials(max_pieces):
+        target = os.path.join(path, _filename(material))
+        if os.path.exists(target):
+            try:
+                _Table(target, material).close()
+                continue
+            except TablebaseError:
+                pass
+        start = time.perf_counter()
+        data = build_class(path, material, workers)
+        _write_table(target, material, data)
+        # o cache de classes resolvidas deste processo não conhece a nova classe
+        _WORKER_TB.clear()
+        if verbose:
+            wins = sum(1 for c in data if is_win(c))
+            losses = sum(1 for c in data if is_loss(c))
+            draws = data.count(DRAW)
+            print(f"{_filename(material)}: {len(data)} posições  vitórias={wins} derrotas={losses} "
+                  f"empates={draws}  {time.perf_counter() - start:.1f}s")
+
+
+def _parse_side(text: str) -> Tuple[int, int]:
+    """'W:14,k27' -> (peças, damas) com casas 0-31; prefixo k marca dama."""
+    pieces = kings = 0
+    for item in filter(None, text.split(':', 1)[1].split(',')):
+        sq = int(item.lstrip('kK'))
+        pieces |= 1 << sq
+        if item[0] in 'kK':
+            kings |= 1 << sq
+    return pieces, kings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tablebase de finais (análise retrógrada)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('build')
+    p.add_argument('path')
+    p.add_argument('--pieces', type=int, default=3)
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    p = sub.add_parser('probe')
+    p.add_argument('path')
+    p.add_argument('white', help="ex.: W:9,k14")
+    p.add_argument('black', help="ex.: B:k27")
+    p.add_argument('--black-to-move', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        build(args.path, args.pieces, args.workers, verbose=True)
+        return 0
+    white, white_kings = _parse_side(args.white)
+    black, black_kings = _parse_side(args.black)
+    board = Board(white, black, white_kings, black_kings)
+    player = Color.BLACK if args.black_to_move else Color.WHITE
+    code = Tablebase(args.path).probe(board, player)
+    if code is None:
+        print("fora da tablebase")
+    elif is_win(code):
+        print(f"vitória em {distance(code)} plies")
+    elif is_loss(code):
+        print(f"derrota em {distance(code)} plies")
+    else:
+        print("empate")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import unittest
+
+import batch_eval
+from batch_eval import bitboards, evaluate_batch
+from benchmarks import sample_positions
+from board import Board
+from engine import Engine
+
+
+class TestBatchEval(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # posições de partidas aleatórias: capturas múltiplas, damas e finais
+        cls.boards = [board for board, _ in sample_positions(400, seed=7)]
+        cls.boards.append(Board(0, 0))
+        cls.engine = Engine(params={'endgame_multiplier': 1.25, 'mobility_weight': 0.13})
+
+    def _expected(self, engine):
+        return [engine.evaluate(board) for board in self.boards]
+
+    def test_scalar_path_matches_evaluate(self):
+        scores = evaluate_batch(*bitboards(self.boards), engine=self.engine, vectorized=False)
+        self.assertEqual([float(s) for s in scores], self._expected(self.engine))
+
+    @unittest.skipUnless(batch_eval.HAVE_NUMPY, "NumPy indisponível")
+    def test_vectorized_path_is_exact(self):
+        scores = evaluate_batch(*bitboards(self.boards), engine=self.engine)
+        self.assertEqual(scores.tolist(), self._expected(self.engine))
+
+    @unittest.skipUnless(batch_eval.HAVE_NUMPY, "NumPy indisponível")
+    def test_without_mobility(self):
+        scores = evaluate_batch(*bitboards(self.boards), engine=self.engine, mobility=False)
+        plain = Engine(params=dict(self.engine.params, mobility_weight=0.0))
+        self.assertEqual(scores.tolist(), self._expected(plain))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 from board import Board
+from engine import Color, generate_moves
+from move import Move
 
 class TestBoard(unittest.TestCase):
     def test_initial_board(self):
@@ -11,5 +13,41 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(board.kings_black, 0)
         print(board)
 
+    def _state(self, board):
+        return (board.bitboard_white, board.bitboard_black, board.kings_white, board.kings_black)
+
+    def _king_capture(self, board):
+        # dama branca em 0: 0 -> 23 capturando 18, depois 23 -> 30 capturando 26
+        capture = next(mv for mv in generate_moves(board, Color.WHITE) if mv.origin == 0)
+        self.assertEqual(capture, Move.from_path([0, 23, 30], [18, 26]))
+        return capture
+
+    def test_make_unmake_restores_state(self):
+        # dama branca em 0 captura 18 e 26; homem branco em 24 promove ao mover para 28
+        board = Board((1 << 0) | (1 << 24), (1 << 18) | (1 << 26), 1 << 0, 1 << 26)
+        before = self._state(board)
+        undo = board.make_move(self._king_capture(board))
+        self.assertEqual(self._state(board), ((1 << 30) | (1 << 24), 0, 1 << 30, 0))
+        board.unmake_move(undo)
+        self.assertEqual(self._state(board), before)
+
+    def test_make_move_promotes_man(self):
+        board = Board(1 << 24, 1 << 3)
+        undo = board.make_move(Move(24, 28))
+        self.assertEqual(board.kings_white, 1 << 28)
+        board.unmake_move(undo)
+        self.assertEqual(board.kings_white, 0)
+        self.assertEqual(board.bitboard_white, 1 << 24)
+
+    def test_zobrist_incremental_matches_full(self):
+        board = Board((1 << 0) | (1 << 24), (1 << 18) | (1 << 26), 1 << 0, 1 << 26)
+        before = board.zobrist
+        for move in (self._king_capture(board), Move(24, 28)):
+            undo = board.make_move(move)
+            self.assertEqual(board.zobrist, Board.compute_zobrist(*self._state(board)))
+            self.assertEqual(board.copy().zobrist, board.zobrist)
+            board.unmake_move(undo)
+            self.assertEqual(board.zobrist, before)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
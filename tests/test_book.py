@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+import book
+from board import Board
+from engine import Color, Engine, generate_moves, position_key
+
+
+class TestBook(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'book.bin')
+        cls.count = book.build(cls.path, plies=1, depth=3)
+        cls.book = book.Book(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.book.close()
+        cls.tmp.cleanup()
+
+    def test_every_opening_position_is_in_book(self):
+        positions = book.opening_positions(1)
+        self.assertEqual(len(self.book), len(positions))
+        for board, player in positions:
+            mv = self.book.best_move(board, player)
+            self.assertIn(mv, generate_moves(board, player))
+            self.assertEqual(mv, Engine().suggest_move(board, max_depth=3, player=player))
+
+    def test_engine_answers_from_book_without_searching(self):
+        eng = Engine(book=self.book)
+        board = Board.initial()
+        self.assertEqual(eng.suggest_move(board, max_depth=3, player=Color.WHITE),
+                         self.book.best_move(board, Color.WHITE))
+        self.assertEqual(eng.nodes, 0)
+
+    def test_illegal_and_missing_entries_are_ignored(self):
+        board = Board.initial()
+        legal = generate_moves(board, Color.WHITE)
+        path = os.path.join(self.tmp.name, 'bad.bin')
+        # o lance preto não é legal para as brancas; o legal vem depois por ter valor menor
+        illegal = generate_moves(board, Color.BLACK)[0]
+        key = position_key(board, Color.WHITE)
+        book.write_book(path, [(key, illegal.code, 5.0), (key, legal[2].code, 1.0)])
+        bad = book.Book(path)
+        try:
+            self.assertEqual(bad.best_move(board, Color.WHITE), legal[2])
+            self.assertIsNone(bad.best_move(board, Color.BLACK))
+        finally:
+            bad.close()
+
+    def test_corrupt_file_is_rejected(self):
+        path = os.path.join(self.tmp.name, 'corrupt.bin')
+        with open(self.path, 'rb') as f:
+            data = bytearray(f.read())
+        data[book.HEADER_BYTES + 3] ^= 0xff
+        with open(path, 'wb') as f:
+            f.write(data)
+        with self.assertRaises(book.BookError):
+            book.Book(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
+import json
 import unittest
+import engine
 from board import Board
-from engine import generate_moves, Color, apply_move
+from engine import generate_moves, Color, apply_move, has_forced_capture, is_quiet
 
 class TestGenerateMoves(unittest.TestCase):
     def test_initial_position_white(self):
@@ -50,5 +52,282 @@ class TestGenerateMoves(unittest.TestCase):
         for m in moves:
             print(m)
 
+class TestForcedCapture(unittest.TestCase):
+    def test_initial_position_is_quiet(self):
+        board = Board.initial()
+        self.assertFalse(has_forced_capture(board, Color.WHITE))
+        self.assertTrue(is_quiet(board, Color.BLACK))
+
+    def test_man_capture_detected(self):
+        # Branco em 17, preto em 22, casa 26 livre
+        board = Board(1 << 17, 1 << 22)
+        self.assertTrue(has_forced_capture(board, Color.WHITE))
+        # o homem preto em 22 também pode capturar o branco em 17 (para trás)
+        self.assertEqual(has_forced_capture(board, Color.BLACK),
+                         any(m.is_capture() for m in generate_moves(board, Color.BLACK)))
+
+    def test_king_capture_at_distance(self):
+        # Dama branca em 0; preta em 18 na mesma diagonal com casa livre atrás
+        board = Board(1 << 0, 1 << 18, 1 << 0, 0)
+        self.assertTrue(has_forced_capture(board, Color.WHITE))
+        # peça própria no caminho bloqueia a captura
+        blocked = Board((1 << 0) | (1 << 9), 1 << 18, 1 << 0, 0)
+        self.assertFalse(has_forced_capture(blocked, Color.WHITE))
+
+def _reference_pst(board):
+    # soma casa a casa, como a avaliação original (sem tabelas pré-ponderadas)
+    score = 0.0
+    for idx in range(32):
+        row, col = Board.index_to_coords(idx)
+        weight = engine.PST_WEIGHT * (engine.BORDER_PST_FACTOR if row in (0, 7) or col in (0, 7) else 1.0)
+        bit = 1 << idx
+        if board.bitboard_white & bit:
+            score += (engine.PSQT_KING if board.kings_white & bit else engine.PSQT_MAN)[idx] * weight
+        if board.bitboard_black & bit:
+            score -= (engine.PSQT_KING if board.kings_black & bit else engine.PSQT_MAN)[idx] * weight
+    return score
+
+class TestEvaluate(unittest.TestCase):
+    def test_weighted_tables_match_per_square_weights(self):
+        for idx in range(32):
+            board = Board(1 << idx, 0)
+            self.assertEqual(_reference_pst(board), engine._PST_MAN_WEIGHTED[idx])
+
+    def test_rebuild_after_tuning_change(self):
+        board = Board(1 << 14, 1 << 20, 0, 1 << 20)
+        original = engine.evaluate(board)
+        old_weight = engine.PST_WEIGHT
+        try:
+            engine.PST_WEIGHT = old_weight * 2
+            engine.rebuild_eval_tables()
+            self.assertNotEqual(engine.evaluate(board), original)
+        finally:
+            engine.PST_WEIGHT = old_weight
+            engine.rebuild_eval_tables()
+        self.assertEqual(engine.evaluate(board), original)
+
+    def test_module_writes_reach_default_engine(self):
+        board = Board(1 << 14, 1 << 20, 0, 1 << 20)
+        original = engine.evaluate(board)
+        old_weight = engine.PST_WEIGHT
+        try:
+            engine.PST_WEIGHT = old_weight * 2
+            self.assertNotEqual(engine.evaluate(board), original)
+        finally:
+            engine.PST_WEIGHT = old_weight
+        self.assertEqual(engine.evaluate(board), original)
+
+class TestModuleState(unittest.TestCase):
+    def test_nodes_write_is_seen_by_search(self):
+        engine.suggest_move(Board.initial(), max_depth=3, player=Color.WHITE)
+        engine.nodes = 0
+        self.assertEqual(engine.default_engine().nodes, 0)
+        engine.suggest_move(Board.initial(), max_depth=3, player=Color.WHITE)
+        self.assertEqual(engine.nodes, engine.default_engine().nodes)
+        self.assertEqual(engine.nodes, engine.last_stats.nodes)
+
+    def test_quiescence_flag_is_seen_by_search(self):
+        board = Board(1 << 9, 1 << 13 | 1 << 31)
+        try:
+            engine.USE_QUIESCENCE = False
+            self.assertFalse(engine.default_engine().use_quiescence)
+            engine.suggest_move(board, max_depth=2, player=Color.WHITE)
+            self.assertEqual(engine.last_stats.qnodes, 0)
+        finally:
+            engine.USE_QUIESCENCE = True
+        self.assertTrue(engine.default_engine().use_quiescence)
+
+class TestCountMoves(unittest.TestCase):
+    def test_matches_generate_moves(self):
+        from benchmarks import sample_positions
+        from perft import REFERENCE_POSITIONS
+        positions = [(board, player) for board, player, _ in REFERENCE_POSITIONS.values()]
+        positions += sample_positions(200)
+        for board, _ in positions:
+            for player in (Color.WHITE, Color.BLACK):
+                self.assertEqual(engine.count_moves(board, player), len(generate_moves(board, player)))
+
+class TestSearchBudget(unittest.TestCase):
+    def test_node_budget_stops_search(self):
+        eng = engine.Engine()
+        move = eng.suggest_move(Board.initial(), max_depth=30, player=Color.WHITE, node_limit=2000)
+        self.assertIsNotNone(move)
+        self.assertLessEqual(eng.nodes, 2000)
+
+    def test_time_budget_returns_completed_move(self):
+        import time
+        start = time.perf_counter()
+        move = engine.suggest_move(Board.initial(), max_depth=30, player=Color.WHITE, time_limit=0.2)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn(move, generate_moves(Board.initial(), Color.WHITE))
+
+    def test_stop_event_interrupts_search_from_another_thread(self):
+        import threading, time
+        eng = engine.Engine()
+        stop = threading.Event()
+        result = []
+        worker = threading.Thread(target=lambda: result.append(
+            eng.suggest_move(Board.initial(), max_depth=30, player=Color.WHITE, stop_event=stop)))
+        worker.start()
+        time.sleep(0.2)
+        stop.set()
+        worker.join(timeout=2.0)
+        self.assertFalse(worker.is_alive())
+        self.assertIn(result[0], generate_moves(Board.initial(), Color.WHITE))
+
+    def test_progress_reports_each_iteration(self):
+        reports = []
+        eng = engine.Engine()
+        move = eng.suggest_move(Board.initial(), max_depth=4, player=Color.WHITE,
+                                progress=lambda *args: reports.append(args))
+        self.assertEqual([r[0] for r in reports], [1, 2, 3, 4])
+        self.assertEqual(reports[-1][2], move)
+        self.assertEqual(reports[-1][3], eng.nodes)
+
+class TestSelectiveSearch(unittest.TestCase):
+    FLAGS = ('use_pvs', 'use_aspiration', 'use_killers', 'use_lmr')
+
+    def _search(self, board, player, depth, enabled):
+        eng = engine.Engine(params={f: enabled for f in self.FLAGS})
+        move = eng.suggest_move(board, max_depth=depth, player=player)
+        return move, eng.nodes
+
+    def test_each_option_returns_legal_move(self):
+        board = Board.initial()
+        legal = generate_moves(board, Color.WHITE)
+        for flag in self.FLAGS:
+            with self.subTest(flag=flag):
+                eng = engine.Engine(params={f: f == flag for f in self.FLAGS})
+                self.assertIn(eng.suggest_move(board, max_depth=4, player=Color.WHITE), legal)
+
+    def test_selective_search_visits_fewer_nodes(self):
+        _, plain = self._search(Board.initial(), Color.WHITE, 6, False)
+        _, selective = self._search(Board.initial(), Color.WHITE, 6, True)
+        self.assertLess(selective, plain)
+
+    def test_reductions_are_off_by_default_and_change_fingerprint(self):
+        eng = engine.Engine()
+        self.assertFalse(eng.use_pvs or eng.use_lmr)
+        # uma TT gravada com profundidades reduzidas não vale para um engine sem redução
+        reduced = engine.Engine(params={'use_lmr': True})
+        self.assertNotEqual(reduced.eval_fingerprint(), eng.eval_fingerprint())
+        self.assertNotEqual(engine.Engine(params={'use_pvs': True}).eval_fingerprint(), eng.eval_fingerprint())
+
+    def test_forced_capture_is_kept(self):
+        # única captura disponível: nenhuma redução pode escondê-la
+        board = Board(1 << 9, 1 << 13)
+        move, _ = self._search(board, Color.WHITE, 5, True)
+        self.assertTrue(move.is_capture())
+
+class TestEngineInstances(unittest.TestCase):
+    def test_engines_do_not_share_state(self):
+        a, b = engine.Engine(tt_mb=1), engine.Engine(tt_mb=2)
+        a.suggest_move(Board.initial(), max_depth=4, player=Color.WHITE)
+        self.assertGreater(a.nodes, 0)
+        self.assertEqual(b.nodes, 0)
+        self.assertEqual(b.tt.fill_rate(), 0.0)
+        self.assertEqual(b.history, {})
+        self.assertNotEqual(a.tt.size_mb, b.tt.size_mb)
+
+    def test_same_result_as_module_api(self):
+        board = Board.initial()
+        engine.TT.clear()
+        engine.HISTORY.clear()
+        self.assertEqual(engine.Engine().suggest_move(board, max_depth=5, player=Color.WHITE),
+                         engine.suggest_move(board, max_depth=5, player=Color.WHITE))
+        self.assertEqual(engine.Engine().evaluate(board), engine.evaluate(board))
+
+    def test_params_change_evaluation_and_clear_tt(self):
+        board = Board(1 << 14, 1 << 20, 0, 1 << 20)
+        eng = engine.Engine()
+        eng.suggest_move(board, max_depth=3, player=Color.WHITE)
+        original = eng.evaluate(board)
+        eng.configure(pst_weight=eng.pst_weight * 2)
+        self.assertNotEqual(eng.evaluate(board), original)
+        self.assertEqual(eng.tt.fill_rate(), 0.0)
+        self.assertEqual(eng.tt.fingerprint, eng.eval_fingerprint())
+        with self.assertRaises(ValueError):
+            eng.configure(no_such_param=1)
+
+    def test_params_file_round_trip(self):
+        import os, tempfile
+        eng = engine.Engine(params={'mobility_weight': 0.25, 'use_lmr': False})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'params.json')
+            eng.save_params(path)
+            loaded = engine.Engine().load_params(path)
+        self.assertEqual(loaded.params, eng.params)
+        self.assertEqual(loaded.eval_fingerprint(), eng.eval_fingerprint())
+
+class TestStagedMoves(unittest.TestCase):
+    def _positions(self):
+        from benchmarks import sample_positions
+        return sample_positions(40, seed=7)
+
+    def test_same_moves_as_generator(self):
+        for board, player in self._positions():
+            moves = generate_moves(board, player)
+            hash_code = moves[-1].code if moves else 0
+            staged = list(engine._staged_moves(board, player, hash_code, (0, 0)))
+            self.assertEqual(len(staged), len(moves))
+            self.assertEqual(set(staged), set(moves))
+            if moves:
+                self.assertEqual(staged[0], moves[-1])
+
+    def test_invalid_hash_and_killers_are_skipped(self):
+        board = Board.initial()
+        # 0 -> 4: casa de destino ocupada; 20 -> 16: peça do adversário
+        bogus = [engine.Move(0, 4).code, engine.Move(20, 16).code]
+        staged = list(engine._staged_moves(board, Color.WHITE, bogus[0], bogus))
+        self.assertEqual(set(staged), set(generate_moves(board, Color.WHITE)))
+        self.assertEqual(len(staged), 7)
+
+    def test_killer_comes_before_other_quiets(self):
+        board = Board.initial()
+        killer = generate_moves(board, Color.WHITE)[-1]
+        staged = list(engine._staged_moves(board, Color.WHITE, 0, (killer.code, 0)))
+        self.assertEqual(staged[0], killer)
+
+    def test_quiets_are_ordered_by_engine_psqt(self):
+        board = Board.initial()
+        # tabela própria do engine: casas de número alto primeiro (a global favorece o centro)
+        eng = engine.Engine(params={'psqt_man': list(range(32))})
+        staged = list(eng._staged_moves(board, Color.WHITE, 0, (0, 0)))
+        dests = [mv.dest for mv in staged]
+        self.assertEqual(dests, sorted(dests, reverse=True))
+
+class TestSearchStats(unittest.TestCase):
+    def test_search_returns_stats(self):
+        eng = engine.Engine()
+        received = []
+        move, stats = eng.search(Board.initial(), 6, Color.WHITE, stats_callback=received.append)
+        self.assertIs(received[0], stats)
+        self.assertIs(eng.last_stats, stats)
+        self.assertEqual(stats.best_move, str(move))
+        self.assertEqual(stats.nodes, eng.nodes)
+        self.assertEqual([it['depth'] for it in stats.iterations], list(range(1, 7)))
+        self.assertEqual(sum(it['nodes'] for it in stats.iterations), stats.nodes)
+        self.assertLessEqual(stats.qnodes, stats.nodes)
+        self.assertLessEqual(stats.first_move_cutoffs, stats.beta_cutoffs)
+        self.assertLessEqual(stats.tt_hits, stats.tt_probes)
+        self.assertGreater(stats.effective_branching_factor, 1.0)
+        self.assertIsNone(stats.eval_calls)
+        data = json.loads(stats.to_json())
+        self.assertEqual(data['nodes'], stats.nodes)
+        self.assertEqual(data['first_move_cutoff_rate'], stats.first_move_cutoff_rate)
+
+    def test_instrumented_search_is_identical_and_timed(self):
+        plain, timed = engine.Engine(), engine.Engine()
+        timed.instrument = True
+        board = Board(0x000A0F0F, 0xF0F50000, 0, 0)
+        self.assertEqual(plain.search(board, 5, Color.WHITE)[0], timed.search(board, 5, Color.WHITE)[0])
+        self.assertEqual(plain.nodes, timed.nodes)
+        stats = timed.last_stats
+        self.assertGreater(stats.eval_calls, 0)
+        self.assertGreater(stats.movegen_calls, 0)
+        self.assertGreater(stats.eval_seconds, 0.0)
+        timed.instrument = False
+        self.assertIsNone(timed.search(board, 3, Color.WHITE)[1].eval_calls)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
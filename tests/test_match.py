@@ -0,0 +1,64 @@
+import io
+import json
+import math
+import unittest
+
+import match
+from engine import generate_moves
+
+
+class TestMatchStatistics(unittest.TestCase):
+    def test_elo(self):
+        diff, margin = match.elo(10, 5, 10)
+        self.assertAlmostEqual(diff, 0.0)
+        self.assertGreater(margin, 0)
+        diff, _ = match.elo(30, 0, 10)   # pontuação 0.75
+        self.assertAlmostEqual(diff, 400 * 0.4771212547, places=4)
+
+    def test_sprt_verdicts(self):
+        self.assertEqual(match.sprt(600, 200, 200)['verdict'], 'H1')
+        self.assertEqual(match.sprt(200, 200, 600)['verdict'], 'H0')
+        self.assertIsNone(match.sprt(3, 2, 3)['verdict'])
+
+    def test_all_wins_are_not_degenerate(self):
+        diff, margin = match.elo(4, 0, 0)
+        self.assertTrue(math.isfinite(diff) and math.isfinite(margin))
+        self.assertGreater(diff, 0)
+        self.assertGreater(match.sprt(4, 0, 0)['llr'], 0)
+        # uma sequência longa de vitórias encerra o SPRT
+        self.assertEqual(match.sprt(20, 0, 0)['verdict'], 'H1')
+        self.assertEqual(match.sprt(0, 0, 20)['verdict'], 'H0')
+
+
+class TestMatchGames(unittest.TestCase):
+    A = {'name': 'A', 'params': {}}
+    B = {'name': 'B', 'params': {'mobility_weight': 0.3}}
+
+    def test_game_record_replays(self):
+        opening = match.opening_lines(2)[0]
+        record = match.play_game(0, opening, self.A, self.B, {'depth': 2})
+        positions = list(match.replay_game(record))
+        self.assertEqual(len(positions), len(opening) + len(record['moves']))
+        self.assertEqual(sum(s['moves'] for s in record['stats'].values()), len(record['moves']))
+        if record['reason'] == 'no_moves':
+            board, player, mv = positions[-1]
+            board.make_move(mv)
+            opponent = match.Color.BLACK if player == match.Color.WHITE else match.Color.WHITE
+            self.assertEqual(generate_moves(board, opponent), [])
+            self.assertEqual(record['result'], match.WHITE_WINS if player == match.Color.WHITE else match.BLACK_WINS)
+
+    def test_run_match_swaps_colours_and_streams_records(self):
+        openings = match.select_openings(match.opening_lines(2), 2)
+        out = io.StringIO()
+        report = match.run_match(self.A, self.B, openings, {'depth': 1}, workers=1, output=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(records), 4)
+        self.assertEqual([(r['white'], r['black']) for r in records], [('A', 'B'), ('B', 'A')] * 2)
+        self.assertEqual(records[0]['opening'], records[1]['opening'])
+        self.assertEqual(report['games'], 4)
+        self.assertEqual(report['wins'] + report['draws'] + report['losses'], 4)
+        self.assertEqual(report['engines']['A']['avg_depth'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from board import Board
+from engine import Color, generate_moves
+from move import Move, SHORT_CODE_MASK
+
+class TestMove(unittest.TestCase):
+    def test_simple_move_str(self):
+        mv = Move(9, 13)
+        self.assertFalse(mv.is_capture())
+        self.assertEqual(mv.path, [9, 13])
+        self.assertEqual(mv.captured, [])
+        self.assertEqual(str(mv), "Move: 9 -> 13")
+
+    def test_multi_capture_from_path(self):
+        # dama: 0 -> 23 capturando 18, depois 23 -> 30 capturando 26
+        board = Board(1 << 0, (1 << 18) | (1 << 26), 1 << 0, 0)
+        mv = Move.from_path([0, 23, 30], [18, 26])
+        self.assertEqual(generate_moves(board, Color.WHITE), [mv])
+        self.assertEqual(mv.path, [0, 23, 30])
+        self.assertEqual(mv.captured, [18, 26])
+        self.assertEqual(str(mv), "Capture: 0 -> 23 -> 30 | Captured: [18, 26]")
+
+    def test_captured_rejects_non_diagonal_path(self):
+        with self.assertRaises(ValueError):
+            Move.from_path([0, 22, 30], [18, 26]).captured
+
+    def test_code_roundtrip_and_hash(self):
+        mv = Move.from_path([5, 14, 21, 30], [9, 17, 25])
+        copy = Move.decode(mv.code)
+        self.assertEqual(copy, mv)
+        self.assertEqual(hash(copy), hash(mv))
+        self.assertEqual(len({mv, copy}), 1)
+        self.assertNotEqual(mv, Move(5, 30, mv.captured_mask))
+
+    def test_short_code_keeps_origin_dest_and_captures(self):
+        mv = Move.from_path([5, 14, 21, 30], [9, 17, 25])
+        short = Move.decode(mv.code & SHORT_CODE_MASK)
+        self.assertEqual((short.origin, short.dest, short.captured_mask),
+                         (mv.origin, mv.dest, mv.captured_mask))
+        self.assertEqual(short.captured, [9, 17, 25])
+
+if __name__ == '__main__':
+    unittest.main()
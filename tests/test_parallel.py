@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+import engine
+import parallel
+import tablebase
+from board import Board
+from engine import Color, generate_moves
+
+
+class TestParallelSearch(unittest.TestCase):
+    def test_deterministic_move_does_not_depend_on_workers(self):
+        board = Board.initial()
+        serial = parallel.parallel_search(board, Color.WHITE, 4, workers=1)
+        split = parallel.parallel_search(board, Color.WHITE, 4, workers=2)
+        self.assertEqual(serial[0], split[0])
+        self.assertEqual(serial[1], split[1])
+        self.assertEqual(serial[2], split[2])
+
+    def test_fast_mode_returns_legal_move(self):
+        board = Board.initial()
+        move, _, _ = parallel.parallel_search(board, Color.WHITE, 4, workers=2, deterministic=False)
+        self.assertIn(move, generate_moves(board, Color.WHITE))
+
+    def test_suggest_move_with_workers(self):
+        board = Board.initial()
+        move = engine.suggest_move(board, max_depth=3, player=Color.WHITE, workers=2)
+        self.assertEqual(move, parallel.parallel_search(board, Color.WHITE, 3, workers=1)[0])
+        with self.assertRaises(ValueError):
+            engine.suggest_move(board, max_depth=3, player=Color.WHITE, workers=2, time_limit=1.0)
+
+    def test_workers_use_tt_file_and_tablebase(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tablebase.build(tmp, 2)
+            tt_path = os.path.join(tmp, 'search.tt')
+            board = Board(1 << 14, 1 << 27, 1 << 14, 0)
+            eng = engine.Engine(tt_mb=0.01, tablebase=tablebase.Tablebase(tmp))
+            move = eng.suggest_move(board, max_depth=3, player=Color.WHITE, tt_path=tt_path, workers=2)
+            # a TT do engine volta a ficar aberta para escrita no mesmo arquivo
+            self.assertEqual(eng.tt.path, tt_path)
+            self.assertFalse(eng.tt.readonly)
+            eng.tt.close()
+            expected = parallel.parallel_search(board, Color.WHITE, 3, workers=1, tt_path=tt_path,
+                                                tablebase_path=tmp)
+            self.assertEqual(move, expected[0])
+            # vitória de tablebase: o valor vem da tablebase, não da avaliação
+            self.assertGreater(expected[1], tablebase.TB_WIN_SCORE / 2)
+            parallel._ENGINES.clear()
+            eng.tablebase.close()
+
+    def test_speedup_baseline_is_single_process_search(self):
+        board = Board.initial()
+        report = parallel.measure_speedup(board, Color.WHITE, 3, 2)
+        self.assertEqual(report['serial']['best_move'],
+                         str(engine.Engine().suggest_move(board, max_depth=3, player=Color.WHITE)))
+
+    def test_no_moves(self):
+        self.assertEqual(parallel.parallel_search(Board(0, 1 << 20), Color.WHITE, 3, workers=1)[0], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,16 @@
+import unittest
+from perft import REFERENCE_POSITIONS, perft, divide
+
+class TestPerft(unittest.TestCase):
+    def test_reference_counts(self):
+        for name, (board, player, counts) in REFERENCE_POSITIONS.items():
+            for depth in (1, 2, 3, 4):
+                with self.subTest(position=name, depth=depth):
+                    self.assertEqual(perft(board, player, depth), counts[depth])
+
+    def test_divide_sums_to_perft(self):
+        board, player, counts = REFERENCE_POSITIONS['kings']
+        self.assertEqual(sum(count for _, count in divide(board, player, 3)), counts[3])
+
+if __name__ == '__main__':
+    unittest.main()
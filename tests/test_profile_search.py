@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+import profile_search
+
+
+class TestProfileSearch(unittest.TestCase):
+    def setUp(self):
+        self.positions = profile_search.profile_positions(2)
+
+    def test_categories_cover_profiled_time(self):
+        result = profile_search.profile(self.positions, 4, mode='cprofile')
+        categories = result['categories']
+        self.assertEqual(tuple(categories), profile_search.CATEGORY_ORDER)
+        for category in ('generation', 'application', 'evaluation', 'search'):
+            self.assertGreater(categories[category], 0.0, category)
+        # todo tempo próprio é atribuído a alguma categoria
+        self.assertAlmostEqual(sum(categories.values()), sum(result['functions'].values()), places=6)
+        self.assertGreater(result['nodes'], 0)
+
+    def test_sampling_stacks_are_collapsed_format(self):
+        result = profile_search.profile(self.positions, 6, mode='sampling', interval=0.0005)
+        self.assertGreater(result['samples'], 0)
+        self.assertEqual(sum(result['stacks'].values()), result['samples'])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'search.folded')
+            profile_search.write_collapsed(path, result['stacks'])
+            with open(path) as f:
+                lines = f.read().splitlines()
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('engine.suggest_move'))
+            self.assertGreater(int(count), 0)
+        self.assertIn('qsearch', profile_search.report(result))
+
+    def test_category_of(self):
+        self.assertEqual(profile_search.category_of('/x/engine.py', 'generate_moves'), 'generation')
+        self.assertEqual(profile_search.category_of('board.py', 'make_move'), 'application')
+        self.assertEqual(profile_search.category_of('transposition.py', 'probe'), 'tt')
+        self.assertIsNone(profile_search.category_of('engine.py', '_shift'))
+
+
+if __name__ == '__main__':
+    unittest.main()
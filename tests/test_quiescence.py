@@ -2,9 +2,8 @@
 import sys, pathlib
 # garante que a raiz do projeto esteja no PYTHONPATH para importar engine
 sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
-import engine
 from board import Board
-from engine import suggest_move, Color
+from engine import Engine, Color
 import utils
 
 
@@ -36,16 +35,15 @@ def run_test(use_quiescence: bool, board: Board, label: str = ""):
     """
     Executa suggest_move em board com/sem quiescence e imprime move e nodes.
     """
-    # reinicia contador e configura quiescence
-    engine.nodes = 0
-    engine.USE_QUIESCENCE = use_quiescence
+    # engine novo: contador zerado e quiescence configurada só para este teste
+    eng = Engine(params={'use_quiescence': use_quiescence})
     depth = 2
-    move = suggest_move(board, max_depth=depth, player=Color.WHITE)
-    print(f"{label} d={depth} USE_QUIESCENCE={use_quiescence!s:5}  move={move!s:25}  nodes={engine.nodes}")
+    move = eng.suggest_move(board, max_depth=depth, player=Color.WHITE)
+    print(f"{label} d={depth} USE_QUIESCENCE={use_quiescence!s:5}  move={move!s:25}  nodes={eng.nodes}")
 
 
 if __name__ == "__main__":
-    utils.DEBUG = True
+    utils.TRACE.configure(level=utils.TraceLevel.DEBUG)
     # Teste de captura múltipla
     test_board = make_test_board()
     print("=== TESTE CAPTURA MÚLTIPLA ===")
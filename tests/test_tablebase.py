@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+import tablebase
+from board import Board
+from engine import Color, Engine, generate_moves
+
+
+class TestTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = cls.tmp.name
+        tablebase.build(cls.path, 2)
+        cls.tb = tablebase.Tablebase(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tb.close()
+        cls.tmp.cleanup()
+
+    def _positions(self):
+        for material in tablebase.materials(2):
+            indexer = tablebase._Indexer(material)
+            for idx in range(indexer.size):
+                pos = indexer.position(idx)
+                if pos is not None:
+                    yield idx, indexer, pos
+
+    def _children(self, board, player):
+        opponent = Color.BLACK if player == Color.WHITE else Color.WHITE
+        codes = []
+        for mv in generate_moves(board, player):
+            undo = board.make_move(mv)
+            codes.append(self.tb.probe(board, opponent))
+            board.unmake_move(undo)
+        return codes
+
+    def test_index_round_trip(self):
+        for idx, indexer, (board, player) in self._positions():
+            self.assertEqual(indexer.index(board, player), idx)
+
+    def test_uncrowned_man_on_promotion_row_is_not_in_tablebase(self):
+        # homem branco em 29 (linha de promoção) sem coroa: posição fora do índice
+        board = Board(1 << 29, 1 << 9)
+        self.assertIsNone(self.tb.probe(board, Color.WHITE))
+        self.assertIsNone(self.tb.probe_score(board, Color.BLACK))
+        Engine(tablebase=self.tb).suggest_move(board, max_depth=2, player=Color.BLACK)
+
+    def test_results_are_consistent_with_successors(self):
+        # vitória em d: alguma sucessora é derrota em d-1; derrota em d: todas são vitórias,
+        # a mais longa em d-1; empate: nenhuma derrota e ao menos um empate
+        self.assertEqual(self.tb.max_pieces, 2)
+        for _, _, (board, player) in self._positions():
+            code = self.tb.probe(board, player)
+            children = self._children(board, player)
+            if tablebase.is_win(code):
+                self.assertIn(tablebase._loss(code - 1), children)
+            elif tablebase.is_loss(code):
+                self.assertTrue(all(tablebase.is_win(c) for c in children))
+                self.assertEqual(max((tablebase.distance(c) + 1 for c in children), default=0),
+                                 tablebase.distance(code))
+            else:
+                self.assertEqual(code, tablebase.DRAW)
+                self.assertFalse(any(tablebase.is_loss(c) for c in children))
+                self.assertIn(tablebase.DRAW, children)
+
+    def test_build_resumes_and_replaces_corrupt_classes(self):
+        files = sorted(os.listdir(self.path))
+        kept = os.path.join(self.path, files[0])
+        corrupt = os.path.join(self.path, files[1])
+        mtime = os.stat(kept).st_mtime_ns
+        with open(corrupt, 'r+b') as f:
+            f.seek(tablebase.HEADER_BYTES + 10)
+            f.write(b'\x7f')
+        tablebase.build(self.path, 2)
+        self.assertEqual(os.stat(kept).st_mtime_ns, mtime)
+        with open(corrupt, 'rb') as f:
+            f.seek(tablebase.HEADER_BYTES + 10)
+            self.assertNotEqual(f.read(1), b'\x7f')
+
+    def test_engine_uses_tablebase(self):
+        # dama branca em 0 contra homem preto em 9: vitória das brancas (captura do homem)
+        board = Board(1 << 0, 1 << 9, 1 << 0, 0)
+        code = self.tb.probe(board, Color.WHITE)
+        self.assertTrue(tablebase.is_win(code))
+        eng = Engine(tablebase=self.tb)
+        value, _ = eng.negamax(board.copy(), 6, float('-inf'), float('inf'), Color.WHITE, ply=1)
+        self.assertEqual(value, tablebase.TB_WIN_SCORE - code)
+        self.assertEqual(eng.nodes, 1)
+        move = eng.suggest_move(board, max_depth=2, player=Color.WHITE)
+        after = board.copy()
+        after.make_move(move)
+        self.assertEqual(self.tb.probe(after, Color.BLACK), tablebase._loss(code - 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import engine
+from board import Board
+from engine import suggest_move, hanging_pieces, Color
+from utils import TRACE, TraceLevel, ListSink
+
+
+def _capture_board() -> Board:
+    # dama branca em 14; pretas em 18 e 22
+    return Board(1 << 14, (1 << 18) | (1 << 22), 1 << 14, 0)
+
+
+class TestTracing(unittest.TestCase):
+    def tearDown(self):
+        TRACE.configure(level=TraceLevel.OFF, sinks=[], sample_rate=1.0, detect_hanging=False)
+
+    def test_off_by_default_emits_nothing(self):
+        sink = ListSink()
+        TRACE.configure(level=TraceLevel.OFF, sinks=[sink])
+        suggest_move(_capture_board(), max_depth=2, player=Color.WHITE)
+        self.assertEqual(sink.records, [])
+
+    def test_levels_and_sampling(self):
+        sink = ListSink()
+        TRACE.configure(level=TraceLevel.INFO, sinks=[sink])
+        suggest_move(_capture_board(), max_depth=2, player=Color.WHITE)
+        self.assertEqual({r['event'] for r in sink.records}, {'iteration'})
+
+        sink.records.clear()
+        TRACE.configure(level=TraceLevel.DEBUG, sample_rate=0.0)
+        engine.TT.clear()
+        suggest_move(_capture_board(), max_depth=2, player=Color.WHITE)
+        self.assertEqual(sink.records, [])
+
+    def test_hanging_pieces(self):
+        # branco em 17 pode ser capturado pelo preto em 22 (casa 13 livre)
+        board = Board(1 << 17, 1 << 22)
+        self.assertEqual(hanging_pieces(board, Color.WHITE), 1 << 17)
+        self.assertEqual(hanging_pieces(Board.initial(), Color.WHITE), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from transposition import TranspositionTable, TTFileError
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.tt = TranspositionTable(size_mb=0.01)
+
+    def test_store_and_probe(self):
+        self.assertIsNone(self.tt.probe(12345))
+        self.tt.store(12345, 3, 0.75, 1, 42)
+        self.assertEqual(self.tt.probe(12345), (3, 0.75, 1, 42))
+        self.assertAlmostEqual(self.tt.hit_rate(), 0.5)
+        self.assertGreater(self.tt.fill_rate(), 0.0)
+
+    def test_depth_preferred_slot_survives_shallow_store(self):
+        buckets = self.tt.buckets
+        deep, shallow, other = 7, 7 + buckets, 7 + 2 * buckets
+        self.tt.store(deep, 8, 1.0, 1, 0)
+        self.tt.store(shallow, 2, 2.0, 1, 0)
+        self.tt.store(other, 1, 3.0, 1, 0)
+        # a entrada profunda fica; o slot sempre-substituído guarda a última rasa
+        self.assertIsNotNone(self.tt.probe(deep))
+        self.assertIsNone(self.tt.probe(shallow))
+        self.assertIsNotNone(self.tt.probe(other))
+
+    def test_old_generation_is_replaced(self):
+        buckets = self.tt.buckets
+        self.tt.store(5, 8, 1.0, 1, 0)
+        self.tt.new_search()
+        self.tt.store(5 + buckets, 1, 2.0, 1, 0)
+        self.assertEqual(self.tt.probe(5 + buckets)[0], 1)
+
+    def test_clear(self):
+        self.tt.store(99, 1, 0.0, 1, 0)
+        self.tt.clear()
+        self.assertIsNone(self.tt.probe(99))
+        self.assertEqual(self.tt.fill_rate(), 0.0)
+
+class TestPersistentTable(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.tt')
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        for path in (self.path, self.path + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_mmap_roundtrip(self):
+        tt = TranspositionTable.open(self.path, size_mb=0.01, fingerprint=7)
+        tt.store(4242, 5, -1.25, 2, 99)
+        tt.close()
+        again = TranspositionTable.open(self.path, size_mb=0.01, fingerprint=7, readonly=True)
+        self.assertIsNone(again.load_error)
+        self.assertEqual(again.probe(4242), (5, -1.25, 2, 99))
+        again.close()
+
+    def test_save_and_load(self):
+        tt = TranspositionTable(size_mb=0.01, fingerprint=7)
+        tt.store(17, 3, 0.5, 1, 0)
+        tt.save(self.path)
+        self.assertEqual(TranspositionTable.load(self.path, fingerprint=7).probe(17), (3, 0.5, 1, 0))
+
+    def test_stale_and_corrupted_files_are_rejected(self):
+        tt = TranspositionTable(size_mb=0.01, fingerprint=7)
+        tt.store(17, 3, 0.5, 1, 0)
+        tt.save(self.path)
+        with self.assertRaises(TTFileError):
+            TranspositionTable.load(self.path, fingerprint=8)
+        with open(self.path, 'r+b') as f:
+            f.seek(200)
+            f.write(b'\xff' * 8)
+        with self.assertRaises(TTFileError):
+            TranspositionTable.load(self.path, fingerprint=7)
+        # aberto para escrita, o arquivo corrompido é descartado e recriado vazio
+        fresh = TranspositionTable.open(self.path, size_mb=0.01, fingerprint=7)
+        self.assertIsNotNone(fresh.load_error)
+        self.assertIsNone(fresh.probe(17))
+        fresh.close()
+
+    def test_second_writer_does_not_recreate_live_file(self):
+        first = TranspositionTable.open(self.path, size_mb=0.01, fingerprint=7)
+        first.store(4242, 5, -1.25, 2, 99)
+        # o arquivo está sujo e mapeado pelo primeiro: o segundo escritor não pode recriá-lo
+        with self.assertRaises(TTFileError):
+            TranspositionTable.open(self.path, size_mb=0.01, fingerprint=7)
+        self.assertEqual(first.probe(4242), (5, -1.25, 2, 99))
+        first.close()
+        second = TranspositionTable.open(self.path, size_mb=0.01, fingerprint=7)
+        self.assertIsNone(second.load_error)
+        self.assertEqual(second.probe(4242), (5, -1.25, 2, 99))
+        second.close()
+
+    def test_failed_open_keeps_engine_table(self):
+        from engine import Engine
+        eng = Engine(tt_mb=0.01)
+        eng.tt.store(17, 3, 0.5, 1, 0)
+        holder = TranspositionTable.open(self.path, size_mb=0.01, fingerprint=eng.eval_fingerprint())
+        with self.assertRaises(TTFileError):
+            eng.open_tt(self.path, size_mb=0.01)
+        # a tabela anterior continua utilizável
+        self.assertEqual(eng.tt.probe(17), (3, 0.5, 1, 0))
+        holder.close()
+
+    def test_unclean_file_is_rejected(self):
+        tt = TranspositionTable.open(self.path, size_mb=0.01, fingerprint=7)
+        tt.store(17, 3, 0.5, 1, 0)
+        # sem close/flush: o cabeçalho continua marcado como sujo
+        with self.assertRaises(TTFileError):
+            TranspositionTable.load(self.path, fingerprint=7)
+        tt.close()
+
+if __name__ == '__main__':
+    unittest.main()
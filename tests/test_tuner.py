@@ -0,0 +1,57 @@
+import json
+import math
+import os
+import tempfile
+import unittest
+
+import match
+import tuner
+from batch_eval import HAVE_NUMPY
+from benchmarks import sample_positions
+from engine import Engine
+
+
+class TestTuner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        a, b = {'name': 'A', 'params': {}}, {'name': 'B', 'params': {'mobility_weight': 0.3}}
+        records = []
+        for opening in match.select_openings(match.opening_lines(2), 6):
+            records.append(match.play_game(len(records), opening, a, b, {'depth': 1}))
+            records.append(match.play_game(len(records), opening, b, a, {'depth': 1}))
+        cls.positions = list(tuner.positions_from_games(records))
+
+    def test_quiet_leaf_matches_qsearch(self):
+        eng = Engine(tt_mb=0)
+        for board, player in sample_positions(60, seed=3):
+            leaf, leaf_player = tuner.quiet_leaf(eng, board, player)
+            value = eng.eval_side(leaf, leaf_player)
+            if leaf_player != player:
+                value = -value
+            self.assertEqual(value, eng.qsearch(board.copy(), -math.inf, math.inf, player))
+
+    def test_positions_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'positions.txt')
+            tuner.save_positions(path, self.positions)
+            self.assertEqual(tuner.load_positions([path]), self.positions)
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy indisponível")
+    def test_tune_reduces_error_and_writes_loadable_params(self):
+        params = Engine(tt_mb=0).params
+        leaves = tuner.resolve_leaves(self.positions, params)
+        self.assertEqual(len(leaves), len(self.positions))
+        report = tuner.tune(leaves, params, iterations=100)
+        self.assertLess(report['error_after'], report['error_before'])
+        self.assertEqual(set(report['params']), set(tuner.TUNABLE))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tuned.json')
+            with open(path, 'w') as f:
+                json.dump(report['params'], f)
+            eng = Engine(tt_mb=0).load_params(path)
+        self.assertEqual(eng.mobility_weight, report['params']['mobility_weight'])
+        self.assertEqual(eng.psqt_man, report['params']['psqt_man'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,348 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Optional, Tuple
+from board import ZOBRIST_SEED
+from move import SHORT_CODE_MASK
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - sem flock (Windows): aberturas para escrita não são travadas
+    fcntl = None
+
+# tamanho padrão da tabela de transposição
+DEFAULT_TT_MB = 16
+
+# bound 0 marca slot vazio (BoundType usa 1..3)
+EMPTY_BOUND = 0
+# entradas por bucket: slot 0 preferido por profundidade, slot 1 sempre substituído
+BUCKET_SLOTS = 2
+# bytes por entrada: key(8) + value(8) + move(8) + depth(2) + bound(1) + generation(1)
+ENTRY_BYTES = 8 + 8 + 8 + 2 + 1 + 1
+
+_MASK64 = (1 << 64) - 1
+
+# --- formato do arquivo em disco ---
+# cabeçalho: magic, versão, flags, buckets, semente Zobrist, fingerprint dos parâmetros,
+# geração e CRC32 da área de dados; seguido das regiões na ordem de _REGIONS
+TT_FILE_MAGIC   = b'DIA-TT\x00\x00'
+TT_FILE_VERSION = 1
+_HEADER_FORMAT  = '<8sIIQQQII'
+HEADER_BYTES    = 64
+# flag de arquivo aberto para escrita sem flush: conteúdo pode estar inconsistente
+_FLAG_DIRTY     = 1
+# (atributo, formato, bytes por slot)
+_REGIONS = [
+    ('keys',   'Q', 8),
+    ('values', 'd', 8),
+    ('moves',  'Q', 8),
+    ('depths', 'h', 2),
+    ('bounds', 'B', 1),
+    ('gens',   'B', 1),
+]
+
+
+class TTFileError(Exception):
+    """Arquivo de tabela de transposição inválido, corrompido ou de outra versão/configuração."""
+
+
+def _bucket_count(size_mb: float) -> int:
+    """Maior potência de dois de buckets que cabe em `size_mb`."""
+    budget = max(1, int(size_mb * 1024 * 1024) // (ENTRY_BYTES * BUCKET_SLOTS))
+    return 1 << (budget.bit_length() - 1)
+
+
+def _data_bytes(buckets: int) -> int:
+    return buckets * BUCKET_SLOTS * ENTRY_BYTES
+
+
+class TranspositionTable:
+    """
+    Tabela de transposição de tamanho fixo em arrays pré-alocados.
+    Cada chave Zobrist cai num bucket de dois slots: o primeiro guarda a entrada
+    mais profunda (ou da busca atual), o segundo é sempre substituído.
+    O contador de geração (new_search) envelhece entradas de buscas anteriores.
+    Entradas: (depth, value, bound, move_code) com move_code 0 = sem movimento.
+
+    A memória pode ser um buffer próprio ou um arquivo mapeado (TranspositionTable.open),
+    compartilhado sem cópia entre execuções e processos.
+    """
+    def __init__(self, size_mb: float = DEFAULT_TT_MB, fingerprint: int = 0):
+        self.size_mb = size_mb
+        self.fingerprint = fingerprint
+        self.buckets = _bucket_count(size_mb)
+        self._index_mask = self.buckets - 1
+        self._file = None
+        self._mmap = None
+        self.path: Optional[str] = None
+        self.readonly = False
+        # motivo pelo qual um arquivo existente foi descartado em open()
+        self.load_error: Optional[str] = None
+        self._bind(bytearray(HEADER_BYTES + _data_bytes(self.buckets)))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def _bind(self, buffer) -> None:
+        """Cria as views tipadas de cada região sobre `buffer` (após o cabeçalho)."""
+        self._buffer = memoryview(buffer)
+        slots = self.buckets * BUCKET_SLOTS
+        offset = HEADER_BYTES
+        self._views = []
+        for name, fmt, size in _REGIONS:
+            view = self._buffer[offset:offset + slots * size].cast(fmt)
+            setattr(self, name, view)
+            self._views.append(view)
+            offset += slots * size
+
+    def _release(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._buffer.release()
+
+    @property
+    def slots(self) -> int:
+        return self.buckets * BUCKET_SLOTS
+
+    def probe(self, key: int) -> Optional[Tuple[int, float, int, int]]:
+        """Retorna (depth, value, bound, move_code) ou None se a chave não está na tabela."""
+        self.probes += 1
+        slot = (key & self._index_mask) * BUCKET_SLOTS
+        keys, bounds = self.keys, self.bounds
+        for s in (slot, slot + 1):
+            if keys[s] == key and bounds[s] != EMPTY_BOUND:
+                self.hits += 1
+                return self.depths[s], self.values[s], bounds[s], self.moves[s]
+        return None
+
+    def store(self, key: int, depth: int, value: float, bound: int, move_code: int = 0) -> None:
+        """Grava uma entrada aplicando a política de substituição do bucket."""
+        self.stores += 1
+        slot = (key & self._index_mask) * BUCKET_SLOTS
+        keys, bounds = self.keys, self.bounds
+        if keys[slot + 1] == key and bounds[slot + 1] != EMPTY_BOUND and keys[slot] != key:
+            # mesma posição já no slot sempre-substituído
+            s = slot + 1
+        elif (keys[slot] == key
+              or bounds[slot] == EMPTY_BOUND
+              or self.gens[slot] != self.generation
+              or depth >= self.depths[slot]):
+            s = slot
+        else:
+            s = slot + 1
+        if move_code > _MASK64:
+            # caminho de capturas longas não cabe em 64 bits: guarda só origem/destino/capturadas
+            move_code &= SHORT_CODE_MASK
+        keys[s] = key
+        self.depths[s] = depth
+        self.values[s] = value
+        bounds[s] = bound
+        self.gens[s] = self.generation
+        self.moves[s] = move_code
+
+    def new_search(self) -> None:
+        """Avança a geração: entradas antigas passam a ser substituídas primeiro."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self) -> None:
+        """Esvazia a tabela e zera as estatísticas."""
+        self._buffer[HEADER_BYTES:] = bytes(_data_bytes(self.buckets))
+        self.generation = 0
+        self.probes = self.hits = self.stores = 0
+
+    def fill_rate(self) -> float:
+        """Fração de slots ocupados."""
+        return 1.0 - bytes(self.bounds).count(EMPTY_BOUND) / self.slots
+
+    def hit_rate(self) -> float:
+        """Fração de consultas que encontraram a chave."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'size_mb': self.size_mb,
+            'slots': self.slots,
+            'fill_rate': self.fill_rate(),
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hit_rate(),
+            'stores': self.stores,
+            'generation': self.generation,
+        }
+
+    # --- persistência ---
+
+    def _header(self, flags: int, checksum: int) -> bytes:
+        return struct.pack(_HEADER_FORMAT, TT_FILE_MAGIC, TT_FILE_VERSION, flags, self.buckets,
+                           ZOBRIST_SEED, self.fingerprint, self.generation, checksum).ljust(HEADER_BYTES, b'\x00')
+
+    def _checksum(self) -> int:
+        return zlib.crc32(self._buffer[HEADER_BYTES:])
+
+    @staticmethod
+    def _validate(header: bytes, file_size: int, fingerprint: int) -> Tuple[int, int, int, int]:
+        """Confere o cabeçalho; retorna (flags, buckets, generation, checksum) ou levanta TTFileError."""
+        if len(header) < HEADER_BYTES:
+            raise TTFileError("arquivo menor que o cabeçalho")
+        magic, version, flags, buckets, seed, file_fp, generation, checksum = \
+            struct.unpack_from(_HEADER_FORMAT, header)
+        if magic != TT_FILE_MAGIC:
+            raise TTFileError("magic inválido")
+        if version != TT_FILE_VERSION:
+            raise TTFileError(f"versão {version} não suportada (esperada {TT_FILE_VERSION})")
+        if buckets <= 0 or buckets & (buckets - 1):
+            raise TTFileError("número de buckets inválido")
+        if file_size != HEADER_BYTES + _data_bytes(buckets):
+            raise TTFileError("tamanho do arquivo não confere com o cabeçalho")
+        if seed != ZOBRIST_SEED:
+            raise TTFileError("chaves Zobrist diferentes")
+        if file_fp != fingerprint:
+            raise TTFileError("parâmetros de avaliação diferentes (tabela obsoleta)")
+        if flags & _FLAG_DIRTY:
+            raise TTFileError("arquivo não foi fechado corretamente")
+        return flags, buckets, generation, checksum
+
+    @staticmethod
+    def _lock(f) -> None:
+        """Trava `f` com flock exclusivo; levanta TTFileError se outro processo já o tem aberto para escrita."""
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            name = f.name
+            f.close()
+            raise TTFileError(f"arquivo em uso por outro processo: {name}")
+
+    @classmethod
+    def _recreate(cls, path: str, buckets: int):
+        """
+        Cria um arquivo vazio de `buckets` num temporário travado e o move para `path`.
+        O arquivo antigo nunca é truncado: quem ainda o tem mapeado continua com o inode anterior.
+        """
+        tmp = f"{path}.tmp"
+        f = open(tmp, 'w+b')
+        cls._lock(f)
+        f.truncate(HEADER_BYTES + _data_bytes(buckets))
+        os.replace(tmp, path)
+        return f
+
+    @classmethod
+    def open(cls, path: str, size_mb: float = DEFAULT_TT_MB, fingerprint: int = 0,
+             readonly: bool = False) -> 'TranspositionTable':
+        """
+        Abre (ou cria) uma tabela mapeada em memória a partir de `path`.
+        Um arquivo válido define o tamanho; `size_mb` só vale na criação.
+        Arquivos corrompidos, de outra versão ou com outro fingerprint são descartados
+        e recriados; com readonly=True levantam TTFileError. No modo readonly o
+        mapeamento é copy-on-write: leituras sem cópia, escritas ficam no processo.
+        Aberturas para escrita travam o arquivo (flock exclusivo) até close(): uma
+        segunda abertura para escrita levanta TTFileError em vez de recriá-lo.
+        """
+        table = cls.__new__(cls)
+        table.size_mb = size_mb
+        table.fingerprint = fingerprint
+        table.path = path
+        table.readonly = readonly
+        table.probes = table.hits = table.stores = 0
+        table.load_error = None
+
+        if readonly:
+            if not os.path.exists(path):
+                raise TTFileError(f"arquivo inexistente: {path}")
+            f = open(path, 'rb')
+        else:
+            f = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+            cls._lock(f)
+
+        buckets = generation = checksum = None
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size or readonly:
+            try:
+                f.seek(0)
+                _, buckets, generation, checksum = cls._validate(f.read(HEADER_BYTES), file_size, fingerprint)
+            except TTFileError as exc:
+                if readonly:
+                    f.close()
+                    raise
+                table.load_error = str(exc)
+                buckets = None
+
+        fresh = buckets is None
+        if fresh:
+            buckets = _bucket_count(size_mb)
+            generation = 0
+            # só solta a trava do arquivo antigo depois que o novo (já travado) está no lugar
+            stale, f = f, cls._recreate(path, buckets)
+            stale.close()
+        table.buckets = buckets
+        table._index_mask = buckets - 1
+        table.size_mb = _data_bytes(buckets) / (1024 * 1024)
+        table.generation = generation
+        table._map(f, readonly)
+        if not fresh and table._checksum() != checksum:
+            table._release()
+            table._mmap.close()
+            if readonly:
+                table._file.close()
+                raise TTFileError("checksum da área de dados não confere")
+            table.load_error = "checksum da área de dados não confere"
+            table.generation = 0
+            stale = table._file
+            table._map(cls._recreate(path, buckets), readonly)
+            stale.close()
+        if not readonly:
+            # marca como sujo até o próximo flush
+            table._buffer[:HEADER_BYTES] = table._header(_FLAG_DIRTY, 0)
+            table._mmap.flush()
+        return table
+
+    def _map(self, f, readonly: bool) -> None:
+        self._file = f
+        self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY if readonly else mmap.ACCESS_WRITE)
+        self._bind(self._mmap)
+
+    def flush(self) -> None:
+        """Grava checksum e cabeçalho limpo no arquivo mapeado (sem efeito em memória/readonly)."""
+        if self._mmap is None or self.readonly:
+            return
+        self._buffer[:HEADER_BYTES] = self._header(0, self._checksum())
+        self._mmap.flush()
+        # volta a marcar como sujo: novas escritas só ficam válidas após outro flush
+        self._buffer[:HEADER_BYTES] = self._header(_FLAG_DIRTY, 0)
+
+    def close(self) -> None:
+        """Fecha o mapeamento, deixando o arquivo limpo e validável."""
+        if self._mmap is None:
+            return
+        if not self.readonly:
+            self._buffer[:HEADER_BYTES] = self._header(0, self._checksum())
+            self._mmap.flush()
+        self._release()
+        self._mmap.close()
+        self._file.close()
+        self._mmap = self._file = None
+
+    def save(self, path: str) -> None:
+        """Grava uma cópia consistente da tabela em `path` (escrita atômica)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(self._header(0, self._checksum()))
+            f.write(self._buffer[HEADER_BYTES:])
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: int = 0) -> 'TranspositionTable':
+        """Carrega `path` para uma tabela em memória; levanta TTFileError se inválido."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        _, buckets, generation, checksum = cls._validate(data[:HEADER_BYTES], len(data), fingerprint)
+        if zlib.crc32(memoryview(data)[HEADER_BYTES:]) != checksum:
+            raise TTFileError("checksum da área de dados não confere")
+        table = cls(_data_bytes(buckets) / (1024 * 1024), fingerprint)
+        table._buffer[HEADER_BYTES:] = memoryview(data)[HEADER_BYTES:]
+        table.generation = generation
+        return table
@@ -0,0 +1,295 @@
+"""
+Tuning automático (estilo Texel) dos parâmetros de avaliação.
+
+Posições rotuladas com o resultado da partida (1, 0.5 ou 0 para as brancas) são
+resolvidas pela quiescence — segue-se a variante principal da qsearch até uma posição
+em que ela para (stand pat) — em paralelo, uma única vez. A avaliação dessas folhas é
+linear nos valores de PSQT e no peso da mobilidade (o multiplicador de final só escala
+o total), então cada folha vira um vetor de atributos (material, ocupação com sinal por
+casa, diferença de mobilidade) e o erro quadrático de sigmoid(K · avaliação) contra o
+resultado é minimizado por gradiente (Adam) sobre o lote inteiro com NumPy.
+O erro antes e depois é conferido com a avaliação exata (batch_eval.evaluate_batch) e os
+valores ajustados são gravados em JSON, carregável com Engine.load_params.
+
+Só a avaliação estática é ajustada: pst_weight e border_pst_factor ficam fixos (a
+escala entra na PSQT) e parâmetros de busca (futility, LMR, ...) se comparam com match.py.
+
+Uso:
+    python match.py --depth 3 --output games.jsonl          # partidas rotuladas
+    python tuner.py games.jsonl --output tuned.json --workers 8
+    python match.py --b-params tuned.json --depth 4          # confere a força
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import utils
+from batch_eval import HAVE_NUMPY, evaluate_batch, move_counts
+from board import Board
+from engine import Color, Engine, generate_moves, has_forced_capture
+from match import BLACK_WINS, DRAW, WHITE_WINS, read_games, replay_game
+
+if HAVE_NUMPY:
+    import numpy as np
+
+# (brancas, pretas, damas brancas, damas pretas, lado a jogar, resultado para as brancas)
+Position = Tuple[int, int, int, int, Color, float]
+
+# lances iniciais de cada partida ignorados (aberturas repetidas entre partidas)
+OPENING_SKIP = 8
+# parâmetros ajustáveis
+TUNABLE = ('psqt_man', 'psqt_king', 'mobility_weight', 'endgame_multiplier')
+
+_RESULTS = {WHITE_WINS: 1.0, DRAW: 0.5, BLACK_WINS: 0.0}
+_SIDES = {'w': Color.WHITE, 'b': Color.BLACK}
+
+
+# --- dados ---
+def positions_from_games(records: Iterable[Dict[str, object]], skip_plies: int = OPENING_SKIP) -> Iterator[Position]:
+    """Posições de partidas gravadas por match.py, rotuladas com o resultado da partida."""
+    for record in records:
+        result = _RESULTS[record['result']]
+        for ply, (board, player, _) in enumerate(replay_game(record)):
+            if ply >= skip_plies:
+                yield (board.bitboard_white, board.bitboard_black, board.kings_white, board.kings_black,
+                       player, result)
+
+
+def _parse_position(line: str) -> Position:
+    """'brancas pretas damas_brancas damas_pretas w|b resultado' (bitboards em decimal ou 0x...)."""
+    white, black, kings_white, kings_black, side, result = line.split()
+    return (int(white, 0), int(black, 0), int(kings_white, 0), int(kings_black, 0), _SIDES[side], float(result))
+
+
+def save_positions(path: str, positions: Iterable[Position]) -> None:
+    """Grava posições rotuladas no formato texto de load_positions."""
+    with open(path, 'w') as f:
+        for white, black, kings_white, kings_black, player, result in positions:
+            side = 'w' if player == Color.WHITE else 'b'
+            f.write(f"{white:#x} {black:#x} {kings_white:#x} {kings_black:#x} {side} {result:g}\n")
+
+
+def load_positions(paths: Sequence[str], skip_plies: int = OPENING_SKIP) -> List[Position]:
+    """Posições rotuladas de arquivos .jsonl (partidas de match.py) ou de texto (save_positions)."""
+    positions: List[Position] = []
+    for path in paths:
+        if path.endswith('.jsonl'):
+            positions.extend(positions_from_games(read_games(path), skip_plies))
+        else:
+            with open(path) as f:
+                positions.extend(_parse_position(line) for line in f if line.strip() and not line.startswith('#'))
+    return positions
+
+
+# --- resolução pela quiescence (roda nos workers) ---
+def quiet_leaf(eng: Engine, board: Board, player: Color) -> Tuple[Board, Color]:
+    """
+    Folha da variante principal da qsearch a partir de (board, player): enquanto a melhor
+    captura vale mais que parar (stand pat), joga essa captura. A avaliação estática da
+    folha, do ponto de vista de quem joga nela, é o valor da qsearch na raiz.
+    """
+    board = board.copy()
+    while has_forced_capture(board, player):
+        opponent = Color.BLACK if player == Color.WHITE else Color.WHITE
+        best_value, best_move = eng.eval_side(board, player), None
+        for mv in generate_moves(board, player):
+            undo = board.make_move(mv)
+            value = -eng.qsearch(board, -math.inf, math.inf, opponent)
+            board.unmake_move(undo)
+            if value > best_value:
+                best_value, best_move = value, mv
+        if best_move is None:
+            break
+        board.make_move(best_move)
+        player = opponent
+    return board, player
+
+
+def _resolve_chunk(chunk: List[Position], params: Dict[str, object]) -> List[Tuple[int, int, int, int, float]]:
+    eng = Engine(tt_mb=0, params=params)
+    leaves = []
+    for white, black, kings_white, kings_black, player, result in chunk:
+        board = Board(white, black, kings_white, kings_black)
+        # partida terminada: nada a avaliar
+        if not generate_moves(board, player):
+            continue
+        leaf, _ = quiet_leaf(eng, board, player)
+        leaves.append((leaf.bitboard_white, leaf.bitboard_black, leaf.kings_white, leaf.kings_black, result))
+    return leaves
+
+
+def _worker_init() -> None:
+    # workers não emitem trace (os sinks do processo pai não são compartilhados)
+    utils.TRACE.disable()
+
+
+def resolve_leaves(positions: Sequence[Position], params: Dict[str, object],
+                   workers: int = 1, chunk: int = 5000) -> List[Tuple[int, int, int, int, float]]:
+    """Folhas quietas (brancas, pretas, damas, damas, resultado) das posições, na mesma ordem."""
+    chunks = [list(positions[i:i + chunk]) for i in range(0, len(positions), chunk)]
+    if workers == 1:
+        parts = [_resolve_chunk(c, params) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            parts = list(pool.map(_resolve_chunk, chunks, [params] * len(chunks)))
+    return [leaf for part in parts for leaf in part]
+
+
+# --- ajuste ---
+def _require_numpy() -> None:
+    if not HAVE_NUMPY:
+        raise ImportError("o ajuste requer NumPy")
+
+
+def _loss(scores, results, scale: float) -> float:
+    """Erro quadrático médio de sigmoid(scale · avaliação) contra os resultados."""
+    predicted = 1.0 / (1.0 + np.exp(-scale * scores))
+    return float(np.mean((results - predicted) ** 2))
+
+
+def fit_scale(scores, results, low: float = 0.05, high: float = 10.0, steps: int = 60) -> float:
+    """Constante K da sigmoide que minimiza o erro para avaliações fixas (busca da seção áurea)."""
+    _require_numpy()
+    ratio = (math.sqrt(5) - 1) / 2
+    a, b = low, high
+    for _ in range(steps):
+        c, d = b - ratio * (b - a), a + ratio * (b - a)
+        if _loss(scores, results, c) < _loss(scores, results, d):
+            b = d
+        else:
+            a = c
+    return (a + b) / 2
+
+
+def _features(leaves, eng: Engine) -> Dict[str, object]:
+    """Atributos lineares da avaliação de cada folha (ver Engine.evaluate)."""
+    white, black, kings_white, kings_black, results = (np.array(column) for column in zip(*leaves))
+    white, black, kings_white, kings_black = (a.astype(np.uint64) for a in (white, black, kings_white, kings_black))
+    squares = np.arange(32, dtype=np.uint64)
+
+    def occupancy(bb):
+        return ((bb[:, None] >> squares) & np.uint64(1)).astype(np.float32)
+
+    men = occupancy(white & ~kings_white) - occupancy(black & ~kings_black)
+    kings = occupancy(kings_white) - occupancy(kings_black)
+    pieces = np.abs(men).sum(axis=1) + np.abs(kings).sum(axis=1)
+    white_moves, black_moves = move_counts(white, black, kings_white, kings_black)
+    return {
+        'material': men.sum(axis=1, dtype=np.float64) + 1.5 * kings.sum(axis=1, dtype=np.float64),
+        'squares': np.hstack([men, kings]),
+        'mobility': (white_moves - black_moves).astype(np.float64),
+        'endgame': pieces < eng.endgame_piece_limit,
+        'results': results.astype(np.float64),
+        'bitboards': (white, black, kings_white, kings_black),
+    }
+
+
+def _square_weights(params: Dict[str, object]):
+    """Peso de cada casa (pst_weight, reduzido nas bordas): PSQT efetiva = PSQT × peso."""
+    ones = Engine(tt_mb=0, params=dict(params, psqt_man=[1] * 32, psqt_king=[1] * 32))
+    return np.array(ones._pst_man + ones._pst_king)
+
+
+def tune(leaves, params: Dict[str, object], iterations: int = 400, learning_rate: float = 0.01,
+         names: Sequence[str] = TUNABLE, verbose: bool = False) -> Dict[str, object]:
+    """
+    Ajusta os parâmetros `names` (de TUNABLE) partindo de `params` sobre as folhas
+    resolvidas. Retorna {'params': só os ajustados, 'scale': K, 'error_before', 'error_after'}
+    com os erros medidos pela avaliação exata.
+    """
+    _require_numpy()
+    unknown = set(names) - set(TUNABLE)
+    if unknown:
+        raise ValueError(f"parâmetros não ajustáveis: {', '.join(sorted(unknown))}")
+    base = Engine(tt_mb=0, params=params)
+    features = _features(leaves, base)
+    results, squares, material = features['results'], features['squares'], features['material']
+    mobility, endgame = features['mobility'], features['endgame']
+    weights = _square_weights(base.params)
+
+    exact = evaluate_batch(*features['bitboards'], engine=base)
+    scale = fit_scale(exact, results)
+    error_before = _loss(exact, results, scale)
+
+    # theta: PSQT efetiva das 64 casas (homens, damas), peso da mobilidade, multiplicador de final
+    theta = np.concatenate([np.array(base._pst_man + base._pst_king), [base.mobility_weight, base.endgame_multiplier]])
+    mask = np.zeros(theta.size)
+    if 'psqt_man' in names:
+        mask[:32] = 1
+    if 'psqt_king' in names:
+        mask[32:64] = 1
+    if 'mobility_weight' in names:
+        mask[64] = 1
+    if 'endgame_multiplier' in names:
+        mask[65] = 1
+    # Adam
+    m, v = np.zeros(theta.size), np.zeros(theta.size)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    n = results.size
+    for step in range(1, iterations + 1):
+        raw = material + squares @ theta[:64].astype(np.float32) + mobility * theta[64]
+        factor = np.where(endgame, theta[65], 1.0)
+        predicted = 1.0 / (1.0 + np.exp(-scale * raw * factor))
+        # d erro / d avaliação
+        g = -2.0 * (results - predicted) * predicted * (1.0 - predicted) * scale / n
+        g_raw = (g * factor).astype(np.float32)
+        grad = np.concatenate([squares.T @ g_raw, [float(g_raw @ mobility), float(g[endgame] @ raw[endgame])]]) * mask
+        m = beta1 * m + (1 - beta1) * grad
+        v = beta2 * v + (1 - beta2) * grad * grad
+        theta -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+        if verbose and (step % 50 == 0 or step == iterations):
+            print(f"iteração {step}: erro={float(np.mean((results - predicted) ** 2)):.6f}")
+
+    tuned: Dict[str, object] = {}
+    table = [float(t / w) if w else 0.0 for t, w in zip(theta[:64], weights)]
+    if 'psqt_man' in names:
+        tuned['psqt_man'] = [round(x, 4) for x in table[:32]]
+    if 'psqt_king' in names:
+        tuned['psqt_king'] = [round(x, 4) for x in table[32:]]
+    if 'mobility_weight' in names:
+        tuned['mobility_weight'] = round(float(theta[64]), 6)
+    if 'endgame_multiplier' in names:
+        tuned['endgame_multiplier'] = round(float(theta[65]), 6)
+
+    after = evaluate_batch(*features['bitboards'], engine=Engine(tt_mb=0, params=dict(params, **tuned)))
+    return {'params': tuned, 'scale': scale, 'error_before': error_before,
+            'error_after': _loss(after, results, scale), 'positions': n}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tuning Texel dos parâmetros de avaliação")
+    parser.add_argument('inputs', nargs='+', help="partidas .jsonl (match.py) ou posições em texto")
+    parser.add_argument('--output', required=True, help="JSON com os parâmetros ajustados")
+    parser.add_argument('--params', help="JSON de parâmetros de partida (padrão: os do engine)")
+    parser.add_argument('--tune', nargs='+', choices=TUNABLE, default=list(TUNABLE))
+    parser.add_argument('--iterations', type=int, default=400)
+    parser.add_argument('--learning-rate', type=float, default=0.01)
+    parser.add_argument('--skip-plies', type=int, default=OPENING_SKIP)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    utils.TRACE.disable()
+    eng = Engine(tt_mb=0)
+    if args.params:
+        eng.load_params(args.params)
+    start = time.perf_counter()
+    positions = load_positions(args.inputs, args.skip_plies)
+    leaves = resolve_leaves(positions, eng.params, args.workers)
+    print(f"{len(positions)} posições, {len(leaves)} folhas quietas em {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    report = tune(leaves, eng.params, args.iterations, args.learning_rate, args.tune, verbose=True)
+    print(f"K={report['scale']:.3f}  erro {report['error_before']:.6f} -> {report['error_after']:.6f}  "
+          f"({time.perf_counter() - start:.1f}s)")
+    with open(args.output, 'w') as f:
+        json.dump(report['params'], f, indent=2)
+        f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,22 +1,102 @@
-from enum import Enum
+from enum import IntEnum
+import json
+import random
 import sys
-from typing import Union
+from typing import Any, Callable, Dict, List, Optional, TextIO
 
-# flag global para habilitar debug
-DEBUG = True
 
-def debug_move(depth: int, move, score: Union[float, int], forced: bool):
-    """
-    Imprime linha de trace padronizada se DEBUG estiver True.
+class TraceLevel(IntEnum):
+    """Níveis de trace da busca (OFF desliga tudo)."""
+    OFF   = 0
+    INFO  = 1   # um evento por iteração / busca
+    DEBUG = 2   # eventos por nó (capturas da quiescence, peças penduradas)
+
+
+# Um evento é um dict com 'level', 'event' e os campos específicos
+# (depth, move, score, ...). Sinks recebem o dict e decidem a formatação.
+TraceSink = Callable[[Dict[str, Any]], None]
+
+
+class StderrSink:
+    """Imprime cada evento numa linha indentada pela profundidade (formato do antigo debug_move)."""
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        depth = record.get('depth', 0)
+        fields = " ".join(
+            f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+            for k, v in record.items() if k not in ('level', 'event', 'depth', 'move')
+        )
+        move = f" move {record['move']}" if 'move' in record else ""
+        print(f"{'  ' * depth}[d={depth}] {record['event']}{move} {fields}".rstrip(),
+              file=self.stream or sys.stderr)
+
+
+class ListSink:
+    """Acumula os eventos em memória (testes, análise posterior)."""
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+
 
-    depth   – profundidade do nó (raiz = 0)
-    move    – instância de Move ou string
-    score   – valor estático ou alfa-beta
-    forced  – True se era captura forçada
+class JsonLinesSink:
+    """Grava um evento JSON por linha em `stream`."""
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record, default=str) + "\n")
+
+
+class Tracer:
     """
-    if not DEBUG:
-        return
-    indent = "  " * depth
-    tag = f"[d={depth}]"
-    forced_tag = " forced_capture=True" if forced else ""
-    print(f"{indent}{tag} move {move} score={score:.2f}{forced_tag}", file=sys.stderr) 
\ No newline at end of file
+    Camada de trace da busca: sinks plugáveis, nível e taxa de amostragem.
+    O código quente só testa `TRACE.level >= TraceLevel.X` antes de montar
+    qualquer evento, então com o trace desligado o custo é uma comparação.
+    """
+    def __init__(self):
+        self.level = TraceLevel.OFF
+        self.sinks: List[TraceSink] = []
+        self.sample_rate = 1.0
+        # detector opcional de peças penduradas (máscaras de ataque) nos lances quietos
+        self.detect_hanging = False
+        self._rng = random.Random()
+
+    def configure(self, level: Optional[TraceLevel] = None, sinks: Optional[List[TraceSink]] = None,
+                  sample_rate: Optional[float] = None, detect_hanging: Optional[bool] = None,
+                  seed: Optional[int] = None) -> 'Tracer':
+        """Ajusta o trace; ligar um nível sem sinks usa StderrSink."""
+        if level is not None:
+            self.level = TraceLevel(level)
+        if sinks is not None:
+            self.sinks = list(sinks)
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if detect_hanging is not None:
+            self.detect_hanging = detect_hanging
+        if seed is not None:
+            self._rng.seed(seed)
+        if self.level > TraceLevel.OFF and not self.sinks:
+            self.sinks = [StderrSink()]
+        return self
+
+    def disable(self) -> None:
+        self.level = TraceLevel.OFF
+
+    def emit(self, level: TraceLevel, event: str, **fields: Any) -> None:
+        """Envia um evento aos sinks, se o nível estiver ligado e a amostragem aceitar."""
+        if level > self.level:
+            return
+        if self.sample_rate < 1.0 and self._rng.random() >= self.sample_rate:
+            return
+        record = {'level': level.name, 'event': event}
+        record.update(fields)
+        for sink in self.sinks:
+            sink(record)
+
+
+# tracer global usado pelo engine (desligado por padrão)
+TRACE = Tracer()